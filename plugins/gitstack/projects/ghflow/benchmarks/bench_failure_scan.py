@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+    sys.path.insert(0, str(PROJECT_SRC))
+
+from ghflow import checks  # noqa: E402
+
+
+BLOCK_LINES = 800
+
+
+def synthetic_log(line_count: int) -> str:
+    lines = [
+        f"test (3.12)\tRun tests\t2024-01-01T00:00:{index % 60:02d}.0000000Z collected item {index} PASSED"
+        for index in range(line_count)
+    ]
+    lines[line_count // 3] = "test (3.12)\tRun tests\t2024-01-01T00:00:00.0000000Z AssertionError: expected 1"
+    return "\n".join(lines)
+
+
+def per_line_scan(lines: list[str]) -> int:
+    # The loop ci inspect used before block scanning: lowercase and test
+    # every marker on every line.
+    hits = 0
+    for line in lines:
+        lowered = line.lower()
+        if any(marker in lowered for marker in checks.FAILURE_MARKERS):
+            hits += 1
+    return hits
+
+
+def block_scan(lines: list[str]) -> int:
+    hits = 0
+    for start in range(0, len(lines), BLOCK_LINES):
+        hits += len(checks.DEFAULT_MARKER_SET.scan(lines[start : start + BLOCK_LINES])[0])
+    return hits
+
+
+def digest_feed(lines: list[str]) -> int:
+    digest = checks.LogDigest(checks.DEFAULT_MAX_LINES, checks.DEFAULT_CONTEXT_LINES)
+    for start in range(0, len(lines), BLOCK_LINES):
+        digest.feed_lines(lines[start : start + BLOCK_LINES])
+    return digest.line_count
+
+
+def timed(label: str, func, lines: list[str]) -> float:
+    started = time.perf_counter()
+    result = func(lines)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<36} {elapsed * 1000:9.1f} ms  result={result}")
+    return elapsed
+
+
+def main() -> int:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    log_text = synthetic_log(line_count)
+    lines = log_text.splitlines()
+    print(f"{line_count} lines, {len(log_text) / 1e6:.1f} MB")
+    baseline = timed("lowercase + markers per line", per_line_scan, lines)
+    scanned = timed(f"MarkerSet.scan ({BLOCK_LINES}/block)", block_scan, lines)
+    streamed = timed(f"LogDigest.feed_lines ({BLOCK_LINES}/block)", digest_feed, lines)
+    print(f"speedup vs per-line scan: scan {baseline / scanned:.1f}x, streaming digest {baseline / streamed:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
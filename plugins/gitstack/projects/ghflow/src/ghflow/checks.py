@@ -2,18 +2,31 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import io
 import json
+import os
 import re
 import subprocess
 import sys
+import tempfile
+import threading
+import time
 import zipfile
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import accumulate, islice
 from pathlib import Path
 from shutil import which
-from typing import Any, Iterable, Sequence
+from typing import Any, BinaryIO, Callable, Iterable, Sequence
 
+from . import repo_context
+from . import transport
+from . import user_state
+from .log_cache import LogCache, LogCacheWriter, is_settled_run, iter_line_blocks
+from .state import read_state, write_state
 
-REPO_PATTERN = re.compile(r"^[^/\s]+/[^/\s]+$")
 
 FAILURE_CONCLUSIONS = {
     "failure",
@@ -32,6 +45,17 @@ FAILURE_STATES = {
 
 FAILURE_BUCKETS = {"fail"}
 
+PENDING_STATES = {
+    "pending",
+    "queued",
+    "in_progress",
+    "waiting",
+    "requested",
+    "expected",
+}
+
+PENDING_BUCKETS = {"pending"}
+
 FAILURE_MARKERS = (
     "error",
     "fail",
@@ -47,6 +71,14 @@ FAILURE_MARKERS = (
 
 DEFAULT_MAX_LINES = 160
 DEFAULT_CONTEXT_LINES = 30
+DEFAULT_JOBS = 1
+DEFAULT_WATCH_INTERVAL = 10
+DEFAULT_WATCH_MAX_INTERVAL = 120
+# About six hours at the default backoff cap; a watch that outlives it
+# reports what it has and exits with WATCH_TIMEOUT_EXIT_CODE.
+DEFAULT_WATCH_MAX_POLLS = 180
+WATCH_MAX_CONSECUTIVE_ERRORS = 5
+WATCH_TIMEOUT_EXIT_CODE = 124
 PENDING_LOG_MARKERS = (
     "still in progress",
     "log will be available when it is complete",
@@ -72,6 +104,66 @@ PRIMARY_CHECK_FIELDS = [
     "completedAt",
 ]
 
+CHECK_FIELDS_STATE = "check-fields"
+AUTH_STATE = "auth"
+AUTH_CACHE_TTL_SECONDS = 300
+AUTH_FAILURE_MARKERS = (
+    "not authenticated",
+    "gh auth login",
+    "authentication required",
+    "bad credentials",
+    "http 401",
+)
+
+CHECK_ROLLUP_QUERY = """
+query($owner: String!, $repo: String!, $number: Int!, $after: String) {
+  repository(owner: $owner, name: $repo) {
+    pullRequest(number: $number) {
+      commits(last: 1) {
+        nodes {
+          commit {
+            statusCheckRollup {
+              contexts(first: 100, after: $after) {
+                pageInfo { hasNextPage endCursor }
+                nodes {
+                  __typename
+                  ... on CheckRun {
+                    name
+                    status
+                    conclusion
+                    detailsUrl
+                    startedAt
+                    completedAt
+                    checkSuite {
+                      status
+                      conclusion
+                      branch { name }
+                      commit { oid }
+                      workflowRun {
+                        databaseId
+                        event
+                        url
+                        workflow { name }
+                      }
+                    }
+                  }
+                  ... on StatusContext {
+                    context
+                    state
+                    targetUrl
+                    createdAt
+                  }
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+""".strip()
+
 FALLBACK_CHECK_FIELDS = [
     "name",
     "state",
@@ -99,33 +191,366 @@ class GhResult:
         self.stderr = stderr
 
 
-def run_gh_command(args: Sequence[str], cwd: Path | None) -> GhResult:
-    process = subprocess.run(
-        ["gh", *args],
-        cwd=cwd,
-        text=True,
-        capture_output=True,
-    )
-    return GhResult(process.returncode, process.stdout, process.stderr)
+# Relative weight of each marker when ranking failure windows: specific
+# markers outrank the generic "error"/"fail" lines most failing steps end with.
+FAILURE_MARKER_WEIGHTS = {
+    "error": 1.0,
+    "fail": 1.0,
+    "failed": 2.0,
+    "traceback": 4.0,
+    "exception": 3.0,
+    "assert": 4.0,
+    "panic": 4.0,
+    "fatal": 3.0,
+    "timeout": 2.0,
+    "segmentation fault": 4.0,
+}
+# Runner boilerplate that matches a marker but never explains the failure.
+DEMOTED_FAILURE_LINES = ("process completed with exit code",)
+DEMOTED_WEIGHT = 0.5
+ANNOTATION_MARKER = "##[error]"
+ANNOTATION_BONUS = 2.0
+DEFAULT_SNIPPET_WINDOWS = 3
+SNIPPET_GAP = "..."
+MARKERS_CONFIG_PATH = Path(".github") / "ghflow-markers.json"
+LOG_LINE_PREFIX_PATTERN = re.compile(r"^(?:[^\t]*\t[^\t]*\t)?(?:\d{4}-\d\d-\d\dT[\d:.]+Z\s*)?")
+VOLATILE_TOKEN_PATTERN = re.compile(r"0x[0-9a-f]+|\d+")
+
+
+class MarkerSet:
+    def __init__(self, weights: dict[str, float], demoted: Iterable[str] = DEMOTED_FAILURE_LINES):
+        self.weights = {marker.lower(): float(weight) for marker, weight in weights.items() if marker and weight > 0}
+        self.demoted = tuple(text.lower() for text in demoted if text)
+        self.scan_markers = minimal_markers(self.weights)
+
+    def score(self, line: str) -> tuple[float, bool]:
+        lowered = line.lower()
+        if any(text in lowered for text in self.demoted):
+            return DEMOTED_WEIGHT, True
+        return max((weight for marker, weight in self.weights.items() if marker in lowered), default=0.0), False
+
+    def scan(self, lines: Sequence[str]) -> tuple[list[int], list[int]]:
+        hits, annotations = marker_line_indices(lines, self.scan_markers, (ANNOTATION_MARKER,))
+        return hits, annotations
+
+
+class FailureWindow:
+    def __init__(self, line: int, score: float, signature: str, *, boostable: bool):
+        self.line = line
+        self.score = score
+        self.signature = signature
+        self.boostable = boostable
+        self.start = line
+        self.lines: list[str] = []
+
+    @property
+    def rank(self) -> tuple[float, int]:
+        # Ties go to the later hit, which is what the old last-match rule picked.
+        return self.score, self.line
+
+
+# Bounded single-pass log consumer: keeps the last `max_lines` lines for the
+# tail and ranks every failure-marker hit, holding only the best `windows`
+# context windows, so memory stays O(windows * context + max_lines) however
+# large the log is.
+class LogDigest:
+    def __init__(
+        self,
+        max_lines: int,
+        context: int,
+        *,
+        markers: MarkerSet | None = None,
+        windows: int = DEFAULT_SNIPPET_WINDOWS,
+    ):
+        self.max_lines = max(1, max_lines)
+        self.context = max(0, context)
+        self.markers = markers or DEFAULT_MARKER_SET
+        self.windows = max(1, windows)
+        self.line_count = 0
+        self._tail: deque[str] = deque(maxlen=self.max_lines)
+        self._recent: deque[str] = deque(maxlen=2 * self.context + 1)
+        self._open: deque[FailureWindow] = deque()
+        self._annotations: deque[int] = deque()
+        self._ranked: list[FailureWindow] = []
+
+    def feed(self, line: str) -> None:
+        self.feed_lines([line])
+
+    def feed_text(self, text: str) -> None:
+        self.feed_lines(text.splitlines())
+
+    def feed_lines(self, lines: Sequence[str], scan: tuple[Sequence[int], Sequence[int]] | None = None) -> None:
+        hits, annotations = scan if scan is not None else self.markers.scan(lines)
+        base = self.line_count
+        self._annotations.extend(base + index for index in annotations)
+        start = 0
+        for hit in hits:
+            self._extend(lines[start:hit])
+            score, demoted = self.markers.score(lines[hit])
+            self._extend(lines[hit : hit + 1])
+            self._open.append(FailureWindow(base + hit, score, failure_signature(lines[hit]), boostable=not demoted))
+            self._extend(())
+            start = hit + 1
+        self._extend(lines[start:])
+
+    # Marker-free stretches go through deque.extend, so the common case costs no
+    # per-line Python work; a window is closed exactly when its last context
+    # line arrives, while the recent-lines ring still holds all of it.
+    def _extend(self, lines: Sequence[str]) -> None:
+        position = 0
+        while self._open:
+            window = self._open[0]
+            needed = window.line + self.context + 1 - self.line_count
+            if needed > len(lines) - position:
+                break
+            self._push(lines[position : position + needed])
+            position += needed
+            self._open.popleft()
+            self._ranked = self._rank(self._ranked, window)
+        self._push(lines[position:])
+
+    def _push(self, lines: Sequence[str]) -> None:
+        if not lines:
+            return
+        self.line_count += len(lines)
+        self._recent.extend(lines)
+        self._tail.extend(lines)
+        horizon = self.line_count - len(self._recent)
+        while self._annotations and self._annotations[0] < horizon:
+            self._annotations.popleft()
+
+    def _rank(self, ranked: list[FailureWindow], window: FailureWindow) -> list[FailureWindow]:
+        start = max(0, window.line - self.context)
+        score = window.score
+        if window.boostable and any(start <= line <= window.line + self.context for line in self._annotations):
+            score += ANNOTATION_BONUS
+        duplicate = next((kept for kept in ranked if kept.signature == window.signature), None)
+        rank = (score, window.line)
+        if duplicate is not None and rank < duplicate.rank:
+            return ranked
+        if duplicate is None and len(ranked) >= self.windows and rank < min(kept.rank for kept in ranked):
+            return ranked
+        finished = FailureWindow(window.line, score, window.signature, boostable=window.boostable)
+        finished.start = start
+        first = self.line_count - len(self._recent)
+        finished.lines = list(islice(self._recent, start - first, None))
+        kept = [item for item in ranked if item is not duplicate]
+        kept.append(finished)
+        if len(kept) > self.windows:
+            kept.remove(min(kept, key=lambda item: item.rank))
+        return kept
+
+    def ranked_windows(self) -> list[FailureWindow]:
+        # Windows still waiting for trailing context are ranked with what has
+        # arrived so far, without disturbing the streaming state.
+        ranked = self._ranked
+        for window in self._open:
+            ranked = self._rank(ranked, window)
+        return sorted(ranked, key=lambda item: item.rank, reverse=True)
+
+    def snippet(self) -> str:
+        selected: dict[int, str] = {}
+        for window in self.ranked_windows():
+            numbered = dict(zip(range(window.start, window.start + len(window.lines)), window.lines))
+            if not selected:
+                selected = dict(list(numbered.items())[-self.max_lines :])
+                continue
+            merged = {**selected, **numbered}
+            if len(render_snippet_lines(merged)) <= self.max_lines:
+                selected = merged
+        if not selected:
+            return "\n".join(self._tail)
+        return "\n".join(render_snippet_lines(selected))
+
+    def tail(self) -> str:
+        return "\n".join(self._tail)
+
+
+def render_snippet_lines(numbered: dict[int, str]) -> list[str]:
+    # Windows are emitted in log order; non-adjacent windows get a gap marker.
+    rendered: list[str] = []
+    previous: int | None = None
+    for line_number in sorted(numbered):
+        if previous is not None and line_number != previous + 1:
+            rendered.append(SNIPPET_GAP)
+        rendered.append(numbered[line_number])
+        previous = line_number
+    return rendered
+
+
+def failure_signature(line: str) -> str:
+    # Repeats of one failure (retried stack frames, per-item errors) differ
+    # only in gh prefixes, timestamps, numbers and addresses.
+    stripped = LOG_LINE_PREFIX_PATTERN.sub("", line, count=1).lower()
+    return " ".join(VOLATILE_TOKEN_PATTERN.sub("#", stripped).split())
+
+
+# Matrix jobs of one workflow run share a single `gh run view --log` download;
+# the stream is routed line by line into one digest per job slice.
+class RunCache:
+    def __init__(
+        self,
+        repo: str,
+        repo_root: Path | None,
+        log_cache: LogCache | None = None,
+        *,
+        max_lines: int = DEFAULT_MAX_LINES,
+        context: int = DEFAULT_CONTEXT_LINES,
+        markers: MarkerSet | None = None,
+        windows: int = DEFAULT_SNIPPET_WINDOWS,
+        run_metadata: dict[str, dict[str, Any]] | None = None,
+    ):
+        self.repo = repo
+        self.repo_root = repo_root
+        self.log_cache = log_cache
+        self.max_lines = max_lines
+        self.context = context
+        self.markers = markers or DEFAULT_MARKER_SET
+        self.windows = windows
+        self._lock = threading.Lock()
+        self._run_locks: dict[str, threading.RLock] = {}
+        # Run metadata already known from the check rollup skips `gh run view`.
+        self._metadata: dict[str, dict[str, Any] | None] = dict(run_metadata or {})
+        self._logs: dict[str, tuple[dict[str, LogDigest], LogDigest, str]] = {}
+        self._expected_jobs: dict[str, dict[str, str]] = {}
+
+    def _run_lock(self, run_id: str) -> threading.RLock:
+        with self._lock:
+            return self._run_locks.setdefault(run_id, threading.RLock())
+
+    def new_digest(self) -> LogDigest:
+        return LogDigest(self.max_lines, self.context, markers=self.markers, windows=self.windows)
+
+    def expect_job(self, run_id: str, job_name: str, job_id: str | None) -> None:
+        if not job_id:
+            return
+        with self._lock:
+            self._expected_jobs.setdefault(run_id, {})[job_name] = job_id
+
+    def metadata(self, run_id: str) -> dict[str, Any] | None:
+        with self._run_lock(run_id):
+            if run_id not in self._metadata:
+                self._metadata[run_id] = fetch_run_metadata(run_id, self.repo, self.repo_root)
+            return self._metadata[run_id]
+
+    def job_digest(self, run_id: str, job_name: str) -> tuple[LogDigest | None, str]:
+        with self._run_lock(run_id):
+            if run_id not in self._logs:
+                self._logs[run_id] = self._load_run_log(run_id)
+            slices, whole, log_error = self._logs[run_id]
+        if log_error:
+            return None, log_error
+        return slices.get(job_name, whole), ""
+
+    def cached_job(self, run_id: str, job_id: str | None) -> tuple[dict[str, Any], LogDigest] | None:
+        if self.log_cache is None or not job_id:
+            return None
+        digest = self.new_digest()
+        metadata = self.log_cache.read(self.repo, run_id, job_id, digest.feed_lines)
+        if metadata is None:
+            return None
+        return metadata, digest
+
+    def _load_run_log(self, run_id: str) -> tuple[dict[str, LogDigest], LogDigest, str]:
+        slices: dict[str, LogDigest] = {}
+        whole = self.new_digest()
+        writers = self._job_writers(run_id)
+        current_job = ""
+
+        def flush(job_name: str, group: list[str]) -> None:
+            scan = self.markers.scan(group)
+            digest = slices.get(job_name)
+            if digest is None:
+                digest = slices[job_name] = self.new_digest()
+            digest.feed_lines(group, scan)
+            whole.feed_lines(group, scan)
+            writer = writers.get(job_name)
+            if writer is not None:
+                writer.write_lines(group)
+
+        # `gh run view --log` prefixes each line with "<job>\t<step>\t"; lines
+        # without a prefix stay with the previous job. Consecutive lines of one
+        # job are handed to the digests as a single group.
+        def route(lines: list[str]) -> None:
+            nonlocal current_job
+            group_start = 0
+            for index, line in enumerate(lines):
+                job_name, separator, _ = line.partition("\t")
+                if separator and job_name != current_job:
+                    if index > group_start:
+                        flush(current_job, lines[group_start:index])
+                    current_job = job_name
+                    group_start = index
+            if len(lines) > group_start:
+                flush(current_job, lines[group_start:])
+
+        try:
+            log_error = stream_run_log(run_id, self.repo, self.repo_root, route)
+        except BaseException:
+            for writer in writers.values():
+                writer.discard()
+            raise
+        for job_name, writer in writers.items():
+            if log_error or job_name not in slices:
+                writer.discard()
+            else:
+                writer.commit()
+        return slices, whole, log_error
+
+    def _job_writers(self, run_id: str) -> dict[str, LogCacheWriter]:
+        if self.log_cache is None:
+            return {}
+        with self._lock:
+            expected = dict(self._expected_jobs.get(run_id, {}))
+        if not expected:
+            return {}
+        metadata = self.metadata(run_id)
+        if metadata is None or not is_settled_run(metadata):
+            return {}
+        writers: dict[str, LogCacheWriter] = {}
+        for job_name, job_id in expected.items():
+            writer = self.log_cache.writer(self.repo, run_id, job_id, metadata)
+            if writer is not None:
+                writers[job_name] = writer
+        return writers
 
 
-def run_gh_command_raw(args: Sequence[str], cwd: Path | None) -> tuple[int, bytes, str]:
+def run_gh_command(args: Sequence[str], cwd: Path | None) -> GhResult:
+    result = transport.run_gh(list(args), cwd=cwd)
+    return GhResult(result.returncode, result.stdout, result.stderr)
+
+
+def stream_gh_command(
+    args: Sequence[str],
+    cwd: Path | None,
+    on_lines: Callable[[list[str]], None],
+) -> GhResult:
+    # Same newline translation as text=True, but stdout is consumed in bounded
+    # blocks of whole lines instead of being buffered; stderr goes to a temp
+    # file so a chatty gh cannot block on a full pipe.
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(["gh", *args], cwd=cwd, stdout=subprocess.PIPE, stderr=stderr_file)
+        assert process.stdout is not None
+        stdout = io.TextIOWrapper(process.stdout, errors="replace")
+        try:
+            for lines in iter_line_blocks(stdout):
+                on_lines(lines)
+        finally:
+            stdout.close()
+            returncode = process.wait()
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode(errors="replace")
+    return GhResult(returncode, "", stderr)
+
+
+def run_gh_command_to_file(args: Sequence[str], cwd: Path | None, stdout: BinaryIO) -> tuple[int, str]:
     process = subprocess.run(
         ["gh", *args],
         cwd=cwd,
-        capture_output=True,
-    )
-    return process.returncode, process.stdout, process.stderr.decode(errors="replace")
-
-
-def run_git_command(args: Sequence[str], cwd: Path | None) -> GhResult:
-    process = subprocess.run(
-        ["git", *args],
-        cwd=cwd,
-        text=True,
-        capture_output=True,
+        stdout=stdout,
+        stderr=subprocess.PIPE,
     )
-    return GhResult(process.returncode, process.stdout, process.stderr)
+    return process.returncode, process.stderr.decode(errors="replace")
 
 
 def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
@@ -144,10 +569,55 @@ def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
     parser.add_argument(
         "--pr",
         default=None,
-        help="PR number or URL (defaults to current branch PR).",
+        help="PR number or URL (defaults to current branch PR); a comma-separated list inspects several PRs.",
+    )
+    parser.add_argument(
+        "--prs-from-file",
+        default=None,
+        help="File with one PR number or URL per line to inspect in one batch.",
     )
     parser.add_argument("--max-lines", type=int, default=DEFAULT_MAX_LINES)
     parser.add_argument("--context", type=int, default=DEFAULT_CONTEXT_LINES)
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="Maximum number of failing checks to fetch and analyze in parallel.",
+    )
+    parser.add_argument(
+        "--snippets",
+        type=int,
+        default=DEFAULT_SNIPPET_WINDOWS,
+        help="Maximum number of ranked failure windows merged into each snippet.",
+    )
+    parser.add_argument(
+        "--markers-file",
+        default=None,
+        help=f"JSON file with failure marker weights. Defaults to {MARKERS_CONFIG_PATH} in the checkout when present.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Skip the on-disk cache of completed job logs.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Poll until checks settle, emitting JSON-lines events as failures become analyzable.",
+    )
+    parser.add_argument("--interval", type=int, default=DEFAULT_WATCH_INTERVAL, help="Initial --watch poll interval in seconds.")
+    parser.add_argument(
+        "--max-interval",
+        type=int,
+        default=DEFAULT_WATCH_MAX_INTERVAL,
+        help="Upper bound in seconds for the --watch backoff.",
+    )
+    parser.add_argument(
+        "--max-polls",
+        type=int,
+        default=DEFAULT_WATCH_MAX_POLLS,
+        help=f"Stop --watch after this many polls with exit code {WATCH_TIMEOUT_EXIT_CODE}.",
+    )
     parser.add_argument(
         "--allow-non-project",
         action="store_true",
@@ -168,12 +638,49 @@ def main(argv: Sequence[str] | None = None) -> int:
             args.repo,
             allow_non_project=args.allow_non_project,
         )
+        pr_values = parse_pr_values(args.pr, args.prs_from_file)
+        if len(pr_values) > 1 or args.prs_from_file:
+            if args.watch:
+                raise InspectionError("--watch supports a single --pr.", 64)
+            return inspect_pr_batch(
+                repo=repo,
+                repo_root=repo_root,
+                pr_values=pr_values,
+                max_lines=max(1, args.max_lines),
+                context=max(1, args.context),
+                emit=print_event,
+                jobs=max(1, args.jobs),
+                use_cache=not args.no_cache,
+                windows=max(1, args.snippets),
+                markers_file=args.markers_file,
+            )
+        pr_value = pr_values[0] if pr_values else None
+        if args.watch:
+            return watch_pr_failures(
+                repo=repo,
+                repo_root=repo_root,
+                pr_value=pr_value,
+                max_lines=max(1, args.max_lines),
+                context=max(1, args.context),
+                emit=print_event,
+                jobs=max(1, args.jobs),
+                use_cache=not args.no_cache,
+                windows=max(1, args.snippets),
+                markers_file=args.markers_file,
+                interval=max(1, args.interval),
+                max_interval=max(1, args.interval, args.max_interval),
+                max_polls=max(1, args.max_polls),
+            )
         payload, exit_code = inspect_pr_failures(
             repo=repo,
             repo_root=repo_root,
-            pr_value=args.pr,
+            pr_value=pr_value,
             max_lines=max(1, args.max_lines),
             context=max(1, args.context),
+            jobs=max(1, args.jobs),
+            use_cache=not args.no_cache,
+            windows=max(1, args.snippets),
+            markers_file=args.markers_file,
         )
     except InspectionError as exc:
         print(exc.message, file=sys.stderr)
@@ -186,55 +693,81 @@ def main(argv: Sequence[str] | None = None) -> int:
     return exit_code
 
 
+def print_event(event: dict[str, Any]) -> None:
+    print(json.dumps(event), flush=True)
+
+
 def find_git_root(start: Path | None = None) -> Path | None:
-    result = run_git_command(["rev-parse", "--show-toplevel"], cwd=start or Path.cwd())
-    if result.returncode != 0:
-        return None
-    return Path(result.stdout.strip())
+    context = repo_context.load(start)
+    return context.root if context is not None else None
 
 
-def ensure_gh_available(cwd: Path | None) -> None:
+def ensure_gh_available(cwd: Path | None, *, use_cache: bool = True) -> None:
     if which("gh") is None:
         raise InspectionError("gh is not installed or not on PATH.", 127)
+    # `gh auth status` contacts the API; a recent success for the same host,
+    # gh config files and token is reused instead.
+    key = auth_cache_key() if use_cache else None
+    if key is not None and cached_auth_ok(key):
+        return
     result = run_gh_command(["auth", "status"], cwd=cwd)
     if result.returncode == 0:
+        if key is not None:
+            write_state(AUTH_STATE, {"key": key, "checkedAt": time.time()})
         return
+    write_state(AUTH_STATE, {})
     message = (result.stderr or result.stdout or "").strip()
     raise InspectionError(message or "gh not authenticated.", 1)
 
 
+def auth_cache_key() -> str:
+    config_dir = transport.gh_config_dir()
+    parts = [os.environ.get("GH_HOST") or "github.com", str(config_dir)]
+    for name in ("hosts.yml", "config.yml"):
+        try:
+            parts.append(str((config_dir / name).stat().st_mtime_ns))
+        except OSError:
+            parts.append("-")
+    # Only a digest of an environment token is stored, never the token.
+    token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN") or ""
+    parts.append(hashlib.sha256(token.encode()).hexdigest()[:16] if token else "-")
+    return ":".join(parts)
+
+
+def cached_auth_ok(key: str) -> bool:
+    state = read_state(AUTH_STATE)
+    checked_at = state.get("checkedAt")
+    if state.get("key") != key or not isinstance(checked_at, (int, float)):
+        return False
+    return 0 <= time.time() - checked_at < AUTH_CACHE_TTL_SECONDS
+
+
+def recheck_auth_on_failure(message: str, cwd: Path | None) -> None:
+    # With a cached verdict, revoked credentials first show up on a real gh
+    # call; rerunning the uncached probe reports them with the same text and
+    # exit code the up-front check would have produced.
+    lowered = message.lower()
+    if any(marker in lowered for marker in AUTH_FAILURE_MARKERS):
+        ensure_gh_available(cwd, use_cache=False)
+
+
 def validate_repo_reference(repo: str) -> str:
     value = repo.strip()
-    if not REPO_PATTERN.fullmatch(value):
+    if not repo_context.is_repo_reference(value):
         raise InspectionError(f"Invalid --repo value '{repo}'. Use owner/repo.", 64)
     return value
 
 
-def normalize_remote_url(remote: str | None) -> str | None:
-    if not remote:
-        return None
-    repo = re.sub(r"^git@[^:]+:", "", remote)
-    repo = re.sub(r"^https?://[^/]+/", "", repo)
-    repo = re.sub(r"^ssh://[^/]+/", "", repo)
-    repo = re.sub(r"^git://[^/]+/", "", repo)
-    repo = re.sub(r"\.git$", "", repo)
-    repo = repo.rstrip("/")
-    if REPO_PATTERN.fullmatch(repo):
-        return repo
-    return None
-
-
 def resolve_repo_from_checkout(repo_root: Path) -> str:
-    result = run_git_command(["remote", "get-url", "origin"], cwd=repo_root)
-    if result.returncode != 0:
+    context = repo_context.load(repo_root)
+    if context is None or not context.origin_url:
         raise InspectionError("No origin remote found. Pass --repo <owner/repo>.", 4)
-    repo = normalize_remote_url(result.stdout.strip())
-    if repo is None:
+    if context.repo is None:
         raise InspectionError(
-            f"Could not resolve owner/repo from git remote: {result.stdout.strip()}",
+            f"Could not resolve owner/repo from git remote: {context.origin_url}",
             5,
         )
-    return repo
+    return context.repo
 
 
 def resolve_repo_context(
@@ -277,6 +810,7 @@ def resolve_pr(pr_value: str | None, repo: str, repo_root: Path | None) -> str:
     )
     if result.returncode != 0:
         message = (result.stderr or result.stdout or "").strip()
+        recheck_auth_on_failure(message, repo_root)
         raise InspectionError(message or "Error: unable to resolve PR.", 1)
     try:
         data = json.loads(result.stdout or "{}")
@@ -296,10 +830,42 @@ def inspect_pr_failures(
     pr_value: str | None,
     max_lines: int,
     context: int,
+    jobs: int = DEFAULT_JOBS,
+    use_cache: bool = True,
+    windows: int = DEFAULT_SNIPPET_WINDOWS,
+    markers_file: str | None = None,
+) -> tuple[dict[str, Any], int]:
+    markers = resolve_marker_set(markers_file, repo_root)
+    ensure_gh_available(repo_root, use_cache=use_cache)
+    return inspect_pr(
+        repo=repo,
+        repo_root=repo_root,
+        pr_value=pr_value,
+        max_lines=max_lines,
+        context=context,
+        jobs=jobs,
+        use_cache=use_cache,
+        log_cache=LogCache() if use_cache else None,
+        markers=markers,
+        windows=windows,
+    )
+
+
+def inspect_pr(
+    *,
+    repo: str,
+    repo_root: Path | None,
+    pr_value: str | None,
+    max_lines: int,
+    context: int,
+    jobs: int = DEFAULT_JOBS,
+    use_cache: bool = True,
+    log_cache: LogCache | None = None,
+    markers: MarkerSet | None = None,
+    windows: int = DEFAULT_SNIPPET_WINDOWS,
 ) -> tuple[dict[str, Any], int]:
-    ensure_gh_available(repo_root)
     pr_number = resolve_pr(pr_value, repo, repo_root)
-    checks = fetch_checks(pr_number, repo, repo_root)
+    checks, run_metadata = fetch_pr_checks(pr_number, repo, repo_root, use_cache=use_cache)
     failing = [check for check in checks if is_failing(check)]
     payload: dict[str, Any] = {
         "repo": repo,
@@ -313,22 +879,372 @@ def inspect_pr_failures(
         return payload, 0
 
     payload["summary"] = "failing_checks"
-    payload["results"] = [
-        analyze_check(
-            check,
-            repo=repo,
-            repo_root=repo_root,
-            max_lines=max_lines,
-            context=context,
-        )
-        for check in failing
-    ]
+    payload["results"] = analyze_checks(
+        failing,
+        repo=repo,
+        repo_root=repo_root,
+        max_lines=max_lines,
+        context=context,
+        jobs=jobs,
+        log_cache=log_cache,
+        markers=markers,
+        windows=windows,
+        run_metadata=run_metadata,
+    )
     payload["message"] = f"PR #{pr_number}: {len(failing)} failing checks analyzed."
     return payload, 1
 
 
-def fetch_checks(pr_value: str, repo: str, repo_root: Path | None) -> list[dict[str, Any]]:
+def inspect_pr_batch(
+    *,
+    repo: str,
+    repo_root: Path | None,
+    pr_values: Sequence[str],
+    max_lines: int,
+    context: int,
+    emit: Callable[[dict[str, Any]], None],
+    jobs: int = DEFAULT_JOBS,
+    use_cache: bool = True,
+    windows: int = DEFAULT_SNIPPET_WINDOWS,
+    markers_file: str | None = None,
+) -> int:
+    # Auth, marker config and the log cache are set up once for every PR.
+    # `jobs` bounds total concurrency: it is split between PRs in flight and
+    # each PR's own log-fetch pool. Payloads are emitted in input order as
+    # soon as every earlier PR is done, and the exit code is that of the first
+    # failing PR in input order, so output is the same on every run.
+    markers = resolve_marker_set(markers_file, repo_root)
+    ensure_gh_available(repo_root, use_cache=use_cache)
+    log_cache = LogCache() if use_cache else None
+    workers = max(1, min(jobs, len(pr_values)))
+    per_pr_jobs = max(1, jobs // workers)
+
+    def inspect(pr_value: str) -> tuple[dict[str, Any], int]:
+        try:
+            return inspect_pr(
+                repo=repo,
+                repo_root=repo_root,
+                pr_value=pr_value,
+                max_lines=max_lines,
+                context=context,
+                jobs=per_pr_jobs,
+                use_cache=use_cache,
+                log_cache=log_cache,
+                markers=markers,
+                windows=windows,
+            )
+        except InspectionError as exc:
+            return {"repo": repo, "pr": pr_value, "summary": "error", "error": exc.message}, exc.exit_code
+
+    exit_code = 0
+    done: dict[int, tuple[dict[str, Any], int]] = {}
+    next_index = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(inspect, pr_value): index for index, pr_value in enumerate(pr_values)}
+        for future in as_completed(futures):
+            done[futures[future]] = future.result()
+            while next_index in done:
+                payload, pr_exit_code = done.pop(next_index)
+                emit(payload)
+                exit_code = exit_code or pr_exit_code
+                next_index += 1
+    return exit_code
+
+
+def parse_pr_values(value: str | None, prs_file: str | None) -> list[str]:
+    # --pr accepts a comma/whitespace separated list; --prs-from-file takes one
+    # PR per line with "#" comments.
+    values = re.split(r"[\s,]+", value or "")
+    if prs_file:
+        try:
+            text = Path(prs_file).expanduser().read_text(encoding="utf-8")
+        except OSError as exc:
+            raise InspectionError(f"Failed to read PRs file '{prs_file}': {exc.strerror or exc}", 66) from exc
+        for line in text.splitlines():
+            values.extend(re.split(r"[\s,]+", line.split("#", 1)[0]))
+    unique = list(dict.fromkeys(item for item in values if item))
+    if prs_file and not unique:
+        raise InspectionError(f"PRs file '{prs_file}' lists no pull requests.", 64)
+    return unique
+
+
+def watch_pr_failures(
+    *,
+    repo: str,
+    repo_root: Path | None,
+    pr_value: str | None,
+    max_lines: int,
+    context: int,
+    emit: Callable[[dict[str, Any]], None],
+    jobs: int = DEFAULT_JOBS,
+    use_cache: bool = True,
+    windows: int = DEFAULT_SNIPPET_WINDOWS,
+    markers_file: str | None = None,
+    interval: float = DEFAULT_WATCH_INTERVAL,
+    max_interval: float = DEFAULT_WATCH_MAX_INTERVAL,
+    max_polls: int = DEFAULT_WATCH_MAX_POLLS,
+    sleep: Callable[[float], None] = time.sleep,
+) -> int:
+    # Setup runs once; each poll refetches only the check list and analyzes
+    # just the failing checks whose state changed (or whose logs were still
+    # pending), emitting one JSON-lines event per newly analyzable failure.
+    # A failed poll is retried with backoff; only repeated failures or auth
+    # and usage errors end the watch.
+    markers = resolve_marker_set(markers_file, repo_root)
+    ensure_gh_available(repo_root, use_cache=use_cache)
+    pr_number = resolve_pr(pr_value, repo, repo_root)
+    log_cache = LogCache() if use_cache else None
+    analyzed: dict[tuple[str, str], tuple[tuple[str, ...], dict[str, Any]]] = {}
+    delay = interval
+    poll = 0
+    errors = 0
+    failing: dict[tuple[str, str], dict[str, Any]] = {}
+    while True:
+        poll += 1
+        try:
+            current, run_metadata = fetch_pr_checks(pr_number, repo, repo_root, use_cache=use_cache)
+            pending = [check for check in current if is_pending(check)]
+            failing = {check_key(check): check for check in current if is_failing(check)}
+            for key in list(analyzed):
+                if key not in failing or analyzed[key][0] != check_signature(failing[key]):
+                    del analyzed[key]
+            changed = [
+                check
+                for key, check in failing.items()
+                if key not in analyzed or analyzed[key][1].get("status") == "log_pending"
+            ]
+            results: list[dict[str, Any]] = []
+            if changed:
+                results = analyze_checks(
+                    changed,
+                    repo=repo,
+                    repo_root=repo_root,
+                    max_lines=max_lines,
+                    context=context,
+                    jobs=jobs,
+                    log_cache=log_cache,
+                    markers=markers,
+                    windows=windows,
+                    run_metadata=run_metadata,
+                )
+        except InspectionError as exc:
+            errors += 1
+            if not is_transient_error(exc) or errors >= WATCH_MAX_CONSECUTIVE_ERRORS or poll >= max_polls:
+                raise
+            delay = min(max_interval, interval * 2 ** (errors - 1))
+            emit({"event": "error", "repo": repo, "pr": pr_number, "poll": poll, "message": exc.message, "retry": errors, "nextPollSeconds": delay})
+            sleep(delay)
+            continue
+        errors = 0
+        progressed = False
+        for check, result in zip(changed, results):
+            key = check_key(check)
+            previous = analyzed.get(key)
+            analyzed[key] = (check_signature(check), result)
+            if result.get("status") == "log_pending":
+                continue
+            if previous is None or previous[1].get("status") == "log_pending":
+                progressed = True
+                emit({"event": "failure", "repo": repo, "pr": pr_number, "check": result})
+
+        waiting = sum(1 for _, result in analyzed.values() if result.get("status") == "log_pending")
+        if not pending and not waiting:
+            final = [analyzed[key][1] for key in failing]
+            emit(
+                {
+                    "event": "settled",
+                    "repo": repo,
+                    "pr": pr_number,
+                    "failingCount": len(final),
+                    "summary": "failing_checks" if final else "no_failing_checks",
+                    "results": final,
+                }
+            )
+            return 1 if final else 0
+
+        if poll >= max_polls:
+            final = [analyzed[key][1] for key in failing if key in analyzed]
+            emit(
+                {
+                    "event": "timeout",
+                    "repo": repo,
+                    "pr": pr_number,
+                    "polls": poll,
+                    "pending": len(pending),
+                    "logsPending": waiting,
+                    "failingCount": len(failing),
+                    "results": final,
+                }
+            )
+            return WATCH_TIMEOUT_EXIT_CODE
+
+        # Back off while nothing moves; any new result resets the interval.
+        if progressed or poll == 1:
+            delay = interval
+        else:
+            delay = min(max_interval, delay * 2)
+        emit(
+            {
+                "event": "poll",
+                "repo": repo,
+                "pr": pr_number,
+                "poll": poll,
+                "pending": len(pending),
+                "failing": len(failing),
+                "logsPending": waiting,
+                "nextPollSeconds": delay,
+            }
+        )
+        sleep(delay)
+
+
+def is_transient_error(exc: InspectionError) -> bool:
+    # Network blips, 5xx responses and unparsable output exit with 1; auth
+    # failures and usage errors will not fix themselves between polls.
+    lowered = exc.message.lower()
+    return exc.exit_code == 1 and not any(marker in lowered for marker in AUTH_FAILURE_MARKERS)
+
+
+def check_key(check: dict[str, Any]) -> tuple[str, str]:
+    return str(check.get("name", "")), str(check.get("detailsUrl") or check.get("link") or "")
+
+
+def check_signature(check: dict[str, Any]) -> tuple[str, ...]:
+    return tuple(
+        normalize_field(check.get(field))
+        for field in ("state", "status", "conclusion", "bucket", "completedAt")
+    )
+
+
+def is_pending(check: dict[str, Any]) -> bool:
+    if is_failing(check):
+        return False
+    state = normalize_field(check.get("state") or check.get("status"))
+    if state in PENDING_STATES:
+        return True
+    return normalize_field(check.get("bucket")) in PENDING_BUCKETS
+
+
+def fetch_pr_checks(
+    pr_number: str,
+    repo: str,
+    repo_root: Path | None,
+    *,
+    use_cache: bool = True,
+) -> tuple[list[dict[str, Any]], dict[str, dict[str, Any]]]:
+    rollup = fetch_check_rollup(pr_number, repo)
+    if rollup is not None:
+        return rollup
+    return fetch_checks(pr_number, repo, repo_root, use_cache=use_cache), {}
+
+
+def fetch_check_rollup(pr_number: str, repo: str) -> tuple[list[dict[str, Any]], dict[str, dict[str, Any]]] | None:
+    # One paginated GraphQL query returns every check of the PR head commit
+    # together with its workflow run, replacing `gh pr checks` plus one
+    # `gh run view` per failing run. Any failure returns None so callers fall
+    # back to `gh pr checks`.
+    if not pr_number.isdigit():
+        return None
+    owner, repo_name = repo.split("/", 1)
+    # Re-runs leave every attempt on the head commit; like `gh pr checks`,
+    # only the latest check per (workflow, name) is kept.
+    latest: dict[tuple[str, str], tuple[tuple[str, str, int], dict[str, Any], str | None, dict[str, Any]]] = {}
+    after: str | None = None
+    while True:
+        try:
+            payload = user_state.graphql(
+                CHECK_ROLLUP_QUERY,
+                {"owner": owner, "repo": repo_name, "number": int(pr_number), "after": after},
+            )
+        except (user_state.GhError, OSError):
+            return None
+        if not isinstance(payload, dict):
+            return None
+        pull_request = ((payload.get("data") or {}).get("repository") or {}).get("pullRequest")
+        if not isinstance(pull_request, dict):
+            return None
+        commits = (pull_request.get("commits") or {}).get("nodes") or []
+        rollup = ((commits[-1] or {}).get("commit") or {}).get("statusCheckRollup") if commits else None
+        if not rollup:
+            return latest_rollup_checks(latest)
+        contexts = rollup.get("contexts") or {}
+        for node in contexts.get("nodes") or []:
+            if not isinstance(node, dict):
+                continue
+            if node.get("__typename") == "StatusContext":
+                check: dict[str, Any] = {
+                    "name": node.get("context") or "",
+                    "state": node.get("state") or "",
+                    "detailsUrl": node.get("targetUrl") or "",
+                    "startedAt": node.get("createdAt") or "",
+                }
+                run_id, metadata = None, {}
+            else:
+                check, run_id, metadata = rollup_check_run(node)
+            key = (str(check.get("workflow") or ""), str(check["name"]))
+            order = (str(check.get("startedAt") or ""), str(check.get("completedAt") or ""), int(run_id or 0))
+            if key not in latest or order >= latest[key][0]:
+                latest[key] = (order, check, run_id, metadata)
+        page_info = contexts.get("pageInfo") or {}
+        after = page_info.get("endCursor")
+        if not page_info.get("hasNextPage") or not after:
+            return latest_rollup_checks(latest)
+
+
+def latest_rollup_checks(
+    latest: dict[tuple[str, str], tuple[tuple[str, str, int], dict[str, Any], str | None, dict[str, Any]]],
+) -> tuple[list[dict[str, Any]], dict[str, dict[str, Any]]]:
+    checks: list[dict[str, Any]] = []
+    run_metadata: dict[str, dict[str, Any]] = {}
+    for _, check, run_id, metadata in latest.values():
+        checks.append(check)
+        if run_id is not None:
+            run_metadata.setdefault(run_id, metadata)
+    return checks, run_metadata
+
+
+def rollup_check_run(node: dict[str, Any]) -> tuple[dict[str, Any], str | None, dict[str, Any]]:
+    suite = node.get("checkSuite") or {}
+    run = suite.get("workflowRun") or {}
+    workflow_name = (run.get("workflow") or {}).get("name") or ""
+    check = {
+        "name": node.get("name") or "",
+        "state": node.get("conclusion") or node.get("status") or "",
+        "conclusion": node.get("conclusion") or "",
+        "detailsUrl": node.get("detailsUrl") or "",
+        "startedAt": node.get("startedAt") or "",
+        "completedAt": node.get("completedAt") or "",
+        "workflow": workflow_name,
+        "event": run.get("event") or "",
+    }
+    if not run.get("databaseId"):
+        return check, None, {}
+    # Same shape `gh run view --json` returns for RUN_METADATA_FIELDS.
+    metadata = {
+        "conclusion": normalize_field(suite.get("conclusion")),
+        "status": normalize_field(suite.get("status")),
+        "workflowName": workflow_name,
+        "name": workflow_name,
+        "event": str(run.get("event") or "").lower(),
+        "headBranch": (suite.get("branch") or {}).get("name") or "",
+        "headSha": (suite.get("commit") or {}).get("oid") or "",
+        "url": run.get("url") or "",
+    }
+    return check, str(run["databaseId"]), metadata
+
+
+def fetch_checks(
+    pr_value: str,
+    repo: str,
+    repo_root: Path | None,
+    *,
+    use_cache: bool = True,
+) -> list[dict[str, Any]]:
     fallback_field_sets = [PRIMARY_CHECK_FIELDS, FALLBACK_CHECK_FIELDS]
+    fingerprint = gh_fingerprint() if use_cache else None
+    cached_fields = cached_check_fields(fingerprint)
+    if cached_fields is not None:
+        fallback_field_sets = [cached_fields, *(fields for fields in fallback_field_sets if fields != cached_fields)]
     index = 0
     result: GhResult | None = None
     seen_field_sets = {tuple(fields) for fields in fallback_field_sets}
@@ -352,8 +1268,14 @@ def fetch_checks(pr_value: str, repo: str, repo_root: Path | None) -> list[dict[
                 seen_field_sets.add(discovered_tuple)
         index += 1
 
+    if fingerprint is not None and result is not None and result.returncode == 0:
+        fields = fallback_field_sets[index]
+        if fields != cached_fields:
+            remember_check_fields(fingerprint, fields, repo_root)
+
     if result is None or result.returncode != 0:
         message = (result.stderr or result.stdout or "").strip() if result is not None else ""
+        recheck_auth_on_failure(message, repo_root)
         if index > 1:
             raise InspectionError(
                 "Error: gh pr checks failed and no compatible field list succeeded.",
@@ -370,6 +1292,45 @@ def fetch_checks(pr_value: str, repo: str, repo_root: Path | None) -> list[dict[
     return data
 
 
+def gh_fingerprint() -> str | None:
+    # The resolved gh executable's path, size and mtime change whenever gh is
+    # upgraded, so the negotiated field set invalidates itself without
+    # spawning `gh --version` on every run.
+    path = which("gh")
+    if path is None:
+        return None
+    resolved = os.path.realpath(path)
+    try:
+        stat = os.stat(resolved)
+    except OSError:
+        return None
+    return f"{resolved}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def cached_check_fields(fingerprint: str | None) -> list[str] | None:
+    if fingerprint is None:
+        return None
+    state = read_state(CHECK_FIELDS_STATE)
+    fields = state.get("fields")
+    if state.get("gh") != fingerprint or not isinstance(fields, list) or not fields:
+        return None
+    if not all(isinstance(field, str) for field in fields):
+        return None
+    return fields
+
+
+def remember_check_fields(fingerprint: str, fields: list[str], repo_root: Path | None) -> None:
+    version = run_gh_command(["--version"], cwd=repo_root)
+    write_state(
+        CHECK_FIELDS_STATE,
+        {
+            "gh": fingerprint,
+            "ghVersion": version.stdout.splitlines()[0].strip() if version.returncode == 0 and version.stdout else "",
+            "fields": list(fields),
+        },
+    )
+
+
 def is_failing(check: dict[str, Any]) -> bool:
     conclusion = normalize_field(check.get("conclusion"))
     if conclusion in FAILURE_CONCLUSIONS:
@@ -381,6 +1342,56 @@ def is_failing(check: dict[str, Any]) -> bool:
     return bucket in FAILURE_BUCKETS
 
 
+def analyze_checks(
+    failing: Sequence[dict[str, Any]],
+    *,
+    repo: str,
+    repo_root: Path | None,
+    max_lines: int,
+    context: int,
+    jobs: int = DEFAULT_JOBS,
+    log_cache: LogCache | None = None,
+    markers: MarkerSet | None = None,
+    windows: int = DEFAULT_SNIPPET_WINDOWS,
+    run_metadata: dict[str, dict[str, Any]] | None = None,
+) -> list[dict[str, Any]]:
+    run_cache = RunCache(
+        repo,
+        repo_root,
+        log_cache,
+        max_lines=max_lines,
+        context=context,
+        markers=markers,
+        windows=windows,
+        run_metadata=run_metadata,
+    )
+    # Register every job up front so whichever check downloads a shared run log
+    # can persist the slices of its sibling matrix jobs too.
+    for check in failing:
+        url = check.get("detailsUrl") or check.get("link") or ""
+        run_id = extract_run_id(url)
+        if run_id is not None:
+            run_cache.expect_job(run_id, str(check.get("name", "")), extract_job_id(url))
+
+    def analyze(check: dict[str, Any]) -> dict[str, Any]:
+        return analyze_check(
+            check,
+            repo=repo,
+            repo_root=repo_root,
+            max_lines=max_lines,
+            context=context,
+            run_cache=run_cache,
+        )
+
+    workers = min(max(1, jobs), len(failing))
+    if workers <= 1:
+        return [analyze(check) for check in failing]
+    # Executor.map yields results in submission order, so the payload keeps the
+    # original check order regardless of which gh subprocess finishes first.
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(analyze, failing))
+
+
 def analyze_check(
     check: dict[str, Any],
     *,
@@ -388,6 +1399,7 @@ def analyze_check(
     repo_root: Path | None,
     max_lines: int,
     context: int,
+    run_cache: RunCache | None = None,
 ) -> dict[str, Any]:
     url = check.get("detailsUrl") or check.get("link") or ""
     run_id = extract_run_id(url)
@@ -404,30 +1416,40 @@ def analyze_check(
         base["note"] = "No GitHub Actions run id detected in details URL."
         return base
 
-    metadata = fetch_run_metadata(run_id, repo, repo_root)
-    if metadata is not None:
+    if run_cache is None:
+        run_cache = RunCache(repo, repo_root, max_lines=max_lines, context=context)
+    cached = run_cache.cached_job(run_id, job_id)
+    if cached is not None:
+        metadata, digest = cached
         base["run"] = metadata
-
-    log_text, log_error, log_status = fetch_check_log(
-        run_id=run_id,
-        job_id=job_id,
-        repo=repo,
-        repo_root=repo_root,
-    )
+        log_error, log_status = "", "ok"
+    else:
+        metadata = run_cache.metadata(run_id)
+        if metadata is not None:
+            base["run"] = metadata
+
+        digest, log_error, log_status = fetch_check_log(
+            run_id=run_id,
+            job_id=job_id,
+            job_name=str(base["name"]),
+            repo=repo,
+            repo_root=repo_root,
+            run_cache=run_cache,
+        )
 
     if log_status == "pending":
         base["status"] = "log_pending"
         base["note"] = log_error or "Logs are not available yet."
         return base
 
-    if log_error:
+    if log_error or digest is None:
         base["status"] = "log_unavailable"
         base["error"] = log_error
         return base
 
     base["status"] = "ok"
-    base["logSnippet"] = extract_failure_snippet(log_text, max_lines=max_lines, context=context)
-    base["logTail"] = tail_lines(log_text, max_lines)
+    base["logSnippet"] = digest.snippet()
+    base["logTail"] = digest.tail()
     return base
 
 
@@ -475,75 +1497,112 @@ def fetch_check_log(
     job_id: str | None,
     repo: str,
     repo_root: Path | None,
-) -> tuple[str, str, str]:
-    log_text, log_error = fetch_run_log(run_id, repo, repo_root)
+    job_name: str = "",
+    run_cache: RunCache | None = None,
+) -> tuple[LogDigest | None, str, str]:
+    if run_cache is None:
+        run_cache = RunCache(repo, repo_root)
+    digest, log_error = run_cache.job_digest(run_id, job_name)
     if not log_error:
-        return log_text, "", "ok"
+        return digest, "", "ok"
 
     if is_log_pending_message(log_error) and job_id:
-        job_log, job_error = fetch_job_log(job_id, repo, repo_root)
-        if job_log:
-            return job_log, "", "ok"
+        job_digest = run_cache.new_digest()
+        job_error = fetch_job_log(job_id, repo, repo_root, job_digest.feed_lines)
+        if not job_error and job_digest.line_count:
+            return job_digest, "", "ok"
         if job_error and is_log_pending_message(job_error):
-            return "", job_error, "pending"
+            return None, job_error, "pending"
         if job_error:
-            return "", job_error, "error"
-        return "", log_error, "pending"
+            return None, job_error, "error"
+        return None, log_error, "pending"
 
     if is_log_pending_message(log_error):
-        return "", log_error, "pending"
-    return "", log_error, "error"
+        return None, log_error, "pending"
+    return None, log_error, "error"
 
 
-def fetch_run_log(run_id: str, repo: str, repo_root: Path | None) -> tuple[str, str]:
-    result = run_gh_command(
+def stream_run_log(
+    run_id: str,
+    repo: str,
+    repo_root: Path | None,
+    on_lines: Callable[[list[str]], None],
+) -> str:
+    result = stream_gh_command(
         append_repo_flag(["run", "view", run_id, "--log"], repo),
-        cwd=repo_root,
+        repo_root,
+        on_lines,
     )
     if result.returncode != 0:
-        error = (result.stderr or result.stdout or "").strip()
-        return "", error or "gh run view failed"
-    return result.stdout, ""
+        return result.stderr.strip() or "gh run view failed"
+    return ""
 
 
-def fetch_job_log(job_id: str, repo: str, repo_root: Path | None) -> tuple[str, str]:
+def fetch_job_log(
+    job_id: str,
+    repo: str,
+    repo_root: Path | None,
+    on_lines: Callable[[list[str]], None],
+) -> str:
     endpoint = f"/repos/{repo}/actions/jobs/{job_id}/logs"
-    returncode, stdout_bytes, stderr = run_gh_command_raw(["api", endpoint], cwd=repo_root)
-    if returncode != 0:
-        message = (stderr or "").strip() or "gh api job logs failed"
-        return "", message
-
-    log_text, parse_error = extract_log_from_job_archive(stdout_bytes)
-    if parse_error:
-        return "", parse_error
-    return log_text, ""
+    # The payload goes to a temp file rather than a bytes buffer, so only the
+    # chosen archive member is ever decoded, and only a block at a time.
+    with tempfile.TemporaryFile() as payload:
+        returncode, stderr = run_gh_command_to_file(["api", endpoint], repo_root, payload)
+        if returncode != 0:
+            return (stderr or "").strip() or "gh api job logs failed"
+        return stream_log_from_job_archive(payload, on_lines)
+
+
+def stream_log_from_job_archive(handle: BinaryIO, on_lines: Callable[[list[str]], None]) -> str:
+    if handle.seek(0, io.SEEK_END) == 0:
+        return "Job logs endpoint returned empty payload."
+    if not zipfile.is_zipfile(handle):
+        handle.seek(0)
+        stream_text_lines(handle, on_lines)
+        return ""
 
+    try:
+        with zipfile.ZipFile(handle, "r") as archive:
+            members = [info for info in archive.infolist() if not info.is_dir()]
+            if not members:
+                return "Job logs archive contains no files."
+            # The central directory records each member's uncompressed size, so
+            # the longest log is picked without reading any member.
+            best = max(members, key=lambda info: info.file_size)
+            seen_text = False
+
+            def forward(lines: list[str]) -> None:
+                nonlocal seen_text
+                seen_text = seen_text or any(line.strip() for line in lines)
+                on_lines(lines)
+
+            with archive.open(best) as member:
+                stream_text_lines(member, forward)
+            if not seen_text:
+                names = ", ".join(info.filename for info in members)
+                return f"Job logs archive is empty or unreadable; entries: {names}"
+            return ""
+    except (zipfile.BadZipFile, KeyError, ValueError) as exc:
+        return f"Unable to parse job log archive: {exc}"
 
-def extract_log_from_job_archive(payload: bytes) -> tuple[str, str]:
-    if not payload:
-        return "", "Job logs endpoint returned empty payload."
-    if not zipfile.is_zipfile(io.BytesIO(payload)):
-        return payload.decode(errors="replace"), ""
 
+def stream_text_lines(handle: BinaryIO, on_lines: Callable[[list[str]], None]) -> None:
+    text = io.TextIOWrapper(handle, encoding="utf-8", errors="replace")
     try:
-        with zipfile.ZipFile(io.BytesIO(payload), "r") as archive:
-            names = [name for name in archive.namelist() if not name.endswith("/")]
-            if not names:
-                return "", "Job logs archive contains no files."
-            best_text = ""
-            for name in names:
-                raw = archive.read(name)
-                if not raw:
-                    continue
-                text = raw.decode(errors="replace")
-                if len(text) <= len(best_text):
-                    continue
-                best_text = text
-            if not best_text.strip():
-                return "", f"Job logs archive is empty or unreadable; entries: {', '.join(names)}"
-            return best_text, ""
-    except (zipfile.BadZipFile, KeyError, ValueError) as exc:
-        return "", f"Unable to parse job log archive: {exc}"
+        for lines in iter_line_blocks(text):
+            on_lines(lines)
+    finally:
+        # Leave the underlying handle open for its owner.
+        text.detach()
+
+
+def extract_log_from_job_archive(payload: bytes) -> tuple[str, str]:
+    lines: list[str] = []
+    error = stream_log_from_job_archive(io.BytesIO(payload), lines.extend)
+    if error:
+        return "", error
+    return "\n".join(lines), ""
 
 
 def normalize_field(value: Any) -> str:
@@ -579,28 +1638,114 @@ def is_log_pending_message(message: str) -> bool:
     return any(marker in lowered for marker in PENDING_LOG_MARKERS)
 
 
-def extract_failure_snippet(log_text: str, max_lines: int, context: int) -> str:
-    lines = log_text.splitlines()
+def extract_failure_snippet(
+    log_text: str,
+    max_lines: int,
+    context: int,
+    *,
+    markers: MarkerSet | None = None,
+    windows: int = DEFAULT_SNIPPET_WINDOWS,
+) -> str:
+    digest = LogDigest(max_lines, context, markers=markers, windows=windows)
+    digest.feed_text(log_text)
+    return digest.snippet()
+
+
+def minimal_markers(markers: Iterable[str]) -> tuple[str, ...]:
+    # A marker containing a shorter marker ("failed" vs "fail") can never change
+    # whether a line matches, so only the shortest forms are scanned for.
+    unique = sorted({marker.lower() for marker in markers if marker}, key=lambda marker: (len(marker), marker))
+    minimal: list[str] = []
+    for marker in unique:
+        if not any(shorter in marker for shorter in minimal):
+            minimal.append(marker)
+    return tuple(minimal)
+
+
+DEFAULT_MARKER_SET = MarkerSet(FAILURE_MARKER_WEIGHTS)
+
+
+def load_marker_set(path: Path) -> MarkerSet:
+    # {"markers": {"<text>": <weight>, ...}, "demote": ["<text>", ...], "replace": false}
+    # Markers are merged over the defaults (weight 0 disables one) unless
+    # "replace" is true; "demote" replaces the default boilerplate list.
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except OSError as exc:
+        raise InspectionError(f"Failed to read markers file '{path}': {exc.strerror or exc}", 66) from exc
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        raise InspectionError(f"Invalid markers file '{path}': {exc}", 65) from exc
+    if not isinstance(data, dict):
+        raise InspectionError(f"Invalid markers file '{path}': expected a JSON object.", 65)
+
+    raw_markers = data.get("markers", {})
+    if isinstance(raw_markers, list):
+        raw_markers = dict.fromkeys(raw_markers, 1.0)
+    if not isinstance(raw_markers, dict) or not all(
+        isinstance(marker, str) and isinstance(weight, (int, float)) and not isinstance(weight, bool)
+        for marker, weight in raw_markers.items()
+    ):
+        raise InspectionError(f"Invalid markers file '{path}': \"markers\" must map text to numeric weights.", 65)
+    demoted = data.get("demote", list(DEMOTED_FAILURE_LINES))
+    if not isinstance(demoted, list) or not all(isinstance(text, str) for text in demoted):
+        raise InspectionError(f"Invalid markers file '{path}': \"demote\" must be a list of strings.", 65)
+
+    weights = {} if data.get("replace") else dict(FAILURE_MARKER_WEIGHTS)
+    weights.update({marker.lower(): float(weight) for marker, weight in raw_markers.items()})
+    return MarkerSet(weights, demoted)
+
+
+def resolve_marker_set(markers_file: str | None, repo_root: Path | None) -> MarkerSet:
+    if markers_file:
+        return load_marker_set(Path(markers_file).expanduser())
+    if repo_root is not None and (repo_root / MARKERS_CONFIG_PATH).is_file():
+        return load_marker_set(repo_root / MARKERS_CONFIG_PATH)
+    return DEFAULT_MARKER_SET
+
+
+def is_failure_line(line: str, markers: Sequence[str]) -> bool:
+    lowered = line.lower()
+    return any(marker in lowered for marker in markers)
+
+
+def scan_marker_offsets(lowered: str, markers: Sequence[str]) -> list[int]:
+    # str.find runs CPython's C fast search over the whole buffer; after a hit
+    # the scan for that marker resumes on the next line, so each marker costs
+    # at most one match per line. This is several times faster than one
+    # case-insensitive regex alternation over the same block.
+    offsets: list[int] = []
+    for marker in markers:
+        index = lowered.find(marker)
+        while index != -1:
+            offsets.append(index)
+            line_end = lowered.find("\n", index)
+            if line_end == -1:
+                break
+            index = lowered.find(marker, line_end + 1)
+    offsets.sort()
+    return offsets
+
+
+def marker_line_indices(lines: Sequence[str], *marker_groups: Sequence[str]) -> list[list[int]]:
+    # One join and lower() per block serves every marker group.
     if not lines:
-        return ""
-    marker_index = find_failure_index(lines)
-    if marker_index is None:
-        return "\n".join(lines[-max_lines:])
-
-    start = max(0, marker_index - context)
-    end = min(len(lines), marker_index + context + 1)
-    window = lines[start:end]
-    if len(window) > max_lines:
-        window = window[-max_lines:]
-    return "\n".join(window)
-
-
-def find_failure_index(lines: Sequence[str]) -> int | None:
-    for index in range(len(lines) - 1, -1, -1):
-        lowered = lines[index].lower()
-        if any(marker in lowered for marker in FAILURE_MARKERS):
-            return index
-    return None
+        return [[] for _ in marker_groups]
+    block = "\n".join(lines)
+    lowered = block.lower()
+    if len(lowered) != len(block):
+        # Rare case-mappings change string length; fall back to per-line checks.
+        return [[index for index, line in enumerate(lines) if is_failure_line(line, markers)] for markers in marker_groups]
+    starts: list[int] | None = None
+    results: list[list[int]] = []
+    for markers in marker_groups:
+        offsets = scan_marker_offsets(lowered, markers)
+        if not offsets:
+            results.append([])
+            continue
+        if starts is None:
+            starts = list(accumulate((len(line) + 1 for line in lines), initial=0))
+        results.append(sorted({bisect_right(starts, offset) - 1 for offset in offsets}))
+    return results
 
 
 def tail_lines(text: str, max_lines: int) -> str:
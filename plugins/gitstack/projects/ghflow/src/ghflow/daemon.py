@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import socket
+import sys
+import tempfile
+import traceback
+from pathlib import Path
+from typing import Any, Callable
+
+from . import warm
+
+
+DEFAULT_IDLE_TIMEOUT_SECONDS = 1800
+SOCKET_ENV = "GHFLOW_SOCKET"
+# Commands that change GitHub state. They run in the caller's own process and
+# then drop the daemon's warm cache.
+MUTATING_COMMANDS = {
+    ("stars", "add"),
+    ("stars", "remove"),
+    ("stars", "lists", "delete"),
+    ("stars", "lists", "assign"),
+    ("stars", "lists", "unassign"),
+    ("publish", "open"),
+}
+
+
+class DaemonError(Exception):
+    def __init__(self, message: str, exit_code: int = 1):
+        super().__init__(message)
+        self.message = message
+        self.exit_code = exit_code
+
+
+def default_socket_path() -> Path:
+    override = os.environ.get(SOCKET_ENV)
+    if override:
+        return Path(override).expanduser()
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    owner = os.getuid() if hasattr(os, "getuid") else "user"
+    return Path(runtime_dir) / f"ghflow-{owner}.sock"
+
+
+def command_words(argv: list[str]) -> list[str]:
+    return argv[1:] if argv[:1] == ["--json"] else argv
+
+
+def option_names(words: list[str]) -> set[str]:
+    return {word.split("=", 1)[0] for word in words if word.startswith("--")}
+
+
+def is_mutating(argv: list[str]) -> bool:
+    words = command_words(argv)
+    if words[:2] == ["reviews", "address"]:
+        names = option_names(words)
+        return "--reply-body" in names and "--dry-run" not in names
+    return any(tuple(words[: len(path)]) == path for path in MUTATING_COMMANDS)
+
+
+def runs_locally(argv: list[str]) -> bool:
+    # The daemon serves one request at a time, so a watch loop or a slow
+    # mutation would hold up every other client.
+    return "--watch" in option_names(command_words(argv)) or is_mutating(argv)
+
+
+def client_mode() -> bool:
+    # Client mode is opt-in through GHFLOW_SOCKET and never used by the daemon
+    # itself.
+    return warm.ACTIVE is None and bool(os.environ.get(SOCKET_ENV)) and hasattr(socket, "AF_UNIX")
+
+
+def should_forward(argv: list[str]) -> bool:
+    return client_mode() and command_words(argv)[:1] != ["daemon"] and not runs_locally(argv)
+
+
+def clears_warm_cache(argv: list[str]) -> bool:
+    return client_mode() and is_mutating(argv)
+
+
+def clear_warm_cache(socket_path: Path | None = None) -> None:
+    with contextlib.suppress(OSError, ValueError):
+        control("clear", socket_path or default_socket_path())
+
+
+def connect(socket_path: Path) -> socket.socket | None:
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(str(socket_path))
+    except OSError:
+        client.close()
+        return None
+    return client
+
+
+def send_frame(conn: socket.socket, frame: dict[str, Any]) -> None:
+    conn.sendall((json.dumps(frame) + "\n").encode("utf-8"))
+
+
+def forward(argv: list[str], socket_path: Path | None = None, *, version: str) -> int | None:
+    # Returns None when no daemon answers or the daemon runs another ghflow
+    # version, so the caller runs in-process.
+    conn = connect(socket_path or default_socket_path())
+    if conn is None:
+        return None
+    streams = {1: sys.stdout, 2: sys.stderr}
+    wrote = False
+    with conn:
+        try:
+            send_frame(conn, {"argv": argv, "cwd": os.getcwd(), "env": dict(os.environ), "version": version})
+            with conn.makefile("r", encoding="utf-8", newline="\n") as reader:
+                for line in reader:
+                    frame = json.loads(line)
+                    if "fallback" in frame:
+                        return None
+                    if "exit" in frame:
+                        return int(frame["exit"])
+                    stream = streams[1] if frame.get("fd") == 1 else streams[2]
+                    stream.write(frame.get("data", ""))
+                    stream.flush()
+                    wrote = True
+        except (OSError, ValueError):
+            # A daemon that crashed or sent a truncated frame is handled like
+            # one that hung up.
+            pass
+    # Mutating commands never reach the daemon, so a command that has not
+    # printed anything yet can safely run again in-process.
+    if not wrote:
+        return None
+    print("ghflow daemon connection lost before the command finished.", file=sys.stderr)
+    return 1
+
+
+def control(command: str, socket_path: Path) -> dict[str, Any] | None:
+    conn = connect(socket_path)
+    if conn is None:
+        return None
+    with conn:
+        send_frame(conn, {"control": command})
+        with conn.makefile("r", encoding="utf-8", newline="\n") as reader:
+            line = reader.readline()
+    return json.loads(line) if line else None
+
+
+class FrameWriter(io.TextIOBase):
+    # Text stream that forwards every write to the client as it happens, so
+    # streamed output (ci inspect --watch) arrives incrementally.
+    def __init__(self, conn: socket.socket, fd: int):
+        self._conn = conn
+        self._fd = fd
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: str) -> int:
+        if data:
+            send_frame(self._conn, {"fd": self._fd, "data": data})
+        return len(data)
+
+
+def run_request(request: dict[str, Any], conn: socket.socket, entry: Callable[[list[str]], int]) -> int:
+    # cwd, environment and stdio are process-wide, so requests run one at a
+    # time and every change is undone afterwards.
+    saved_cwd = os.getcwd()
+    saved_env = dict(os.environ)
+    argv = [str(item) for item in request.get("argv") or []]
+    try:
+        os.chdir(str(request.get("cwd") or saved_cwd))
+        os.environ.clear()
+        os.environ.update({str(key): str(value) for key, value in (request.get("env") or {}).items()})
+        with contextlib.redirect_stdout(FrameWriter(conn, 1)), contextlib.redirect_stderr(FrameWriter(conn, 2)):
+            try:
+                returncode = int(entry(argv))
+            except SystemExit as exc:
+                returncode = int(exc.code) if isinstance(exc.code, int) else 1
+            except Exception:
+                traceback.print_exc()
+                returncode = 1
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+        os.chdir(saved_cwd)
+    return returncode
+
+
+def serve(
+    socket_path: Path,
+    entry: Callable[[list[str]], int],
+    *,
+    version: str,
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+    ttl: float = warm.DEFAULT_TTL_SECONDS,
+    on_ready: Callable[[], None] | None = None,
+) -> int:
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonError("ghflow daemon needs Unix domain sockets, which this platform lacks.", 69)
+    probe = connect(socket_path)
+    if probe is not None:
+        probe.close()
+        raise DaemonError(f"A ghflow daemon is already listening on {socket_path}.", 75)
+    with contextlib.suppress(FileNotFoundError):
+        socket_path.unlink()
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    previous_cache = warm.ACTIVE
+    warm.ACTIVE = warm.WarmCache(ttl)
+    try:
+        # The socket accepts commands with the caller's environment, so only
+        # the owning user may connect.
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(str(socket_path))
+        finally:
+            os.umask(old_umask)
+        server.listen()
+        server.settimeout(idle_timeout if idle_timeout > 0 else None)
+        if on_ready is not None:
+            on_ready()
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                return 0
+            with conn:
+                conn.settimeout(None)
+                try:
+                    with conn.makefile("r", encoding="utf-8", newline="\n") as reader:
+                        request = json.loads(reader.readline() or "{}")
+                    if request.get("control") == "stop":
+                        send_frame(conn, {"exit": 0, "pid": os.getpid(), "version": version})
+                        return 0
+                    if request.get("control") in {"ping", "clear"}:
+                        if request["control"] == "clear":
+                            warm.ACTIVE.clear()
+                        send_frame(conn, {"exit": 0, "pid": os.getpid(), "version": version})
+                        continue
+                    if request.get("version") != version:
+                        # The code loaded at startup would answer for another
+                        # release; the client runs the command itself.
+                        send_frame(conn, {"fallback": "version", "version": version})
+                        continue
+                    returncode = run_request(request, conn, entry)
+                    send_frame(conn, {"exit": returncode})
+                except (OSError, ValueError):
+                    # A client that hung up or sent garbage only loses its own request.
+                    continue
+    finally:
+        warm.ACTIVE = previous_cache
+        server.close()
+        with contextlib.suppress(OSError):
+            socket_path.unlink()
@@ -4,6 +4,7 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+from . import repo_metadata
 from .user_state import (
     GhError,
     collect_repo_targets,
@@ -12,6 +13,7 @@ from .user_state import (
     repo_memberships,
     repo_view,
     resolve_list,
+    starred_flags,
     viewer_lists,
 )
 
@@ -176,19 +178,22 @@ def _run_membership(args: argparse.Namespace, assign: bool) -> int:
         raise GhError("At least one target repository is required.", 64)
 
     resolved_repos: list[dict[str, object]] = []
+    unknown_starred: dict[str, str] = {}
     results: list[dict[str, object]] = []
     failure_count = 0
 
     for repo in repos:
         result: dict[str, object] = {"repo": repo}
         try:
-            repo_payload = repo_view(repo)
+            repo_payload = repo_view(repo, refresh=args.refresh)
             repo_record = {
                 "repo": str(repo_payload["nameWithOwner"]),
                 "repoId": str(repo_payload["id"]),
                 "url": repo_payload.get("url"),
-                "viewerHasStarred": bool(repo_payload.get("viewerHasStarred")),
+                "viewerHasStarred": repo_payload.get("viewerHasStarred"),
             }
+            if repo_record["viewerHasStarred"] is None:
+                unknown_starred[repo_record["repoId"]] = repo
             resolved_repos.append(repo_record)
             result.update(repo_record)
         except GhError as exc:
@@ -197,6 +202,15 @@ def _run_membership(args: argparse.Namespace, assign: bool) -> int:
             result["message"] = str(exc)
         results.append(result)
 
+    # Ids come from the day-long metadata cache; starred flags past their
+    # shorter TTL are checked in one batched query instead of a repo view each.
+    if unknown_starred:
+        flags = starred_flags(unknown_starred)
+        for item in resolved_repos:
+            if item["viewerHasStarred"] is None:
+                item["viewerHasStarred"] = flags.get(item["repoId"], False)
+                repo_metadata.set_starred(unknown_starred[item["repoId"]], item["viewerHasStarred"])
+
     memberships = repo_memberships([item["repoId"] for item in resolved_repos])
     repo_index = {item["repo"]: item for item in resolved_repos}
 
@@ -205,6 +219,7 @@ def _run_membership(args: argparse.Namespace, assign: bool) -> int:
         if result.get("status") == "error" or not isinstance(repo_name, str):
             continue
         repo_record = repo_index[repo_name]
+        result["viewerHasStarred"] = repo_record["viewerHasStarred"]
         current_lists = memberships.get(repo_record["repoId"], [])
         current_list_ids = [str(item["id"]) for item in current_lists if isinstance(item, dict) and item.get("id")]
         target_list_id = str(selected_list["id"])
@@ -284,6 +299,7 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--all", action="store_true", help="Fetch all available items for read actions.")
     parser.add_argument("--json", action="store_true", help="Emit normalized JSON output.")
     parser.add_argument("--dry-run", action="store_true", help="Preview write actions without mutating GitHub.")
+    parser.add_argument("--refresh", action="store_true", help="Refetch cached repository metadata for assign and unassign.")
     return parser
 
 
@@ -293,6 +309,9 @@ def _ensure_selector(args: argparse.Namespace) -> None:
 
 
 def _validate_args(args: argparse.Namespace) -> None:
+    if args.refresh and not (args.assign or args.unassign):
+        raise GhError("--refresh is only valid with --assign and --unassign.", 64)
+
     if args.list_lists:
         if args.list or args.list_id or args.repo or args.repos_file:
             raise GhError("--list-lists only supports read flags.", 64)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterator, TextIO
+
+from .state import user_cache_dir
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+SETTLED_CONCLUSIONS = {
+    "success",
+    "failure",
+    "cancelled",
+    "timed_out",
+    "action_required",
+    "neutral",
+    "skipped",
+    "stale",
+    "startup_failure",
+}
+
+
+def iter_line_blocks(handle: TextIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[list[str]]:
+    # Yields str.splitlines() parts in blocks. Chunks are cut after the last
+    # "\n", which is always a line boundary, so the concatenated blocks equal
+    # splitlines() of the whole text without ever holding it in memory.
+    pending = ""
+    while True:
+        chunk = handle.read(chunk_size)
+        if not chunk:
+            break
+        chunk = pending + chunk
+        cut = chunk.rfind("\n") + 1
+        if cut == 0:
+            pending = chunk
+            continue
+        pending = chunk[cut:]
+        yield chunk[:cut].splitlines()
+    if pending:
+        yield pending.splitlines()
+
+
+def iter_record_blocks(handle: TextIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[list[str]]:
+    # Cache entries store one line per "\n"-terminated record. Splitting on
+    # "\n" alone keeps lines that contain other splitlines() boundaries
+    # (\x0c, \x1c-\x1e, \x85, \u2028, ...) intact across a round-trip.
+    pending = ""
+    while True:
+        chunk = handle.read(chunk_size)
+        if not chunk:
+            break
+        chunk = pending + chunk
+        cut = chunk.rfind("\n") + 1
+        if cut == 0:
+            pending = chunk
+            continue
+        pending = chunk[cut:]
+        yield chunk[: cut - 1].split("\n")
+    if pending:
+        yield [pending]
+
+
+def is_settled_run(metadata: dict[str, Any] | None) -> bool:
+    if not metadata:
+        return False
+    status = str(metadata.get("status") or "").strip().lower()
+    conclusion = str(metadata.get("conclusion") or "").strip().lower()
+    return status == "completed" and conclusion in SETTLED_CONCLUSIONS
+
+
+class LogCacheWriter:
+    # Streams one entry into a temp file next to its final path; commit()
+    # publishes it with an atomic replace, discard() drops it.
+    def __init__(self, cache: LogCache, path: Path, metadata: dict[str, Any]):
+        self.cache = cache
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self._temp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".tmp")
+        self._raw = os.fdopen(fd, "wb")
+        self._handle = gzip.open(self._raw, "wt", encoding="utf-8", newline="\n")
+        self._handle.write(json.dumps(metadata) + "\n")
+
+    def write_lines(self, lines: list[str]) -> None:
+        if lines:
+            self._handle.write("\n".join(lines))
+            self._handle.write("\n")
+
+    def _close(self) -> None:
+        with contextlib.suppress(OSError):
+            self._handle.close()
+        with contextlib.suppress(OSError):
+            self._raw.close()
+
+    def commit(self) -> None:
+        try:
+            self._close()
+            size = os.path.getsize(self._temp_name)
+            if size > self.cache.max_bytes:
+                self.discard()
+                return
+            try:
+                replaced = os.path.getsize(self.path)
+            except OSError:
+                replaced = 0
+            os.replace(self._temp_name, self.path)
+            self.cache.added(size - replaced)
+        except OSError:
+            self.discard()
+
+    def discard(self) -> None:
+        self._close()
+        with contextlib.suppress(OSError):
+            os.unlink(self._temp_name)
+
+
+class LogCache:
+    # Completed job logs never change, so entries are addressed by a hash of
+    # repo/run_id/job_id and evicted least-recently-used once the cap is hit.
+    def __init__(self, root: Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = (root or user_cache_dir()) / "logs"
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Running total of entry sizes, scanned once per process and then
+        # kept up to date by commits, so eviction only walks the directory
+        # when a write pushes the cache past its cap.
+        self._total: int | None = None
+
+    def entry_path(self, repo: str, run_id: str, job_id: str) -> Path:
+        digest = hashlib.sha256(f"{repo}/{run_id}/{job_id}".encode()).hexdigest()
+        return self.root / digest[:2] / f"{digest}.gz"
+
+    def read(
+        self,
+        repo: str,
+        run_id: str,
+        job_id: str,
+        on_lines: Callable[[list[str]], None],
+    ) -> dict[str, Any] | None:
+        path = self.entry_path(repo, run_id, job_id)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8", newline="\n") as handle:
+                metadata = json.loads(handle.readline())
+                if not isinstance(metadata, dict):
+                    return None
+                for lines in iter_record_blocks(handle):
+                    on_lines(lines)
+        except (OSError, EOFError, ValueError):
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return metadata
+
+    def writer(self, repo: str, run_id: str, job_id: str, metadata: dict[str, Any]) -> LogCacheWriter | None:
+        try:
+            return LogCacheWriter(self, self.entry_path(repo, run_id, job_id), metadata)
+        except OSError:
+            return None
+
+    def put(self, repo: str, run_id: str, job_id: str, metadata: dict[str, Any], log_text: str) -> None:
+        writer = self.writer(repo, run_id, job_id, metadata)
+        if writer is None:
+            return
+        writer.write_lines(log_text.splitlines())
+        writer.commit()
+
+    def entries(self) -> list[tuple[float, int, Path]]:
+        entries: list[tuple[float, int, Path]] = []
+        for path in self.root.glob("*/*.gz"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def added(self, delta: int) -> None:
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self.entries())
+            else:
+                self._total += delta
+            over = self._total > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self) -> None:
+        with self._lock:
+            # Other processes share the directory, so the real sizes are
+            # rescanned before anything is deleted.
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+            self._total = total
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+
+REPO_PATTERN = re.compile(r"^[^/\s]+/[^/\s]+$")
+STATE_NAME = "repo-context"
+MAX_CACHED_CHECKOUTS = 64
+CONFIG_PATTERN = re.compile(r"remote\.origin\.url|branch\..*\.(remote|merge)|url\..*\.insteadof")
+# Any of these (and GIT_CONFIG_KEY_<n>/GIT_CONFIG_VALUE_<n>) changes what git
+# itself would discover or read, so they become part of the cache key.
+GIT_OVERRIDE_ENV = ("GIT_DIR", "GIT_WORK_TREE", "GIT_COMMON_DIR", "GIT_CONFIG", "GIT_CONFIG_PARAMETERS", "GIT_CONFIG_COUNT", "GIT_CONFIG_GLOBAL", "GIT_CONFIG_SYSTEM", "GIT_CONFIG_NOSYSTEM", "GIT_CEILING_DIRECTORIES")
+
+_MEMO: dict[tuple[str, ...], dict[str, Any]] = {}
+_LOCATED: dict[tuple[str, ...], tuple[Path, Path]] = {}
+
+
+@dataclass(frozen=True)
+class RepoContext:
+    root: Path
+    git_dir: Path
+    origin_url: str | None
+    repo: str | None
+    branch: str | None
+    branches: dict[str, tuple[str | None, str | None]] = field(default_factory=dict)
+
+    def upstream(self, branch: str | None = None) -> tuple[str | None, str | None]:
+        # Tracking remote and remote branch name, from branch.<name>.remote/merge.
+        name = branch if branch is not None else self.branch
+        if not name:
+            return None, None
+        return self.branches.get(name, (None, None))
+
+
+def is_repo_reference(value: str) -> bool:
+    return bool(REPO_PATTERN.fullmatch(value))
+
+
+def normalize_remote_url(remote: str | None) -> str | None:
+    if not remote:
+        return None
+    repo = re.sub(r"^git@[^:]+:", "", remote)
+    repo = re.sub(r"^https?://[^/]+/", "", repo)
+    repo = re.sub(r"^ssh://[^/]+/", "", repo)
+    repo = re.sub(r"^git://[^/]+/", "", repo)
+    repo = re.sub(r"\.git$", "", repo)
+    repo = repo.rstrip("/")
+    if REPO_PATTERN.fullmatch(repo):
+        return repo
+    return None
+
+
+def run_git(args: list[str], cwd: Path) -> subprocess.CompletedProcess[str] | None:
+    try:
+        return subprocess.run(["git", *args], cwd=cwd, text=True, capture_output=True)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def find_checkout(start: Path) -> tuple[Path, Path] | None:
+    # Mirrors git's upward search for .git (a directory, or a gitdir: file for
+    # worktrees and submodules) without starting a process.
+    for directory in (start, *start.parents):
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            return directory, dot_git
+        if dot_git.is_file():
+            try:
+                text = dot_git.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None
+            if not text.startswith("gitdir:"):
+                return None
+            return directory, (directory / text[len("gitdir:") :].strip()).resolve()
+    return None
+
+
+def common_dir(git_dir: Path) -> Path:
+    try:
+        return (git_dir / (git_dir / "commondir").read_text(encoding="utf-8").strip()).resolve()
+    except OSError:
+        return git_dir
+
+
+def override_env() -> tuple[str, ...]:
+    return tuple(
+        f"{name}={value}"
+        for name, value in sorted(os.environ.items())
+        if value and (name in GIT_OVERRIDE_ENV or name.startswith(("GIT_CONFIG_KEY_", "GIT_CONFIG_VALUE_")))
+    )
+
+
+def config_files(git_dir: Path) -> list[Path]:
+    # Files git reads whether or not they exist yet. Included files and a
+    # system config outside /etc are added from the origins git reports.
+    files = [common_dir(git_dir) / "config", git_dir / "config.worktree"]
+    if os.environ.get("GIT_CONFIG_GLOBAL"):
+        files.append(Path(os.environ["GIT_CONFIG_GLOBAL"]).expanduser())
+    else:
+        home = Path.home()
+        xdg = Path(os.environ["XDG_CONFIG_HOME"]) if os.environ.get("XDG_CONFIG_HOME") else home / ".config"
+        files.extend((home / ".gitconfig", xdg / "git" / "config"))
+    if not os.environ.get("GIT_CONFIG_NOSYSTEM"):
+        files.append(Path(os.environ.get("GIT_CONFIG_SYSTEM") or "/etc/gitconfig").expanduser())
+    return files
+
+
+def config_stamps(paths: Iterable[str]) -> dict[str, str]:
+    stamps = {}
+    for path in paths:
+        try:
+            stamps[path] = str(Path(path).stat().st_mtime_ns)
+        except OSError:
+            stamps[path] = "-"
+    return stamps
+
+
+def current_stamps(stamps: dict[str, str], git_dir: Path) -> dict[str, str]:
+    # Remote and tracking settings only change through config files, so their
+    # mtimes decide whether a cached entry is still valid. includeIf.onbranch
+    # also depends on the checked-out branch.
+    current = config_stamps(path for path in stamps if path != "HEAD")
+    if "HEAD" in stamps:
+        current["HEAD"] = head_branch(git_dir) or ""
+    return current
+
+
+def read_config(cwd: Path) -> dict[str, Any] | None:
+    located = run_git(["rev-parse", "--show-toplevel", "--absolute-git-dir"], cwd)
+    if located is None or located.returncode != 0:
+        return None
+    lines = located.stdout.splitlines()
+    if len(lines) < 2:
+        return None
+    # The full listing names every file that contributed a setting, including
+    # include.path and includeIf targets.
+    config = run_git(["config", "-z", "--show-origin", "--list"], cwd)
+    fields = (config.stdout if config is not None and config.returncode == 0 else "").split("\0")
+    values: list[tuple[str, str]] = []
+    origins: set[str] = set()
+    branch_includes = False
+    for origin, record in zip(fields[0::2], fields[1::2]):
+        key, _, config_value = record.partition("\n")
+        if origin.startswith("file:"):
+            # git reports repository files relative to the top level.
+            origins.add(str(Path(lines[0]) / origin[len("file:") :]))
+        if key.startswith("includeif.onbranch:"):
+            branch_includes = True
+        if CONFIG_PATTERN.fullmatch(key):
+            values.append((key, config_value))
+    origin_url = None
+    rewrites: dict[str, str] = {}
+    branches: dict[str, list[str | None]] = {}
+    for key, config_value in values:
+        if key == "remote.origin.url":
+            origin_url = config_value
+        elif key.startswith("url.") and key.endswith(".insteadof"):
+            rewrites[config_value] = key[len("url.") : -len(".insteadof")]
+        elif key.startswith("branch."):
+            name, _, setting = key[len("branch.") :].rpartition(".")
+            entry = branches.setdefault(name, [None, None])
+            if setting == "remote":
+                entry[0] = config_value or None
+            else:
+                entry[1] = config_value.removeprefix("refs/heads/") or None
+    if origin_url:
+        # `git remote get-url` applies the longest matching url.<base>.insteadOf.
+        matches = [prefix for prefix in rewrites if origin_url.startswith(prefix)]
+        if matches:
+            prefix = max(matches, key=len)
+            origin_url = rewrites[prefix] + origin_url[len(prefix) :]
+    return {
+        "root": lines[0],
+        "gitDir": lines[1],
+        "originUrl": origin_url,
+        "branches": branches,
+        "configFiles": sorted(origins),
+        "branchIncludes": branch_includes,
+    }
+
+
+def head_branch(git_dir: Path) -> str | None:
+    # None for a detached or unborn HEAD, like `git rev-parse --abbrev-ref HEAD`.
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if not head.startswith("ref: refs/heads/"):
+        return None
+    ref = head[len("ref: ") :]
+    shared = common_dir(git_dir)
+    if (shared / ref).is_file() or (shared / "reftable").is_dir():
+        return ref[len("refs/heads/") :]
+    try:
+        packed = (shared / "packed-refs").read_text(encoding="utf-8")
+    except OSError:
+        return None
+    return ref[len("refs/heads/") :] if f" {ref}\n" in packed + "\n" else None
+
+
+def load_cached(key: tuple[str, ...], cwd: Path, git_dir: Path, *, persist: bool) -> dict[str, Any] | None:
+    from .state import read_state
+
+    cached = _MEMO.get(key)
+    if cached is None and persist:
+        stored = read_state(STATE_NAME).get(str(cwd))
+        if isinstance(stored, dict) and stored.get("key") == list(key):
+            cached = stored
+    if cached is None or not isinstance(cached.get("stamps"), dict) or current_stamps(cached["stamps"], git_dir) != cached["stamps"]:
+        return None
+    _MEMO[key] = cached
+    return cached["context"]
+
+
+def store_cached(key: tuple[str, ...], cwd: Path, entry: dict[str, Any], stamps: dict[str, str], *, persist: bool) -> None:
+    from .state import read_state, write_state
+
+    cached = {"key": list(key), "stamps": stamps, "context": entry}
+    _MEMO[key] = cached
+    if not persist:
+        return
+    state = read_state(STATE_NAME)
+    state.pop(str(cwd), None)
+    state[str(cwd)] = cached
+    while len(state) > MAX_CACHED_CHECKOUTS:
+        state.pop(next(iter(state)))
+    write_state(STATE_NAME, state)
+
+
+def load(cwd: Path | None = None, *, use_cache: bool = True) -> RepoContext | None:
+    # Resolves owner/repo, root, branch and tracking config for the checkout
+    # around cwd, or None outside one. Cached entries cost no git process.
+    cwd = (cwd or Path.cwd()).resolve()
+    overrides = override_env()
+    # With GIT_* overrides only git knows which checkout and config apply, so
+    # its answer is remembered for this process and never written to disk.
+    overridden = bool(overrides)
+    located = _LOCATED.get((str(cwd), *overrides)) if overridden else find_checkout(cwd)
+    if located is None and not overridden:
+        return None
+    entry = None
+    if use_cache and located is not None:
+        entry = load_cached((str(cwd), *map(str, located), *overrides), cwd, located[1], persist=not overridden)
+    if entry is None:
+        stamps = config_stamps(str(path) for path in config_files(located[1])) if located is not None else {}
+        entry = read_config(cwd)
+        if entry is None:
+            return None
+        if located is None:
+            located = (Path(entry["root"]), Path(entry["gitDir"]))
+            _LOCATED[(str(cwd), *overrides)] = located
+            stamps = config_stamps(str(path) for path in config_files(located[1]))
+        stamps.update(config_stamps(path for path in entry["configFiles"] if path not in stamps))
+        if entry["branchIncludes"]:
+            stamps["HEAD"] = head_branch(located[1]) or ""
+        if use_cache:
+            store_cached((str(cwd), *map(str, located), *overrides), cwd, entry, stamps, persist=not overridden)
+    git_dir = Path(entry["gitDir"])
+    branches = {name: (values[0], values[1]) for name, values in (entry.get("branches") or {}).items()}
+    return RepoContext(
+        root=Path(entry["root"]),
+        git_dir=git_dir,
+        origin_url=entry.get("originUrl"),
+        repo=normalize_remote_url(entry.get("originUrl")),
+        branch=head_branch(git_dir),
+        branches=branches,
+    )
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import time
+from typing import Any
+
+
+STATE_NAME = "repo-metadata"
+# Node id, url and default branch almost never change; the starred flag is
+# viewer state that changes outside ghflow, so it goes stale much sooner.
+METADATA_TTL_SECONDS = 24 * 60 * 60
+STARRED_TTL_SECONDS = 5 * 60
+MAX_CACHED_REPOS = 512
+VIEW_FIELDS = "id,nameWithOwner,url,viewerHasStarred,defaultBranchRef"
+
+
+def cache_key(repo: str) -> str:
+    # GitHub owner and repo names are case-insensitive. viewerHasStarred and
+    # private repo visibility depend on the viewer, so entries are per
+    # credentials.
+    from .transport import credentials_key
+
+    return f"{credentials_key()}|{repo.lower()}"
+
+
+def lookup(repo: str, *, now: float | None = None) -> dict[str, Any] | None:
+    # Returns the cached entry while its metadata is fresh. viewerHasStarred
+    # is dropped from the result once the shorter starred TTL has passed.
+    from .state import read_state
+
+    now = time.time() if now is None else now
+    entry = read_state(STATE_NAME).get(cache_key(repo))
+    if not isinstance(entry, dict) or now - float(entry.get("fetchedAt") or 0) > METADATA_TTL_SECONDS:
+        return None
+    result = dict(entry)
+    if now - float(result.get("starredAt") or 0) > STARRED_TTL_SECONDS:
+        result.pop("viewerHasStarred", None)
+    return result
+
+
+def record(repo: str, payload: dict[str, Any], *, now: float | None = None) -> dict[str, Any]:
+    # Stores a `gh repo view --json VIEW_FIELDS` payload and returns the entry.
+    now = time.time() if now is None else now
+    entry: dict[str, Any] = {
+        "id": payload.get("id"),
+        "nameWithOwner": payload.get("nameWithOwner"),
+        "url": payload.get("url"),
+        "defaultBranch": (payload.get("defaultBranchRef") or {}).get("name") or "",
+        "fetchedAt": now,
+    }
+    if "viewerHasStarred" in payload:
+        entry["viewerHasStarred"] = bool(payload["viewerHasStarred"])
+        entry["starredAt"] = now
+    update(repo, entry)
+    return entry
+
+
+def set_starred(repo: str, starred: bool, *, now: float | None = None) -> None:
+    # Keeps the starred flag current after ghflow itself stars or unstars.
+    from .state import read_state
+
+    state = read_state(STATE_NAME)
+    entry = state.get(cache_key(repo))
+    if isinstance(entry, dict):
+        update(repo, {**entry, "viewerHasStarred": starred, "starredAt": time.time() if now is None else now})
+
+
+def update(repo: str, entry: dict[str, Any]) -> None:
+    # Read-modify-write of one small JSON file, published with an atomic
+    # replace. Concurrent writers can drop each other's entries, which only
+    # costs a refetch.
+    from .state import read_state, write_state
+
+    state = read_state(STATE_NAME)
+    state.pop(cache_key(repo), None)
+    state[cache_key(repo)] = entry
+    while len(state) > MAX_CACHED_REPOS:
+        state.pop(next(iter(state)))
+    write_state(STATE_NAME, state)
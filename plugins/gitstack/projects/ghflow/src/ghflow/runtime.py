@@ -4,18 +4,20 @@ from __future__ import annotations
 import contextlib
 import io
 import json
+import os
 import re
 import subprocess
 import sys
-import tomllib
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Callable
 
-from . import checks
-from . import lists_cli
-from . import stars_cli
-from . import user_state
+from . import repo_context
+from . import repo_metadata
+from . import transport
+from . import warm
+from .repo_context import normalize_remote_url
 
 
 HOST = "github.com"
@@ -26,6 +28,16 @@ PYPROJECT_PATH = PROJECT_DIR / "pyproject.toml"
 
 
 def load_version() -> str:
+    # Zipapp builds bake the version into ghflow/_version.py; only source
+    # checkouts pay for parsing pyproject.toml.
+    try:
+        from ._version import VERSION as baked_version
+    except ImportError:
+        baked_version = ""
+    if baked_version:
+        return baked_version
+    import tomllib
+
     candidates = [PYPROJECT_PATH]
     argv0 = Path(sys.argv[0]).resolve()
     if argv0.name == "ghflow":
@@ -40,8 +52,10 @@ def load_version() -> str:
 
 
 VERSION = load_version()
-REPO_PATTERN = re.compile(r"^[^/\s]+/[^/\s]+$")
 TOKEN_RE = re.compile(r"[a-z0-9]+")
+PAGE_SIZE = 100
+PAGE_FETCH_WORKERS = 4
+LINK_LAST_PAGE_RE = re.compile(r'<[^>]*[?&]page=(\d+)[^>]*>\s*;\s*rel="last"')
 
 
 @dataclass(frozen=True)
@@ -59,6 +73,8 @@ class CommandResponse:
     error_code: str | None = None
     error_message: str | None = None
     error_retry: str | None = None
+    # Set when the handler already wrote its output incrementally (JSON lines).
+    streamed: bool = False
 
 
 @dataclass(frozen=True)
@@ -69,6 +85,19 @@ class OptionSpec:
     default: Any = None
 
 
+@dataclass(frozen=True)
+class GitStatusProbe:
+    branch: str | None
+    upstream_remote: str | None
+    upstream_branch: str | None
+    ahead: int
+    behind: int
+    staged: int
+    unstaged: int
+    untracked: int
+    total: int
+
+
 CommandHandler = Callable[["CommandSpec", list[str], bool], CommandResponse]
 
 
@@ -107,6 +136,24 @@ def value(dest: str, *, default: Any = None, multiple: bool = False) -> OptionSp
 
 def main(argv: list[str] | None = None) -> int:
     argv = list(sys.argv[1:] if argv is None else argv)
+    # Command modules are imported by their handlers, so `--version`, help and
+    # publish commands never load the CI or stars code.
+    if os.environ.get("GHFLOW_SOCKET"):
+        from . import daemon
+
+        if daemon.should_forward(argv):
+            forwarded = daemon.forward(argv, version=VERSION)
+            if forwarded is not None:
+                return forwarded
+        elif daemon.clears_warm_cache(argv):
+            try:
+                return run_command(argv)
+            finally:
+                daemon.clear_warm_cache()
+    return run_command(argv)
+
+
+def run_command(argv: list[str]) -> int:
     try:
         parsed = parse_root_args(argv)
         if parsed["mode"] == "help":
@@ -132,6 +179,8 @@ def main(argv: list[str] | None = None) -> int:
         response = spec.handler(spec, parsed["tail"], parsed["json"])
         if response.result.returncode != 0 and not response.allow_nonzero:
             raise build_runtime_error(response.result, command_path)
+        if response.streamed:
+            return response.result.returncode
 
         if parsed["json"]:
             data = parse_output(response.result.stdout, response.output_kind)
@@ -395,7 +444,7 @@ def json_response(payload: object) -> CommandResponse:
 
 
 def run_gh_text(args: list[str], *, cwd: Path | None = None, input_text: str | None = None) -> RunResult:
-    return run(["gh", *args], cwd=cwd, input_text=input_text)
+    return RunResult(*transport.run_gh(args, cwd=cwd, input_text=input_text))
 
 
 def run_git_text(args: list[str], *, cwd: Path | None = None) -> RunResult:
@@ -417,6 +466,67 @@ def gh_json(args: list[str], *, command_path: tuple[str, ...], cwd: Path | None
         ) from exc
 
 
+def split_http_response(stdout: str) -> tuple[dict[str, str], str]:
+    # `gh api -i` prints the status line and headers, a blank line, then the body.
+    normalized = stdout.replace("\r\n", "\n")
+    head, separator, body = normalized.partition("\n\n")
+    if not separator or not head.startswith("HTTP/"):
+        return {}, stdout
+    headers: dict[str, str] = {}
+    for line in head.splitlines()[1:]:
+        name, colon, header_value = line.partition(":")
+        if colon:
+            headers[name.strip().lower()] = header_value.strip()
+    return headers, body
+
+
+def last_page_from_link(link: str) -> int | None:
+    for part in link.split(","):
+        match = LINK_LAST_PAGE_RE.search(part)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def gh_api_page(
+    endpoint: str,
+    page: int,
+    *,
+    command_path: tuple[str, ...],
+    fields: dict[str, str] | None = None,
+    headers: list[str] | None = None,
+    include_headers: bool = False,
+) -> tuple[list[dict[str, Any]], int, dict[str, str]]:
+    args = ["api", endpoint, "-X", "GET", "-F", f"per_page={PAGE_SIZE}", "-F", f"page={page}"]
+    for key, value in (fields or {}).items():
+        args.extend(["-F", f"{key}={value}"])
+    for header in headers or []:
+        args.extend(["-H", header])
+    if include_headers:
+        args.append("-i")
+    result = run_gh_text(args)
+    if result.returncode != 0:
+        raise build_runtime_error(result, command_path)
+    response_headers, body = split_http_response(result.stdout) if include_headers else ({}, result.stdout)
+    try:
+        payload = json.loads(body or "null")
+    except json.JSONDecodeError as exc:
+        raise GhflowError(
+            f"Failed to parse JSON output for {' '.join(command_path)}: {exc}",
+            code="command_failed",
+            exit_code=1,
+            command_path=command_path,
+        ) from exc
+    if not isinstance(payload, list):
+        raise GhflowError(
+            f"Unexpected response shape for {' '.join(command_path)}.",
+            code="command_failed",
+            exit_code=1,
+            command_path=command_path,
+        )
+    return [item for item in payload if isinstance(item, dict)], len(payload), response_headers
+
+
 def gh_api_paginated_list(
     endpoint: str,
     *,
@@ -424,28 +534,38 @@ def gh_api_paginated_list(
     fields: dict[str, str] | None = None,
     headers: list[str] | None = None,
 ) -> list[dict[str, Any]]:
-    items: list[dict[str, Any]] = []
-    page = 1
+    def fetch(page: int, include_headers: bool = False) -> tuple[list[dict[str, Any]], int, dict[str, str]]:
+        return gh_api_page(
+            endpoint,
+            page,
+            command_path=command_path,
+            fields=fields,
+            headers=headers,
+            include_headers=include_headers,
+        )
+
+    items, count, response_headers = fetch(1, include_headers=True)
+    if count < PAGE_SIZE:
+        return items
+    last_page = last_page_from_link(response_headers.get("link", ""))
+    if last_page is not None:
+        # The first response names the last page, so the rest are fetched
+        # concurrently and reassembled in page order.
+        from concurrent.futures import ThreadPoolExecutor
+
+        pages = range(2, last_page + 1)
+        with ThreadPoolExecutor(max_workers=max(1, min(PAGE_FETCH_WORKERS, len(pages)))) as executor:
+            for page_items, _, _ in executor.map(fetch, pages):
+                items.extend(page_items)
+        return items
+    # Without a Link header, keep walking until a short page.
+    page = 2
     while True:
-        args = ["api", endpoint, "-X", "GET", "-F", "per_page=100", "-F", f"page={page}"]
-        for key, value in (fields or {}).items():
-            args.extend(["-F", f"{key}={value}"])
-        for header in headers or []:
-            args.extend(["-H", header])
-        payload = gh_json(args, command_path=command_path)
-        if not isinstance(payload, list):
-            raise GhflowError(
-                f"Unexpected response shape for {' '.join(command_path)}.",
-                code="command_failed",
-                exit_code=1,
-                command_path=command_path,
-            )
-        page_items = [item for item in payload if isinstance(item, dict)]
+        page_items, count, _ = fetch(page)
         items.extend(page_items)
-        if len(payload) < 100:
-            break
+        if count < PAGE_SIZE:
+            return items
         page += 1
-    return items
 
 
 def parse_output(stdout: str, output_kind: str) -> object:
@@ -508,7 +628,7 @@ def print_json_error(command_path: tuple[str, ...], *, code: str, message: str,
 
 def validate_repo_reference(repo: str) -> str:
     value = repo.strip()
-    if not REPO_PATTERN.match(value):
+    if not repo_context.is_repo_reference(value):
         raise GhflowError(
             f"Invalid --repo value '{repo}'. Use owner/repo.",
             code="invalid_arguments",
@@ -552,22 +672,7 @@ def normalize_hex_color(raw_value: str, *, command_path: tuple[str, ...]) -> str
 
 
 def is_git_repo() -> bool:
-    repo_result = run_git_text(["rev-parse", "--is-inside-work-tree"])
-    return repo_result.returncode == 0 and repo_result.stdout.strip() == "true"
-
-
-def normalize_remote_url(remote: str | None) -> str | None:
-    if not remote:
-        return None
-    repo = re.sub(r"^git@[^:]+:", "", remote)
-    repo = re.sub(r"^https?://[^/]+/", "", repo)
-    repo = re.sub(r"^ssh://[^/]+/", "", repo)
-    repo = re.sub(r"^git://[^/]+/", "", repo)
-    repo = re.sub(r"\.git$", "", repo)
-    repo = repo.rstrip("/")
-    if REPO_PATTERN.fullmatch(repo):
-        return repo
-    return None
+    return repo_context.load() is not None
 
 
 def resolve_repo(repo_ref: str | None, allow_non_project: bool, *, command_path: tuple[str, ...]) -> str:
@@ -587,18 +692,22 @@ def resolve_repo(repo_ref: str | None, allow_non_project: bool, *, command_path:
             exit_code=3,
             command_path=command_path,
         )
-    remote_result = run_git_text(["remote", "get-url", "origin"])
-    if remote_result.returncode != 0:
+    return origin_repo(command_path)
+
+
+def origin_repo(command_path: tuple[str, ...]) -> str:
+    context = repo_context.load()
+    if context is None or not context.origin_url:
         raise GhflowError(
             "No origin remote found. Pass --repo <owner/repo>.",
             code="repo_context_missing",
             exit_code=4,
             command_path=command_path,
         )
-    repo = normalize_remote_url(remote_result.stdout.strip())
+    repo = context.repo
     if repo is None:
         raise GhflowError(
-            f"Could not resolve owner/repo from git remote: {remote_result.stdout.strip()}",
+            f"Could not resolve owner/repo from git remote: {context.origin_url}",
             code="repo_context_missing",
             exit_code=5,
             command_path=command_path,
@@ -618,9 +727,9 @@ def require_git_repo(command_path: tuple[str, ...]) -> None:
 
 def current_branch(command_path: tuple[str, ...]) -> str:
     require_git_repo(command_path)
-    result = run_git_text(["rev-parse", "--abbrev-ref", "HEAD"])
-    branch = result.stdout.strip()
-    if result.returncode != 0 or not branch or branch == "HEAD":
+    context = repo_context.load()
+    branch = context.branch if context is not None else None
+    if not branch:
         raise GhflowError(
             "Detached HEAD detected. Check out a branch first.",
             code="repo_context_missing",
@@ -631,29 +740,86 @@ def current_branch(command_path: tuple[str, ...]) -> str:
 
 
 def current_repo_root() -> Path | None:
-    result = run_git_text(["rev-parse", "--show-toplevel"])
-    if result.returncode != 0:
-        return None
-    value = result.stdout.strip()
-    return Path(value) if value else None
+    context = repo_context.load()
+    return context.root if context is not None else None
+
+
+def default_branch_name(repo: str, *, command_path: tuple[str, ...], refresh: bool = False) -> str:
+    def lookup() -> str:
+        cached = None if refresh else repo_metadata.lookup(repo)
+        if cached is not None and cached.get("defaultBranch"):
+            return str(cached["defaultBranch"])
+        # Fetch every cached field so star and list writes can reuse the entry.
+        payload = gh_json(["repo", "view", repo, "--json", repo_metadata.VIEW_FIELDS], command_path=command_path)
+        if not isinstance(payload, dict):
+            return ""
+        return str(repo_metadata.record(repo, payload)["defaultBranch"])
+
+    if refresh:
+        return lookup()
+    return warm.memoize(("default_branch", repo), lookup)
 
 
 def tracking_remote_name(branch: str) -> str | None:
-    result = run_git_text(["config", "--get", f"branch.{branch}.remote"])
-    if result.returncode != 0:
-        return None
-    value = result.stdout.strip()
-    return value or None
+    context = repo_context.load()
+    return context.upstream(branch)[0] if context is not None else None
 
 
 def tracking_branch_name(branch: str) -> str | None:
-    result = run_git_text(["config", "--get", f"branch.{branch}.merge"])
+    context = repo_context.load()
+    return context.upstream(branch)[1] if context is not None else None
+
+
+def parse_status_porcelain_v2(text: str) -> tuple[str | None, int, int, tuple[int, int, int, int]]:
+    branch: str | None = None
+    initial = False
+    ahead = behind = 0
+    staged = unstaged = untracked = total = 0
+    for line in text.splitlines():
+        if line.startswith("# branch.oid "):
+            initial = line.split(" ", 2)[2] == "(initial)"
+        elif line.startswith("# branch.head "):
+            head = line.split(" ", 2)[2]
+            branch = None if head == "(detached)" else head
+        elif line.startswith("# branch.ab "):
+            parts = line.split()
+            if len(parts) == 4:
+                ahead, behind = int(parts[2].lstrip("+")), abs(int(parts[3]))
+        elif line.startswith("? "):
+            total += 1
+            untracked += 1
+        elif line[:2] in {"1 ", "2 ", "u "}:
+            # Same counting as porcelain v1, where v2 writes "." for an unchanged side.
+            total += 1
+            xy = line[2:4]
+            if xy[:1] != ".":
+                staged += 1
+            if xy[1:2] != ".":
+                unstaged += 1
+    # An unborn branch has no HEAD commit; treat it like rev-parse did, as no branch.
+    if initial:
+        branch = None
+    return branch, ahead, behind, (staged, unstaged, untracked, total)
+
+
+def probe_git_status(command_path: tuple[str, ...]) -> GitStatusProbe:
+    # One status call yields branch, ahead/behind and change counts; the
+    # tracking remote and merge ref come from the cached repo context.
+    result = run_git_text(["status", "--porcelain=v2", "--branch"])
     if result.returncode != 0:
-        return None
-    value = result.stdout.strip()
-    if not value:
-        return None
-    return value.removeprefix("refs/heads/")
+        raise GhflowError(
+            "No git repository detected.",
+            code="repo_context_missing",
+            exit_code=3,
+            command_path=command_path,
+        )
+    branch, ahead, behind, (staged, unstaged, untracked, total) = parse_status_porcelain_v2(result.stdout)
+    upstream_remote = upstream_branch = None
+    if branch:
+        upstream_remote, upstream_branch = tracking_remote_name(branch), tracking_branch_name(branch)
+    if not (upstream_remote and upstream_branch):
+        ahead = behind = 0
+    return GitStatusProbe(branch, upstream_remote, upstream_branch, ahead, behind, staged, unstaged, untracked, total)
 
 
 def branch_is_long_lived(branch: str) -> bool:
@@ -755,25 +921,96 @@ def snippet(text: str, *, limit: int = 220) -> str:
 
 
 def ci_inspect_handler(spec: CommandSpec, tail: list[str], json_mode: bool) -> CommandResponse:
+    from . import checks
+
     opts = parse_options(spec.command_path, tail, {
         "--pr": value("pr"),
+        "--prs-from-file": value("prs_from_file"),
         "--repo": value("repo"),
         "--allow-non-project": flag("allow_non_project"),
         "--max-lines": value("max_lines", default=str(checks.DEFAULT_MAX_LINES)),
         "--context": value("context", default=str(checks.DEFAULT_CONTEXT_LINES)),
+        "--jobs": value("jobs", default=str(checks.DEFAULT_JOBS)),
+        "--snippets": value("snippets", default=str(checks.DEFAULT_SNIPPET_WINDOWS)),
+        "--markers-file": value("markers_file"),
+        "--no-cache": flag("no_cache"),
+        "--watch": flag("watch"),
+        "--interval": value("interval", default=str(checks.DEFAULT_WATCH_INTERVAL)),
+        "--max-interval": value("max_interval", default=str(checks.DEFAULT_WATCH_MAX_INTERVAL)),
+        "--max-polls": value("max_polls", default=str(checks.DEFAULT_WATCH_MAX_POLLS)),
     })
     repo = resolve_repo(opts["repo"], bool(opts["allow_non_project"]), command_path=spec.command_path)
     max_lines = require_positive_int("max-lines", str(opts["max_lines"]), command_path=spec.command_path)
     context = require_positive_int("context", str(opts["context"]), command_path=spec.command_path)
+    jobs = require_positive_int("jobs", str(opts["jobs"]), command_path=spec.command_path)
+    windows = require_positive_int("snippets", str(opts["snippets"]), command_path=spec.command_path)
+    interval = require_positive_int("interval", str(opts["interval"]), command_path=spec.command_path)
+    max_interval = require_positive_int("max-interval", str(opts["max_interval"]), command_path=spec.command_path)
+    max_polls = require_positive_int("max-polls", str(opts["max_polls"]), command_path=spec.command_path)
     repo_root = current_repo_root() if is_git_repo() else None
+    try:
+        pr_values = checks.parse_pr_values(opts["pr"], opts["prs_from_file"])
+    except checks.InspectionError as exc:
+        return text_response(stderr=f"{exc.message}\n", returncode=exc.exit_code)
+    pr_value = pr_values[0] if pr_values else None
+
+    if len(pr_values) > 1 or opts["prs_from_file"]:
+        if opts["watch"]:
+            raise GhflowError(
+                "--watch supports a single --pr.",
+                code="invalid_arguments",
+                exit_code=64,
+                command_path=spec.command_path,
+            )
+        try:
+            exit_code = checks.inspect_pr_batch(
+                repo=repo,
+                repo_root=repo_root,
+                pr_values=pr_values,
+                max_lines=max_lines,
+                context=context,
+                emit=checks.print_event,
+                jobs=jobs,
+                use_cache=not opts["no_cache"],
+                windows=windows,
+                markers_file=opts["markers_file"],
+            )
+        except checks.InspectionError as exc:
+            return text_response(stderr=f"{exc.message}\n", returncode=exc.exit_code)
+        return CommandResponse(RunResult(exit_code, "", ""), "json", allow_nonzero=True, streamed=True)
+
+    if opts["watch"]:
+        try:
+            exit_code = checks.watch_pr_failures(
+                repo=repo,
+                repo_root=repo_root,
+                pr_value=pr_value,
+                max_lines=max_lines,
+                context=context,
+                emit=checks.print_event,
+                jobs=jobs,
+                use_cache=not opts["no_cache"],
+                windows=windows,
+                markers_file=opts["markers_file"],
+                interval=interval,
+                max_interval=max(interval, max_interval),
+                max_polls=max_polls,
+            )
+        except checks.InspectionError as exc:
+            return text_response(stderr=f"{exc.message}\n", returncode=exc.exit_code)
+        return CommandResponse(RunResult(exit_code, "", ""), "json", allow_nonzero=True, streamed=True)
 
     try:
         payload, exit_code = checks.inspect_pr_failures(
             repo=repo,
             repo_root=repo_root,
-            pr_value=opts["pr"],
+            pr_value=pr_value,
             max_lines=max_lines,
             context=context,
+            jobs=jobs,
+            use_cache=not opts["no_cache"],
+            windows=windows,
+            markers_file=opts["markers_file"],
         )
     except checks.InspectionError as exc:
         return text_response(stderr=f"{exc.message}\n", returncode=exc.exit_code)
@@ -795,43 +1032,22 @@ def ci_inspect_handler(spec: CommandSpec, tail: list[str], json_mode: bool) -> C
     )
 
 
-def reviews_address_handler(spec: CommandSpec, tail: list[str], json_mode: bool) -> CommandResponse:
-    opts = parse_options(spec.command_path, tail, {
-        "--pr": value("pr"),
-        "--repo": value("repo"),
-        "--include-resolved": flag("include_resolved"),
-        "--selection": value("selection"),
-        "--comment-ids": value("comment_ids"),
-        "--reply-body": value("reply_body"),
-        "--dry-run": flag("dry_run"),
-        "--allow-non-project": flag("allow_non_project"),
-    })
-    pr = require_positive_int("pr", opts["pr"], command_path=spec.command_path)
-    repo = resolve_repo(opts["repo"], bool(opts["allow_non_project"]), command_path=spec.command_path)
-    reply_mode = bool(opts["reply_body"])
-    if reply_mode:
-        if opts["selection"] and opts["comment_ids"]:
-            raise GhflowError("Use either --selection or --comment-ids with --reply-body, not both.", code="invalid_arguments", exit_code=64, command_path=spec.command_path)
-        if not opts["selection"] and not opts["comment_ids"]:
-            raise GhflowError("--reply-body requires either --selection or --comment-ids.", code="invalid_arguments", exit_code=64, command_path=spec.command_path)
-    elif opts["selection"] or opts["comment_ids"]:
-        raise GhflowError("--selection and --comment-ids require --reply-body.", code="invalid_arguments", exit_code=64, command_path=spec.command_path)
-    conversation_comments = gh_api_paginated_list(f"repos/{repo}/issues/{pr}/comments", command_path=spec.command_path, headers=["Accept: application/vnd.github+json"])
-    review_comments = gh_api_paginated_list(f"repos/{repo}/pulls/{pr}/comments", command_path=spec.command_path, headers=["Accept: application/vnd.github+json"])
-    owner, repo_name = repo.split("/", 1)
-    query = """
+REVIEW_THREADS_QUERY = """
 query($owner: String!, $repo: String!, $number: Int!, $after: String) {
   repository(owner: $owner, name: $repo) {
     pullRequest(number: $number) {
       reviewThreads(first: 50, after: $after) {
         pageInfo { hasNextPage endCursor }
         nodes {
+          id
           isResolved
           isOutdated
           path
           line
           startLine
           comments(first: 100) {
+            totalCount
+            pageInfo { hasNextPage endCursor }
             nodes {
               databaseId
               body
@@ -846,11 +1062,77 @@ query($owner: String!, $repo: String!, $number: Int!, $after: String) {
   }
 }
 """.strip()
+THREAD_COMMENTS_FIELDS = """
+comments(first: 100, after: $after{index}) {
+  pageInfo { hasNextPage endCursor }
+  nodes {
+    databaseId
+    body
+    createdAt
+    updatedAt
+    author { login }
+  }
+}
+""".strip()
+THREAD_COMMENTS_BATCH_SIZE = 20
+# Thread states with comment ids but no bodies; incremental syncs compare
+# these with the snapshot and only re-fetch comments for threads that changed.
+REVIEW_THREAD_STATES_QUERY = """
+query($owner: String!, $repo: String!, $number: Int!, $after: String) {
+  repository(owner: $owner, name: $repo) {
+    pullRequest(number: $number) {
+      reviewThreads(first: 100, after: $after) {
+        pageInfo { hasNextPage endCursor }
+        nodes {
+          id
+          isResolved
+          isOutdated
+          path
+          line
+          startLine
+          comments(first: 100) { totalCount nodes { databaseId } }
+        }
+      }
+    }
+  }
+}
+""".strip()
+# Conversation comment ids, which `since` syncs reconcile deletions against.
+CONVERSATION_COMMENT_IDS_QUERY = """
+query($owner: String!, $repo: String!, $number: Int!, $after: String) {
+  repository(owner: $owner, name: $repo) {
+    pullRequest(number: $number) {
+      comments(first: 100, after: $after) {
+        pageInfo { hasNextPage endCursor }
+        nodes { databaseId }
+      }
+    }
+  }
+}
+""".strip()
+REVIEW_SNAPSHOT_VERSION = 1
+# `since` is compared with GitHub's clock, so each sync overlaps the previous one.
+REVIEW_SYNC_OVERLAP_SECONDS = 300
+# Snapshots keep comment bodies; PRs whose snapshot would exceed this are
+# always fetched in full, and only the most recently synced PRs are kept.
+REVIEW_SNAPSHOT_MAX_BYTES = 2 * 1024 * 1024
+MAX_REVIEW_SNAPSHOTS = 32
+REST_COMMENT_KEYS = ("id", "body", "path", "line", "start_line", "created_at", "updated_at")
+REPLY_POST_WORKERS = 4
+REPLY_MAX_ATTEMPTS = 4
+REPLY_RETRY_BASE_SECONDS = 2.0
+RATE_LIMIT_MARKERS = ("secondary rate limit", "rate limit exceeded", "http 429", "submitted too quickly", "abuse detection")
+
+
+def fetch_review_thread_pages(repo: str, pr: int, query: str, connection: str = "reviewThreads") -> list[dict[str, Any]]:
+    from . import user_state
+
+    owner, repo_name = repo.split("/", 1)
     threads: list[dict[str, Any]] = []
     after: str | None = None
     while True:
         payload = user_state.graphql(query, {"owner": owner, "repo": repo_name, "number": pr, "after": after})
-        review_threads = (((payload.get("data") or {}).get("repository") or {}).get("pullRequest") or {}).get("reviewThreads") or {}
+        review_threads = (((payload.get("data") or {}).get("repository") or {}).get("pullRequest") or {}).get(connection) or {}
         nodes = review_threads.get("nodes") or []
         threads.extend([node for node in nodes if isinstance(node, dict)])
         page_info = review_threads.get("pageInfo") or {}
@@ -859,6 +1141,273 @@ query($owner: String!, $repo: String!, $number: Int!, $after: String) {
         after = page_info.get("endCursor")
         if not after:
             break
+    return threads
+
+
+def fetch_conversation_comment_ids(repo: str, pr: int) -> set[int]:
+    nodes = fetch_review_thread_pages(repo, pr, CONVERSATION_COMMENT_IDS_QUERY, "comments")
+    return {int(node["databaseId"]) for node in nodes if node.get("databaseId")}
+
+
+def fetch_review_threads(repo: str, pr: int) -> list[dict[str, Any]]:
+    threads = fetch_review_thread_pages(repo, pr, REVIEW_THREADS_QUERY)
+    fetch_remaining_thread_comments(threads)
+    return threads
+
+
+def thread_has_more_comments(thread: dict[str, Any]) -> bool:
+    page_info = (thread.get("comments") or {}).get("pageInfo") or {}
+    return bool(page_info.get("hasNextPage") and thread.get("id"))
+
+
+def fetch_remaining_thread_comments(threads: list[dict[str, Any]]) -> None:
+    from . import user_state
+
+    # Only threads with more than one page of comments are re-queried, several
+    # per request through aliased node() lookups, until every one is complete.
+    while True:
+        pending = [thread for thread in threads if thread_has_more_comments(thread)]
+        if not pending:
+            return
+        for start in range(0, len(pending), THREAD_COMMENTS_BATCH_SIZE):
+            batch = pending[start : start + THREAD_COMMENTS_BATCH_SIZE]
+            declarations: list[str] = []
+            selections: list[str] = []
+            variables: dict[str, object] = {}
+            for index, thread in enumerate(batch):
+                declarations.append(f"$id{index}: ID!, $after{index}: String")
+                fields = THREAD_COMMENTS_FIELDS.replace("{index}", str(index))
+                selections.append(f"t{index}: node(id: $id{index}) {{ ... on PullRequestReviewThread {{ {fields} }} }}")
+                variables[f"id{index}"] = thread["id"]
+                variables[f"after{index}"] = ((thread.get("comments") or {}).get("pageInfo") or {}).get("endCursor")
+            query = f"query({', '.join(declarations)}) {{\n" + "\n".join(selections) + "\n}"
+            payload = user_state.graphql(query, variables)
+            data = payload.get("data") or {}
+            for index, thread in enumerate(batch):
+                page = ((data.get(f"t{index}") or {}).get("comments")) or {}
+                comments = thread.setdefault("comments", {})
+                nodes = [node for node in page.get("nodes") or [] if isinstance(node, dict)]
+                comments["nodes"] = [*(comments.get("nodes") or []), *nodes]
+                page_info = page.get("pageInfo") or {}
+                # A thread that came back empty is not retried forever.
+                comments["pageInfo"] = page_info if nodes else {"hasNextPage": False}
+
+
+def sync_review_threads(
+    repo: str,
+    pr: int,
+    cached_threads: list[dict[str, Any]],
+    updated_comment_ids: set[int],
+) -> list[dict[str, Any]]:
+    # A thread keeps its cached comments only while GitHub lists exactly the
+    # same comment ids for it and the `since` REST fetch reported no edit to
+    # any of them; ids catch a deletion even when an addition kept the count.
+    cached_by_id = {thread["id"]: thread for thread in cached_threads if isinstance(thread, dict) and thread.get("id")}
+    threads: list[dict[str, Any]] = []
+    for state in fetch_review_thread_pages(repo, pr, REVIEW_THREAD_STATES_QUERY):
+        state_comments = state.get("comments") or {}
+        total = state_comments.get("totalCount")
+        current_ids = {node.get("databaseId") for node in state_comments.get("nodes") or [] if isinstance(node, dict)}
+        cached_comments = (cached_by_id.get(state.get("id")) or {}).get("comments") or {}
+        known_ids = {node.get("databaseId") for node in cached_comments.get("nodes") or [] if isinstance(node, dict)}
+        if state.get("id") in cached_by_id and len(current_ids) == total and current_ids == known_ids and not known_ids & updated_comment_ids:
+            comments = cached_comments
+        else:
+            comments = {"totalCount": total, "nodes": [], "pageInfo": {"hasNextPage": True, "endCursor": None}}
+        threads.append({**state, "comments": comments})
+    fetch_remaining_thread_comments(threads)
+    return threads
+
+
+def slim_rest_comments(comments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    slimmed = [
+        {**{key: comment.get(key) for key in REST_COMMENT_KEYS}, "user": {"login": (comment.get("user") or {}).get("login")}}
+        for comment in comments
+        if isinstance(comment, dict) and comment.get("id")
+    ]
+    return sorted(slimmed, key=lambda comment: int(comment["id"]))
+
+
+def merge_rest_comments(cached: list[dict[str, Any]], updated: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    merged = {int(comment["id"]): comment for comment in cached if isinstance(comment, dict) and comment.get("id")}
+    merged.update({int(comment["id"]): comment for comment in slim_rest_comments(updated)})
+    return sorted(merged.values(), key=lambda comment: int(comment["id"]))
+
+
+def review_snapshot_name(repo: str, pr: int) -> str:
+    import hashlib
+
+    return "reviews-" + hashlib.sha256(f"{repo}#{pr}".encode()).hexdigest()[:24]
+
+
+def store_review_snapshot(name: str, snapshot: dict[str, Any]) -> None:
+    from .state import state_path, write_state
+
+    if len(json.dumps(snapshot)) > REVIEW_SNAPSHOT_MAX_BYTES:
+        with contextlib.suppress(OSError):
+            state_path(name).unlink()
+        return
+    write_state(name, snapshot)
+    stamped = []
+    for path in state_path(name).parent.glob("reviews-*.json"):
+        with contextlib.suppress(OSError):
+            stamped.append((path.stat().st_mtime_ns, path))
+    for _, path in sorted(stamped)[:-MAX_REVIEW_SNAPSHOTS]:
+        with contextlib.suppress(OSError):
+            path.unlink()
+
+
+def load_review_snapshot(repo: str, pr: int) -> dict[str, Any] | None:
+    from .state import read_state
+
+    snapshot = read_state(review_snapshot_name(repo, pr))
+    if snapshot.get("version") != REVIEW_SNAPSHOT_VERSION or snapshot.get("repo") != repo or snapshot.get("pr") != pr:
+        return None
+    if not snapshot.get("since") or not all(isinstance(snapshot.get(key), list) for key in ("conversation", "review", "threads")):
+        return None
+    return snapshot
+
+
+def fetch_review_context(
+    repo: str,
+    pr: int,
+    *,
+    command_path: tuple[str, ...],
+    use_cache: bool = True,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Snapshots live in the ghflow state dir. Later calls only ask for comments
+    # updated since the last sync and re-query just the threads that changed,
+    # while entry order (and so --selection indexes) stays that of a full fetch.
+    snapshot = load_review_snapshot(repo, pr) if use_cache else None
+    since = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - REVIEW_SYNC_OVERLAP_SECONDS))
+    comment_headers = ["Accept: application/vnd.github+json"]
+    fields = {"since": snapshot["since"]} if snapshot else None
+    # The fetch streams are independent, so they run side by side and are
+    # consumed in the original order, which keeps the first reported error.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        conversation_future = executor.submit(gh_api_paginated_list, f"repos/{repo}/issues/{pr}/comments", command_path=command_path, fields=fields, headers=comment_headers)
+        review_future = executor.submit(gh_api_paginated_list, f"repos/{repo}/pulls/{pr}/comments", command_path=command_path, fields=fields, headers=comment_headers)
+        if snapshot is None:
+            listing_future = executor.submit(fetch_review_threads, repo, pr)
+        else:
+            listing_future = executor.submit(fetch_conversation_comment_ids, repo, pr)
+        conversation_updates = conversation_future.result()
+        review_updates = review_future.result()
+        listing = listing_future.result()
+    if snapshot is None:
+        threads = listing
+        conversation_comments = slim_rest_comments(conversation_updates)
+        review_comments = slim_rest_comments(review_updates)
+    else:
+        conversation_comments = merge_rest_comments(snapshot["conversation"], conversation_updates)
+        review_comments = merge_rest_comments(snapshot["review"], review_updates)
+        updated_ids = {int(comment["id"]) for comment in review_updates if isinstance(comment, dict) and comment.get("id")}
+        threads = sync_review_threads(repo, pr, snapshot["threads"], updated_ids)
+        # `since` never reports deletions, so both REST streams are reconciled
+        # by id: conversation comments against GitHub's id listing, review
+        # comments against the synced threads, which every one belongs to.
+        conversation_ids = listing
+        if conversation_ids - {int(comment["id"]) for comment in conversation_comments}:
+            # A comment the `since` window missed; start this stream over.
+            conversation_comments = slim_rest_comments(gh_api_paginated_list(f"repos/{repo}/issues/{pr}/comments", command_path=command_path, headers=comment_headers))
+        conversation_comments = [comment for comment in conversation_comments if int(comment["id"]) in conversation_ids]
+        thread_comment_ids = {
+            int(node["databaseId"])
+            for thread in threads
+            for node in (thread.get("comments") or {}).get("nodes") or []
+            if isinstance(node, dict) and node.get("databaseId")
+        }
+        review_comments = [comment for comment in review_comments if int(comment["id"]) in thread_comment_ids]
+    store_review_snapshot(review_snapshot_name(repo, pr), {
+        "version": REVIEW_SNAPSHOT_VERSION,
+        "repo": repo,
+        "pr": pr,
+        "since": since,
+        "conversation": conversation_comments,
+        "review": review_comments,
+        "threads": threads,
+    })
+    return conversation_comments, review_comments, threads
+
+
+def is_rate_limited(result: RunResult) -> bool:
+    text = f"{result.stderr}\n{result.stdout}".lower()
+    return any(marker in text for marker in RATE_LIMIT_MARKERS)
+
+
+def run_gh_with_backoff(args: list[str]) -> RunResult:
+    # Parallel writes can trip GitHub's secondary rate limits; those are
+    # retried with exponential backoff, every other failure is returned as is.
+    delay = REPLY_RETRY_BASE_SECONDS
+    for attempt in range(1, REPLY_MAX_ATTEMPTS + 1):
+        result = run_gh_text(args)
+        if result.returncode == 0 or attempt == REPLY_MAX_ATTEMPTS or not is_rate_limited(result):
+            return result
+        time.sleep(delay)
+        delay *= 2
+    return result
+
+
+def reply_action(item: dict[str, Any], *, repo: str, body: str, dry_run: bool) -> dict[str, Any]:
+    action: dict[str, Any] = {"comment_id": item["comment_id"], "type": item["type"], "status": "dry-run" if dry_run else "pending"}
+    if item["type"] == "conversation_comment":
+        action["transport"] = "gh pr comment"
+    else:
+        action["transport"] = "gh api"
+        action["endpoint"] = f"repos/{repo}/pulls/comments/{item['comment_id']}/replies"
+        action["body"] = body
+    return action
+
+
+def post_reply(action: dict[str, Any], *, repo: str, pr: int, body: str) -> dict[str, Any]:
+    pr_comment = ["pr", "comment", str(pr), "--repo", repo, "--body", f"{body} (ref: {action['comment_id']})"]
+    if action["type"] == "conversation_comment":
+        result = run_gh_with_backoff(pr_comment)
+        success = "posted"
+    else:
+        result = run_gh_with_backoff(["api", "-X", "POST", action["endpoint"], "-H", "Accept: application/vnd.github+json", "-f", f"body={body}"])
+        success = "replied"
+        if result.returncode != 0:
+            result = run_gh_with_backoff(pr_comment)
+            success = "fallback-pr-comment"
+    if result.returncode == 0:
+        action["status"] = success
+    else:
+        action["status"] = "failed"
+        action["error"] = extract_runtime_error_message(result) or "Command failed."
+    return action
+
+
+def reviews_address_handler(spec: CommandSpec, tail: list[str], json_mode: bool) -> CommandResponse:
+    opts = parse_options(spec.command_path, tail, {
+        "--pr": value("pr"),
+        "--repo": value("repo"),
+        "--include-resolved": flag("include_resolved"),
+        "--selection": value("selection"),
+        "--comment-ids": value("comment_ids"),
+        "--reply-body": value("reply_body"),
+        "--dry-run": flag("dry_run"),
+        "--allow-non-project": flag("allow_non_project"),
+        "--no-cache": flag("no_cache"),
+    })
+    pr = require_positive_int("pr", opts["pr"], command_path=spec.command_path)
+    repo = resolve_repo(opts["repo"], bool(opts["allow_non_project"]), command_path=spec.command_path)
+    reply_mode = bool(opts["reply_body"])
+    if reply_mode:
+        if opts["selection"] and opts["comment_ids"]:
+            raise GhflowError("Use either --selection or --comment-ids with --reply-body, not both.", code="invalid_arguments", exit_code=64, command_path=spec.command_path)
+        if not opts["selection"] and not opts["comment_ids"]:
+            raise GhflowError("--reply-body requires either --selection or --comment-ids.", code="invalid_arguments", exit_code=64, command_path=spec.command_path)
+    elif opts["selection"] or opts["comment_ids"]:
+        raise GhflowError("--selection and --comment-ids require --reply-body.", code="invalid_arguments", exit_code=64, command_path=spec.command_path)
+    conversation_comments, review_comments, threads = fetch_review_context(
+        repo,
+        pr,
+        command_path=spec.command_path,
+        use_cache=not opts["no_cache"],
+    )
     active_thread_entries: list[dict[str, Any]] = []
     other_thread_entries: list[dict[str, Any]] = []
     thread_comment_ids: set[int] = set()
@@ -939,36 +1488,17 @@ query($owner: String!, $repo: String!, $number: Int!, $after: String) {
                 if part not in entries_by_comment_id:
                     raise GhflowError(f"Comment ID '{part}' was not found in the fetched context.", code="invalid_arguments", exit_code=64, command_path=spec.command_path)
                 selected_entries.append(entries_by_comment_id[part])
-        for item in selected_entries:
-            action: dict[str, Any] = {"comment_id": item["comment_id"], "type": item["type"], "status": "dry-run" if opts["dry_run"] else "pending"}
-            if item["type"] == "conversation_comment":
-                command = ["pr", "comment", str(pr), "--repo", repo, "--body", f"{opts['reply_body']} (ref: {item['comment_id']})"]
-                action["transport"] = "gh pr comment"
-                if not opts["dry_run"]:
-                    posted = run_gh_text(command)
-                    if posted.returncode != 0:
-                        return CommandResponse(posted, "text")
-                    action["status"] = "posted"
-            else:
-                endpoint = f"repos/{repo}/pulls/comments/{item['comment_id']}/replies"
-                action["transport"] = "gh api"
-                action["endpoint"] = endpoint
-                action["body"] = opts["reply_body"]
-                if not opts["dry_run"]:
-                    posted = run_gh_text(["api", "-X", "POST", endpoint, "-H", "Accept: application/vnd.github+json", "-f", f"body={opts['reply_body']}"])
-                    if posted.returncode == 0:
-                        action["status"] = "replied"
-                    else:
-                        fallback = run_gh_text(["pr", "comment", str(pr), "--repo", repo, "--body", f"{opts['reply_body']} (ref: {item['comment_id']})"])
-                        if fallback.returncode != 0:
-                            return CommandResponse(fallback, "text")
-                        action["status"] = "fallback-pr-comment"
-            actions.append(action)
+        actions = [reply_action(item, repo=repo, body=str(opts["reply_body"]), dry_run=bool(opts["dry_run"])) for item in selected_entries]
+        if not opts["dry_run"] and actions:
+            from concurrent.futures import ThreadPoolExecutor
+
+            # Replies are independent: post them side by side and record a
+            # status per reply instead of stopping at the first failure.
+            with ThreadPoolExecutor(max_workers=min(REPLY_POST_WORKERS, len(actions))) as executor:
+                list(executor.map(lambda action: post_reply(action, repo=repo, pr=pr, body=str(opts["reply_body"])), actions))
     payload: dict[str, Any] = {"entries": entries}
     if reply_mode:
         payload["actions"] = actions
-    if json_mode:
-        return json_response(payload)
     if entries:
         lines: list[str] = []
         for item in entries:
@@ -981,48 +1511,60 @@ query($owner: String!, $repo: String!, $number: Int!, $after: String) {
     if reply_mode:
         lines.extend(["", "Reply actions:"])
         for action in actions:
-            lines.append(f"- comment {action['comment_id']} via {action['transport']}: {action['status']}")
-    return text_response("\n".join(lines) + "\n")
+            detail = f" ({action['error']})" if action.get("error") else ""
+            lines.append(f"- comment {action['comment_id']} via {action['transport']}: {action['status']}{detail}")
+    response = json_response(payload) if json_mode else text_response("\n".join(lines) + "\n")
+    failed = [action for action in actions if action["status"] == "failed"]
+    if not failed:
+        return response
+    return CommandResponse(
+        RunResult(1, response.result.stdout, ""),
+        response.output_kind,
+        allow_nonzero=True,
+        error_code="reply_failed",
+        error_message=f"{len(failed)} of {len(actions)} replies failed; see actions for per-reply status.",
+        error_retry="ghflow reviews address --pr <number> --comment-ids <failed ids> --reply-body <text>",
+    )
+
+
+def find_open_pr(repo: str, branch: str, *, command_path: tuple[str, ...]) -> Any:
+    return gh_json(["pr", "list", "--repo", repo, "--head", branch, "--state", "open", "--json", "number,url,title,baseRefName,headRefName,isDraft", "--limit", "1"], command_path=command_path)
 
 
 def publish_context_handler(spec: CommandSpec, tail: list[str], json_mode: bool) -> CommandResponse:
-    opts = parse_options(spec.command_path, tail, {"--repo": value("repo"), "--allow-non-project": flag("allow_non_project")})
+    from concurrent.futures import ThreadPoolExecutor
+
+    opts = parse_options(spec.command_path, tail, {"--repo": value("repo"), "--allow-non-project": flag("allow_non_project"), "--refresh": flag("refresh")})
     require_git_repo(spec.command_path)
-    local_repo = resolve_repo(None, False, command_path=spec.command_path)
+    local_repo = origin_repo(spec.command_path)
     if opts["repo"] and str(opts["repo"]) != local_repo:
         raise GhflowError(f"Cross-repo publish is not supported. Current checkout resolves to {local_repo}.", code="repo_context_mismatch", exit_code=2, command_path=spec.command_path)
     repo = local_repo
-    default_branch = str(gh_json(["repo", "view", repo, "--json", "defaultBranchRef"], command_path=spec.command_path).get("defaultBranchRef", {}).get("name") or "")
-    head_ref = run_git_text(["rev-parse", "--abbrev-ref", "HEAD"]).stdout.strip()
-    detached = not head_ref or head_ref == "HEAD"
-    branch = None if detached else head_ref
+    # The branch is known from the cached repo context, so both gh lookups run
+    # while git status walks the worktree.
+    context = repo_context.load()
+    head_branch = context.branch if context is not None else None
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        default_branch_future = executor.submit(default_branch_name, repo, command_path=spec.command_path, refresh=bool(opts["refresh"]))
+        pr_list_future = executor.submit(find_open_pr, repo, head_branch, command_path=spec.command_path) if head_branch else None
+        probe = probe_git_status(spec.command_path)
+        default_branch = default_branch_future.result()
+        pr_list = pr_list_future.result() if pr_list_future is not None else []
+    branch = probe.branch
+    detached = branch is None
     on_default_branch = bool(branch and branch == default_branch)
     current_branch_is_long_lived = bool(branch and branch_is_long_lived(branch))
-    upstream_remote = tracking_remote_name(branch) if branch else None
-    upstream_branch = tracking_branch_name(branch) if branch else None
+    upstream_remote = probe.upstream_remote
+    upstream_branch = probe.upstream_branch
     upstream_configured = bool(upstream_remote and upstream_branch)
     same_name_remote = bool(upstream_configured and upstream_branch == branch)
-    ahead = behind = 0
-    if upstream_configured:
-        counts = run_git_text(["rev-list", "--left-right", "--count", "HEAD...@{upstream}"]).stdout.strip()
-        if counts:
-            parts = counts.split()
-            if len(parts) == 2:
-                ahead, behind = int(parts[0]), int(parts[1])
-    staged = unstaged = untracked = total = 0
-    status = run_git_text(["status", "--porcelain=v1"]).stdout.splitlines()
-    for line in status:
-        total += 1
-        if line.startswith("??"):
-            untracked += 1
-            continue
-        if line[:1] != " ":
-            staged += 1
-        if line[1:2] != " ":
-            unstaged += 1
+    ahead, behind = probe.ahead, probe.behind
+    staged, unstaged, untracked, total = probe.staged, probe.unstaged, probe.untracked, probe.total
     open_pr: dict[str, Any] = {"exists": False, "number": None, "url": None, "title": None, "base": None, "head": None, "is_draft": None}
     if branch:
-        pr_list = gh_json(["pr", "list", "--repo", repo, "--head", branch, "--state", "open", "--json", "number,url,title,baseRefName,headRefName,isDraft", "--limit", "1"], command_path=spec.command_path)
+        if branch != head_branch:
+            # HEAD moved between the context read and git status.
+            pr_list = find_open_pr(repo, branch, command_path=spec.command_path)
         if isinstance(pr_list, list) and pr_list:
             entry = pr_list[0]
             open_pr = {
@@ -1096,6 +1638,8 @@ def publish_context_handler(spec: CommandSpec, tail: list[str], json_mode: bool)
 
 
 def publish_open_handler(spec: CommandSpec, tail: list[str], json_mode: bool) -> CommandResponse:
+    from concurrent.futures import ThreadPoolExecutor
+
     opts = parse_options(spec.command_path, tail, {
         "--title": value("title"),
         "--body": value("body"),
@@ -1105,6 +1649,7 @@ def publish_open_handler(spec: CommandSpec, tail: list[str], json_mode: bool) ->
         "--repo": value("repo"),
         "--dry-run": flag("dry_run"),
         "--allow-non-project": flag("allow_non_project"),
+        "--refresh": flag("refresh"),
     })
     branch = current_branch(spec.command_path)
     local_repo = resolve_repo(None, False, command_path=spec.command_path)
@@ -1117,9 +1662,16 @@ def publish_open_handler(spec: CommandSpec, tail: list[str], json_mode: bool) ->
         raise GhflowError(f"Current branch '{branch}' has no configured upstream. Push it before opening a PR.", code="repo_context_missing", exit_code=5, command_path=spec.command_path)
     if remote_branch != branch:
         raise GhflowError(f"Current branch '{branch}' tracks '{remote_name}/{remote_branch}'. This helper only supports same-name remote branches.", code="repo_context_mismatch", exit_code=5, command_path=spec.command_path)
-    if run_git_text(["ls-remote", "--exit-code", "--heads", remote_name, branch]).returncode != 0:
-        raise GhflowError(f"Current branch '{branch}' is not available on remote '{remote_name}'. Push it before opening a PR.", code="repo_context_missing", exit_code=5, command_path=spec.command_path)
-    existing = gh_json(["pr", "list", "--repo", repo, "--head", branch, "--state", "open", "--json", "number,url,title,baseRefName,headRefName,isDraft", "--limit", "1"], command_path=spec.command_path)
+    # The remote-branch check and the gh lookups are independent network calls.
+    # The default branch is fetched speculatively and only awaited when no
+    # existing PR is reused, so its errors surface only when it is needed.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        ls_remote_future = executor.submit(run_git_text, ["ls-remote", "--exit-code", "--heads", remote_name, branch])
+        existing_future = executor.submit(find_open_pr, repo, branch, command_path=spec.command_path)
+        default_branch_future = None if opts["base"] else executor.submit(default_branch_name, repo, command_path=spec.command_path, refresh=bool(opts["refresh"]))
+        if ls_remote_future.result().returncode != 0:
+            raise GhflowError(f"Current branch '{branch}' is not available on remote '{remote_name}'. Push it before opening a PR.", code="repo_context_missing", exit_code=5, command_path=spec.command_path)
+        existing = existing_future.result()
     if isinstance(existing, list) and existing:
         pr_info = existing[0]
         if opts["base"] and pr_info.get("baseRefName") != opts["base"]:
@@ -1139,7 +1691,7 @@ def publish_open_handler(spec: CommandSpec, tail: list[str], json_mode: bool) ->
             ]
             return text_response("\n".join(lines))
         return text_response(f"Reusing existing PR #{pr_info.get('number')}: {pr_info.get('url')}\n")
-    base = str(opts["base"] or gh_json(["repo", "view", repo, "--json", "defaultBranchRef"], command_path=spec.command_path).get("defaultBranchRef", {}).get("name") or "")
+    base = str(opts["base"] or default_branch_future.result())
     title = str(opts["title"] or run_git_text(["log", "-1", "--format=%s"]).stdout.strip())
     if not title:
         raise GhflowError("Could not derive a PR title from HEAD. Pass --title explicitly.", code="invalid_arguments", exit_code=6, command_path=spec.command_path)
@@ -1165,6 +1717,8 @@ def publish_open_handler(spec: CommandSpec, tail: list[str], json_mode: bool) ->
 
 
 def stars_handler(spec: CommandSpec, tail: list[str], json_mode: bool) -> CommandResponse:
+    from . import stars_cli
+
     argv = {
         "list": ["--list-stars"],
         "add": ["--star"],
@@ -1176,6 +1730,8 @@ def stars_handler(spec: CommandSpec, tail: list[str], json_mode: bool) -> Comman
 
 
 def lists_handler(spec: CommandSpec, tail: list[str], json_mode: bool) -> CommandResponse:
+    from . import lists_cli
+
     argv = {
         "list": ["--list-lists"],
         "items": ["--list-items"],
@@ -1188,9 +1744,56 @@ def lists_handler(spec: CommandSpec, tail: list[str], json_mode: bool) -> Comman
     return CommandResponse(helper_result(lists_cli.main, argv), "json" if json_mode else "text")
 
 
+def daemon_handler(spec: CommandSpec, tail: list[str], json_mode: bool) -> CommandResponse:
+    from . import daemon
+
+    action = spec.command_path[-1]
+    options = {"--socket": value("socket")}
+    if action == "serve":
+        options["--idle-timeout"] = value("idle_timeout", default=str(daemon.DEFAULT_IDLE_TIMEOUT_SECONDS))
+    opts = parse_options(spec.command_path, tail, options)
+    socket_path = Path(opts["socket"]).expanduser() if opts["socket"] else daemon.default_socket_path()
+
+    if action == "serve":
+        idle_timeout = require_positive_int("idle-timeout", str(opts["idle_timeout"]), command_path=spec.command_path)
+        try:
+            daemon.serve(
+                socket_path,
+                main,
+                version=VERSION,
+                idle_timeout=idle_timeout,
+                on_ready=lambda: print(f"ghflow daemon listening on {socket_path} (pid {os.getpid()})", file=sys.stderr, flush=True),
+            )
+        except daemon.DaemonError as exc:
+            raise GhflowError(exc.message, code="daemon_unavailable", exit_code=exc.exit_code, command_path=spec.command_path) from exc
+        return CommandResponse(RunResult(0, "", ""), "text", streamed=True)
+
+    reply = daemon.control("stop" if action == "stop" else "ping", socket_path)
+    running = reply is not None
+    payload = {"socket": str(socket_path), "running": running, "pid": reply.get("pid") if reply else None, "version": reply.get("version") if reply else None}
+    if action == "stop":
+        payload["stopped"] = running
+    if json_mode:
+        response = json_response(payload)
+    elif action == "stop":
+        response = text_response(f"Stopped ghflow daemon on {socket_path}.\n" if running else f"No ghflow daemon is listening on {socket_path}.\n")
+    else:
+        response = text_response(f"ghflow daemon {payload['version']} running on {socket_path} (pid {payload['pid']}).\n" if running else f"No ghflow daemon is listening on {socket_path}.\n")
+    if running:
+        return response
+    return CommandResponse(
+        RunResult(1, response.result.stdout, ""),
+        response.output_kind,
+        allow_nonzero=True,
+        error_code="daemon_not_running",
+        error_message=f"No ghflow daemon is listening on {socket_path}.",
+        error_retry="ghflow daemon serve",
+    )
+
+
 COMMAND_LIST = [
-    CommandSpec(("ci", "inspect"), usage_tail="[--pr <number-or-url>] [--repo <owner/repo>] [--allow-non-project] [--max-lines <count>] [--context <count>]", handler=ci_inspect_handler),
-    CommandSpec(("reviews", "address"), usage_tail="--pr <number> [--repo <owner/repo>] [--include-resolved] [--selection <rows>] [--comment-ids <ids>] [--reply-body <text>] [--dry-run] [--allow-non-project]", handler=reviews_address_handler),
+    CommandSpec(("ci", "inspect"), usage_tail="[--pr <number-or-url>[,...]] [--prs-from-file <path>] [--repo <owner/repo>] [--allow-non-project] [--max-lines <count>] [--context <count>] [--jobs <count>] [--snippets <count>] [--markers-file <path>] [--no-cache] [--watch] [--interval <seconds>] [--max-interval <seconds>] [--max-polls <count>]", handler=ci_inspect_handler),
+    CommandSpec(("reviews", "address"), usage_tail="--pr <number> [--repo <owner/repo>] [--include-resolved] [--selection <rows>] [--comment-ids <ids>] [--reply-body <text>] [--dry-run] [--allow-non-project] [--no-cache]", handler=reviews_address_handler),
     CommandSpec(("stars", "list"), handler=stars_handler),
     CommandSpec(("stars", "add"), handler=stars_handler),
     CommandSpec(("stars", "remove"), handler=stars_handler),
@@ -1201,6 +1804,9 @@ COMMAND_LIST = [
     CommandSpec(("stars", "lists", "unassign"), handler=lists_handler),
     CommandSpec(("publish", "context"), handler=publish_context_handler),
     CommandSpec(("publish", "open"), handler=publish_open_handler),
+    CommandSpec(("daemon", "serve"), usage_tail="[--socket <path>] [--idle-timeout <seconds>]", handler=daemon_handler),
+    CommandSpec(("daemon", "status"), usage_tail="[--socket <path>]", handler=daemon_handler),
+    CommandSpec(("daemon", "stop"), usage_tail="[--socket <path>]", handler=daemon_handler),
 ]
 
 COMMAND_ORDER = [spec.command_path for spec in COMMAND_LIST]
@@ -1211,8 +1817,9 @@ ROOT_NOUN_DESCRIPTIONS = {
     "reviews": "PR review-thread work",
     "stars": "authenticated-user stars and star lists",
     "publish": "current-branch PR context and open-or-reuse flows",
+    "daemon": "opt-in warm server that GHFLOW_SOCKET clients forward to",
 }
-ROOT_NOUN_ORDER = ("ci", "reviews", "stars", "publish")
+ROOT_NOUN_ORDER = ("ci", "reviews", "stars", "publish", "daemon")
 ROOT_NOUNS = tuple(noun for noun in ROOT_NOUN_ORDER if any(command_path[0] == noun for command_path in COMMAND_ORDER))
 SORTED_COMMAND_KEYS = sorted(COMMAND_ORDER, key=len, reverse=True)
 MAX_COMMAND_DEPTH = max(len(command_path) for command_path in COMMAND_ORDER)
@@ -4,6 +4,7 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+from . import repo_metadata
 from .user_state import (
     GhError,
     collect_repo_targets,
@@ -123,7 +124,9 @@ def _run_write(args: argparse.Namespace, add: bool) -> int:
     for repo in repos:
         result: dict[str, object] = {"repo": repo}
         try:
-            repo_payload = repo_view(repo)
+            # The starred flag changes outside ghflow, so a real write always
+            # checks it against GitHub; dry runs may report from the cache.
+            repo_payload = repo_view(repo, refresh=args.refresh or not args.dry_run, need_starred=True)
             repo_id = str(repo_payload["id"])
             canonical_repo = str(repo_payload["nameWithOwner"])
             already_starred = bool(repo_payload.get("viewerHasStarred"))
@@ -140,6 +143,7 @@ def _run_write(args: argparse.Namespace, add: bool) -> int:
                     result["message"] = "would star"
                 else:
                     _mutate_star(repo_id, add=True)
+                    repo_metadata.set_starred(repo, True)
                     result["status"] = "changed"
                     result["message"] = "starred"
             else:
@@ -151,6 +155,7 @@ def _run_write(args: argparse.Namespace, add: bool) -> int:
                     result["message"] = "would unstar"
                 else:
                     _mutate_star(repo_id, add=False)
+                    repo_metadata.set_starred(repo, False)
                     result["status"] = "changed"
                     result["message"] = "unstarred"
         except GhError as exc:
@@ -190,6 +195,7 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--all", action="store_true", help="Fetch all available items for read actions.")
     parser.add_argument("--json", action="store_true", help="Emit normalized JSON output.")
     parser.add_argument("--dry-run", action="store_true", help="Preview write actions without mutating GitHub.")
+    parser.add_argument("--refresh", action="store_true", help="Refetch cached repository metadata for --dry-run; real writes always check GitHub.")
     return parser
 
 
@@ -199,12 +205,16 @@ def _validate_args(args: argparse.Namespace) -> None:
             raise GhError("--list-stars does not accept --repo or --repos-file.", 64)
         if args.by_list and args.list_id:
             raise GhError("Pass either --by-list or --list-id, not both.", 64)
+        if args.refresh:
+            raise GhError("--refresh is only valid with --star or --unstar and --dry-run.", 64)
         return
 
     if args.by_list or args.list_id:
         raise GhError("--star and --unstar do not accept list filters.", 64)
     if args.all:
         raise GhError("--all is only valid with --list-stars.", 64)
+    if args.refresh and not args.dry_run:
+        raise GhError("--refresh is only valid with --dry-run; real writes always check GitHub.", 64)
     if args.limit != 100:
         raise GhError("--limit is only valid with --list-stars.", 64)
 
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+
+def user_cache_dir() -> Path:
+    override = os.environ.get("GHFLOW_CACHE_DIR")
+    if override:
+        return Path(override).expanduser()
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    if xdg:
+        return Path(xdg).expanduser() / "ghflow"
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches" / "ghflow"
+    return Path.home() / ".cache" / "ghflow"
+
+
+def state_path(name: str) -> Path:
+    return user_cache_dir() / "state" / f"{name}.json"
+
+
+def read_state(name: str) -> dict[str, Any]:
+    try:
+        data = json.loads(state_path(name).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def write_state(name: str, data: dict[str, Any]) -> None:
+    # Small JSON state files are replaced atomically; failures are ignored
+    # because every state file only saves work on a later run.
+    path = state_path(name)
+    temp_name = ""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(data, handle)
+        os.replace(temp_name, path)
+    except OSError:
+        if temp_name:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_name)
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, NamedTuple
+from urllib.parse import urlencode, urljoin, urlsplit
+
+
+TRANSPORT_ENV = "GHFLOW_TRANSPORT"
+API_URL_ENV = "GHFLOW_API_URL"
+DEFAULT_API_URL = "https://api.github.com"
+REQUEST_TIMEOUT_SECONDS = 60.0
+MAX_IDLE_CONNECTIONS = 8
+MAX_TRANSPORTS = 8
+MAX_REDIRECTS = 3
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+USER_AGENT = "ghflow"
+
+
+class TransportResult(NamedTuple):
+    returncode: int
+    stdout: str
+    stderr: str
+
+
+@dataclass
+class ApiRequest:
+    method: str
+    endpoint: str
+    fields: dict[str, Any] = field(default_factory=dict)
+    headers: dict[str, str] = field(default_factory=dict)
+    include_headers: bool = False
+
+    @property
+    def is_graphql(self) -> bool:
+        return self.endpoint.strip("/") == "graphql"
+
+
+def typed_field(raw: str) -> Any:
+    # `gh api -F` converts literals the same way.
+    if raw in {"true", "false"}:
+        return raw == "true"
+    if raw == "null":
+        return None
+    if raw.lstrip("-").isdigit():
+        return int(raw)
+    return raw
+
+
+def parse_api_args(args: list[str]) -> ApiRequest | None:
+    # Understands the `gh api` flags ghflow passes (-X, -f, -F, -H, -i).
+    # Anything else returns None and keeps going through gh.
+    if args[:1] != ["api"]:
+        return None
+    endpoint = None
+    method = None
+    fields: dict[str, Any] = {}
+    headers: dict[str, str] = {}
+    include_headers = False
+    index = 1
+    while index < len(args):
+        arg = args[index]
+        if arg in {"-X", "--method", "-f", "--raw-field", "-F", "--field", "-H", "--header"}:
+            if index + 1 >= len(args):
+                return None
+            option_value = args[index + 1]
+            index += 2
+            if arg in {"-X", "--method"}:
+                method = option_value.upper()
+            elif arg in {"-H", "--header"}:
+                name, colon, header_value = option_value.partition(":")
+                if not colon:
+                    return None
+                headers[name.strip()] = header_value.strip()
+            else:
+                key, equals, raw = option_value.partition("=")
+                if key.endswith("[]"):
+                    items = fields.setdefault(key[:-2], [])
+                    if not isinstance(items, list):
+                        return None
+                    if equals:
+                        items.append(raw if arg in {"-f", "--raw-field"} else typed_field(raw))
+                elif not equals or raw.startswith("@") and arg in {"-F", "--field"}:
+                    return None
+                else:
+                    fields[key] = raw if arg in {"-f", "--raw-field"} else typed_field(raw)
+            continue
+        if arg in {"-i", "--include"}:
+            include_headers = True
+        elif arg.startswith("-") or endpoint is not None or "{" in arg or "://" in arg:
+            return None
+        else:
+            endpoint = arg
+        index += 1
+    if not endpoint:
+        return None
+    return ApiRequest(method or ("POST" if fields else "GET"), endpoint, fields, headers, include_headers)
+
+
+class GhTransport:
+    # Default backend: one `gh` process per call.
+    name = "gh"
+
+    def run(self, args: list[str], *, cwd: Path | None = None, input_text: str | None = None) -> TransportResult:
+        try:
+            completed = subprocess.run(["gh", *args], cwd=cwd, text=True, input=input_text, capture_output=True)
+        except FileNotFoundError:
+            return TransportResult(127, "", "gh is not installed or not on PATH.\n")
+        return TransportResult(completed.returncode, completed.stdout, completed.stderr)
+
+
+class ConnectionPool:
+    # Idle keep-alive connections to one origin, shared by ghflow's worker threads.
+    def __init__(self, base_url: str):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self._lock = threading.Lock()
+        self._idle: list[Any] = []
+
+    def acquire(self) -> tuple[Any, bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self.connect(), False
+
+    def connect(self) -> Any:
+        import http.client
+
+        if self.scheme == "http":
+            return http.client.HTTPConnection(self.netloc, timeout=REQUEST_TIMEOUT_SECONDS)
+        return http.client.HTTPSConnection(self.netloc, timeout=REQUEST_TIMEOUT_SECONDS)
+
+    def release(self, conn: Any, reusable: bool) -> None:
+        with self._lock:
+            if reusable and len(self._idle) < MAX_IDLE_CONNECTIONS:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class HttpTransport:
+    # Serves `gh api` REST and GraphQL calls over pooled HTTP connections with
+    # the token gh is logged in with. Other gh commands (pr list, run view,
+    # ...) still run through the fallback backend.
+    name = "http"
+
+    def __init__(self, base_url: str, *, token: str | None = None, fallback: GhTransport | None = None):
+        self.base_url = base_url.rstrip("/")
+        self.graphql_url = graphql_url(self.base_url)
+        self.fallback = fallback or GhTransport()
+        self._token = token
+        self._gh_token: tuple[str, str] | None = None
+        self._token_lock = threading.Lock()
+        self._pools: dict[tuple[str, str], ConnectionPool] = {}
+        self._pools_lock = threading.Lock()
+
+    def token(self) -> str | None:
+        # The token gh is logged in with is resolved only when an API call
+        # needs it, and resolved again once `gh auth login/refresh/logout`
+        # rewrites hosts.yml or the cached token is rejected.
+        if self._token:
+            return self._token
+        env_token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+        if env_token:
+            return env_token
+        stamp = hosts_file_stamp()
+        with self._token_lock:
+            if self._gh_token is None or self._gh_token[0] != stamp:
+                result = self.fallback.run(["auth", "token"])
+                self._gh_token = (stamp, result.stdout.strip() if result.returncode == 0 else "")
+            return self._gh_token[1] or None
+
+    def forget_token(self, token: str) -> bool:
+        # Drops a cached gh token after a 401; False when the rejected token
+        # was not one gh handed out, so there is nothing new to try.
+        with self._token_lock:
+            if self._gh_token is None or self._gh_token[1] != token:
+                return False
+            self._gh_token = None
+            return True
+
+    def pool(self, url: str) -> ConnectionPool:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        with self._pools_lock:
+            if key not in self._pools:
+                self._pools[key] = ConnectionPool(url)
+            return self._pools[key]
+
+    def close(self) -> None:
+        with self._pools_lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    def run(self, args: list[str], *, cwd: Path | None = None, input_text: str | None = None) -> TransportResult:
+        request = parse_api_args(args)
+        if request is None:
+            return self.fallback.run(args, cwd=cwd, input_text=input_text)
+        import http.client
+
+        try:
+            return self.api(request)
+        except (OSError, http.client.HTTPException) as exc:
+            return TransportResult(1, "", f"error connecting to {self.base_url}: {exc}\n")
+
+    def api(self, request: ApiRequest) -> TransportResult:
+        headers = {"Accept": "application/vnd.github+json", "User-Agent": USER_AGENT, **request.headers}
+        body: bytes | None = None
+        if request.is_graphql:
+            url = self.graphql_url
+            variables = {key: value for key, value in request.fields.items() if key != "query"}
+            body = json.dumps({"query": request.fields.get("query", ""), "variables": variables}).encode("utf-8")
+        else:
+            url = f"{self.base_url}/{request.endpoint.lstrip('/')}"
+            if request.method in {"GET", "HEAD"}:
+                if request.fields:
+                    url += ("&" if "?" in url else "?") + urlencode({key: format_query_value(value) for key, value in request.fields.items()}, doseq=True)
+            elif request.fields:
+                body = json.dumps(request.fields).encode("utf-8")
+        if body is not None:
+            headers["Content-Type"] = "application/json; charset=utf-8"
+        method = "POST" if request.is_graphql else request.method
+        token = self.token()
+        status, reason, response_headers, payload = self.fetch(method, url, headers, body, token)
+        if status == 401 and token and self.forget_token(token):
+            status, reason, response_headers, payload = self.fetch(method, url, headers, body, self.token())
+        text = payload.decode("utf-8", errors="replace")
+        stdout = text
+        if request.include_headers:
+            head = [f"HTTP/1.1 {status} {reason}", *(f"{name}: {value}" for name, value in response_headers)]
+            stdout = "\r\n".join(head) + "\r\n\r\n" + text
+        error = response_error(status, text, graphql=request.is_graphql)
+        if error:
+            return TransportResult(1, stdout, error + "\n")
+        return TransportResult(0, stdout, "")
+
+    def fetch(self, method: str, url: str, headers: dict[str, str], body: bytes | None, token: str | None) -> tuple[int, str, list[tuple[str, str]], bytes]:
+        headers = dict(headers)
+        if token:
+            headers["Authorization"] = f"token {token}"
+        for _ in range(MAX_REDIRECTS + 1):
+            status, reason, response_headers, payload = self.send(method, url, headers, body)
+            location = header_value(response_headers, "location")
+            if status not in REDIRECT_STATUSES or not location:
+                break
+            target = urljoin(url, location)
+            if urlsplit(target).netloc != urlsplit(url).netloc:
+                headers.pop("Authorization", None)
+            if status == 303:
+                method, body = "GET", None
+            url = target
+        return status, reason, response_headers, payload
+
+    def send(self, method: str, url: str, headers: dict[str, str], body: bytes | None) -> tuple[int, str, list[tuple[str, str]], bytes]:
+        import http.client
+
+        pool = self.pool(url)
+        parts = urlsplit(url)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        conn, reused = pool.acquire()
+        while True:
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+            except (http.client.HTTPException, ConnectionError):
+                conn.close()
+                # A pooled connection the server already dropped fails with a
+                # reset, a broken pipe or an empty/garbled status line; retry
+                # once on a fresh connection.
+                if reused:
+                    conn, reused = pool.connect(), False
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            pool.release(conn, not response.will_close)
+            return response.status, response.reason, response.getheaders(), payload
+
+
+def format_query_value(value: Any) -> Any:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return [format_query_value(item) for item in value]
+    return "" if value is None else value
+
+
+def header_value(headers: list[tuple[str, str]], name: str) -> str | None:
+    for header_name, value in headers:
+        if header_name.lower() == name:
+            return value
+    return None
+
+
+def graphql_url(base_url: str) -> str:
+    # github.com serves GraphQL at api.github.com/graphql, GHES at /api/graphql
+    # next to the /api/v3 REST root.
+    if base_url.endswith("/api/v3"):
+        return base_url[: -len("/v3")] + "/graphql"
+    return base_url + "/graphql"
+
+
+def response_error(status: int, text: str, *, graphql: bool) -> str | None:
+    # Mirrors the messages gh prints on stderr, which error classification and
+    # rate-limit detection match against.
+    try:
+        payload = json.loads(text) if text else None
+    except ValueError:
+        payload = None
+    if graphql and status < 300 and isinstance(payload, dict) and payload.get("errors"):
+        messages = [str(item.get("message") or item) if isinstance(item, dict) else str(item) for item in payload["errors"]]
+        return "GraphQL: " + ", ".join(messages)
+    if status < 300:
+        return None
+    message = payload.get("message") if isinstance(payload, dict) else None
+    return f"gh: {message or 'HTTP error'} (HTTP {status})"
+
+
+def gh_config_dir() -> Path:
+    override = os.environ.get("GH_CONFIG_DIR")
+    if override:
+        return Path(override).expanduser()
+    xdg = os.environ.get("XDG_CONFIG_HOME")
+    if xdg:
+        return Path(xdg).expanduser() / "gh"
+    if sys.platform == "win32" and os.environ.get("AppData"):
+        return Path(os.environ["AppData"]) / "GitHub CLI"
+    return Path.home() / ".config" / "gh"
+
+
+def hosts_file_stamp() -> str:
+    # gh rewrites hosts.yml whenever the stored token changes.
+    path = gh_config_dir() / "hosts.yml"
+    try:
+        mtime = str(path.stat().st_mtime_ns)
+    except OSError:
+        mtime = "-"
+    return ":".join((os.environ.get("GH_HOST") or "github.com", str(path), mtime))
+
+
+def credentials_key() -> str:
+    # Whose credentials a call runs with: the API endpoint, a digest of an
+    # environment token and gh's stored login. The daemon serves callers with
+    # different GH_HOST/GH_TOKEN, so caches of viewer data are scoped by it.
+    token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN") or ""
+    digest = hashlib.sha256(token.encode()).hexdigest()[:16] if token else "-"
+    return "|".join((api_base_url(), digest, hosts_file_stamp()))
+
+
+def api_base_url() -> str:
+    override = os.environ.get(API_URL_ENV)
+    if override:
+        return override.rstrip("/")
+    host = os.environ.get("GH_HOST") or "github.com"
+    if host == "github.com":
+        return DEFAULT_API_URL
+    return f"https://{host}/api/v3"
+
+
+_LOCK = threading.Lock()
+_TRANSPORTS: dict[tuple[str, str, str], GhTransport | HttpTransport] = {}
+_OVERRIDE: GhTransport | HttpTransport | None = None
+
+
+def install(transport: GhTransport | HttpTransport | None) -> GhTransport | HttpTransport | None:
+    # Replaces the environment-selected backend (tests, embedding); returns
+    # the previous override so callers can restore it.
+    global _OVERRIDE
+    previous, _OVERRIDE = _OVERRIDE, transport
+    return previous
+
+
+def current() -> GhTransport | HttpTransport:
+    # GHFLOW_TRANSPORT=http opts in to the HTTP backend; gh stays the default.
+    # Backends are kept per process and per caller credentials, so the daemon
+    # reuses one connection pool across one caller's commands.
+    if _OVERRIDE is not None:
+        return _OVERRIDE
+    kind = (os.environ.get(TRANSPORT_ENV) or "gh").strip().lower()
+    key = (kind, api_base_url(), credentials_key()) if kind == "http" else (kind, "", "")
+    retired: list[GhTransport | HttpTransport] = []
+    with _LOCK:
+        transport = _TRANSPORTS.get(key)
+        if transport is None:
+            transport = HttpTransport(key[1]) if kind == "http" else GhTransport()
+            _TRANSPORTS[key] = transport
+            while len(_TRANSPORTS) > MAX_TRANSPORTS:
+                retired.append(_TRANSPORTS.pop(next(iter(_TRANSPORTS))))
+    for stale in retired:
+        if isinstance(stale, HttpTransport):
+            stale.close()
+    return transport
+
+
+def run_gh(args: list[str], *, cwd: Path | None = None, input_text: str | None = None) -> TransportResult:
+    return current().run(list(args), cwd=cwd, input_text=input_text)
@@ -3,12 +3,13 @@ from __future__ import annotations
 
 import argparse
 import json
-import re
-import subprocess
 import sys
 from collections.abc import Iterable
 
-REPO_PATTERN = re.compile(r"^[^/\s]+/[^/\s]+$")
+from . import repo_context
+from . import repo_metadata
+from . import transport
+from . import warm
 
 
 class GhError(RuntimeError):
@@ -18,7 +19,7 @@ class GhError(RuntimeError):
 
 
 def _run_gh_json(args: list[str]) -> object:
-    proc = subprocess.run(args, text=True, capture_output=True)
+    proc = transport.run_gh(args[1:])
     if proc.returncode != 0:
         message = (proc.stderr or proc.stdout or "").strip() or "gh command failed"
         raise GhError(message, proc.returncode)
@@ -46,8 +47,12 @@ def graphql(query: str, variables: dict[str, object] | None = None) -> object:
     return _run_gh_json(cmd)
 
 
-def repo_view(repo: str) -> dict[str, object]:
+def repo_view(repo: str, *, refresh: bool = False, need_starred: bool = False) -> dict[str, object]:
+    # Only callers that read viewerHasStarred are held to its shorter TTL.
     validate_repo_reference(repo)
+    cached = None if refresh else repo_metadata.lookup(repo)
+    if cached is not None and cached.get("id") and (not need_starred or "viewerHasStarred" in cached):
+        return cached
     payload = _run_gh_json(
         [
             "gh",
@@ -55,12 +60,12 @@ def repo_view(repo: str) -> dict[str, object]:
             "view",
             repo,
             "--json",
-            "id,nameWithOwner,viewerHasStarred,url",
+            repo_metadata.VIEW_FIELDS,
         ]
     )
     if not isinstance(payload, dict):
         raise GhError("Unexpected repo view response shape.")
-    return payload
+    return repo_metadata.record(repo, payload)
 
 
 def _page_size(limit: int, default: int = 100) -> int:
@@ -71,7 +76,7 @@ def _page_size(limit: int, default: int = 100) -> int:
 
 def validate_repo_reference(repo: str) -> str:
     value = repo.strip()
-    if not REPO_PATTERN.match(value):
+    if not repo_context.is_repo_reference(value):
         raise GhError(f"Invalid repository reference '{repo}'. Use owner/repo.", 64)
     return value
 
@@ -105,6 +110,10 @@ def collect_repo_targets(repos: Iterable[str], repo_file: str | None = None) ->
 
 
 def viewer_lists(limit: int = 0) -> dict[str, object]:
+    return warm.memoize(("viewer_lists", limit), lambda: _fetch_viewer_lists(limit))
+
+
+def _fetch_viewer_lists(limit: int) -> dict[str, object]:
     query = """
     query($first: Int!, $after: String) {
       viewer {
@@ -349,6 +358,22 @@ def viewer_stars(limit: int = 0) -> dict[str, object]:
     return {"totalCount": total_count, "items": items}
 
 
+def starred_flags(repo_ids: Iterable[str]) -> dict[str, bool]:
+    # Batched viewerHasStarred lookup by node id, 100 ids per query.
+    targets = list(dict.fromkeys(repo_id for repo_id in repo_ids if repo_id))
+    flags: dict[str, bool] = {}
+    for start in range(0, len(targets), 100):
+        payload = graphql(
+            "query($ids: [ID!]!) { nodes(ids: $ids) { ... on Repository { id viewerHasStarred } } }",
+            {"ids": targets[start : start + 100]},
+        )
+        nodes = ((payload.get("data") or {}).get("nodes") if isinstance(payload, dict) else None) or []
+        for node in nodes:
+            if isinstance(node, dict) and isinstance(node.get("id"), str):
+                flags[node["id"]] = bool(node.get("viewerHasStarred"))
+    return flags
+
+
 def repo_memberships(repo_ids: Iterable[str]) -> dict[str, list[dict[str, object]]]:
     targets = [repo_id for repo_id in repo_ids if repo_id]
     memberships: dict[str, list[dict[str, object]]] = {repo_id: [] for repo_id in targets}
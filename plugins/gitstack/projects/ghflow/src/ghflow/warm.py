@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, TypeVar
+
+
+DEFAULT_TTL_SECONDS = 60.0
+
+T = TypeVar("T")
+
+
+class WarmCache:
+    # In-memory memo for idempotent lookups (repo resolution, default branches,
+    # viewer lists). Only `ghflow daemon serve` installs one, so one-shot runs
+    # always see fresh data.
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[Any, ...], tuple[float, Any]] = {}
+
+    def get(self, key: tuple[Any, ...], compute: Callable[[], T]) -> T:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        value = compute()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+ACTIVE: WarmCache | None = None
+
+
+def memoize(key: tuple[Any, ...], compute: Callable[[], T]) -> T:
+    cache = ACTIVE
+    if cache is None:
+        return compute()
+    from .transport import credentials_key
+
+    # Entries are scoped to the caller's credentials, so one caller's viewer
+    # data is never served to another.
+    return cache.get((credentials_key(), *key), compute)
@@ -1,9 +1,21 @@
 from __future__ import annotations
 
 import contextlib
+import dis
+import http.server
+import importlib.util
 import io
 import json
+import marshal
+import os
+import random
+import socket
+import subprocess
 import sys
+import tempfile
+import threading
+import time
+import types
 import unittest
 import zipfile
 from pathlib import Path
@@ -16,7 +28,37 @@ if str(PROJECT_SRC) not in sys.path:
 
 import ghflow  # noqa: E402
 from ghflow import checks  # noqa: E402
+from ghflow import daemon  # noqa: E402
+from ghflow import log_cache  # noqa: E402
+from ghflow import repo_context  # noqa: E402
+from ghflow import repo_metadata  # noqa: E402
 from ghflow import runtime  # noqa: E402
+from ghflow import state  # noqa: E402
+from ghflow import transport  # noqa: E402
+from ghflow import warm  # noqa: E402
+
+
+# Repo-context resolution caches under the state dir, so no test may touch the
+# user's real cache.
+_CACHE_DIR = tempfile.TemporaryDirectory()
+_CACHE_ENV = mock.patch.dict(os.environ, {"GHFLOW_CACHE_DIR": _CACHE_DIR.name})
+
+
+def setUpModule() -> None:
+    _CACHE_ENV.start()
+
+
+def tearDownModule() -> None:
+    _CACHE_ENV.stop()
+    _CACHE_DIR.cleanup()
+
+
+def fake_run_log_stream(log_text: str, error: str = ""):
+    def stream(run_id, repo, repo_root, on_lines):
+        on_lines(log_text.splitlines())
+        return error
+
+    return stream
 
 
 class ParseRootArgsTests(unittest.TestCase):
@@ -71,6 +113,487 @@ class ContractTests(unittest.TestCase):
             spec.handler(spec, ["--pr", "123", "--repo", "openai/codex", "--reply-body", "thanks"], False)
         self.assertEqual(ctx.exception.code, "invalid_arguments")
 
+    def test_reviews_address_fetches_streams_concurrently_in_stable_order(self) -> None:
+        # Every fake waits for the other two, so a sequential fetch would break the barrier.
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_list(endpoint, **kwargs):
+            barrier.wait()
+            if endpoint.endswith("/issues/7/comments"):
+                return [{"id": 1, "user": {"login": "a"}, "body": "conversation"}]
+            return [{"id": 2, "user": {"login": "b"}, "body": "orphan", "path": "x.py"}, {"id": 3, "body": "threaded"}]
+
+        def fake_threads(repo, pr):
+            barrier.wait()
+            return [{"isResolved": False, "isOutdated": False, "path": "y.py", "comments": {"nodes": [{"databaseId": 3, "body": "threaded"}]}}]
+
+        spec = runtime.COMMAND_SPECS[("reviews", "address")]
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.dict(os.environ, {"GHFLOW_CACHE_DIR": temp_dir}), mock.patch.object(
+            runtime, "gh_api_paginated_list", side_effect=fake_list
+        ), mock.patch.object(runtime, "fetch_review_threads", side_effect=fake_threads):
+            response = spec.handler(spec, ["--pr", "7", "--repo", "openai/codex"], True)
+
+        entries = json.loads(response.result.stdout)["entries"]
+        self.assertEqual(
+            [(item["index"], item["type"], item["comment_id"]) for item in entries],
+            [(1, "review_thread_comment", 3), (2, "review_comment", 2), (3, "conversation_comment", 1)],
+        )
+
+    def test_reviews_address_syncs_incrementally_from_snapshot(self) -> None:
+        spec = runtime.COMMAND_SPECS[("reviews", "address")]
+        requested_fields: list[object] = []
+        rest = {
+            "issues": [{"id": 1, "user": {"login": "a"}, "body": "conversation"}],
+            "pulls": [{"id": 2, "user": {"login": "b"}, "body": "orphan"}, {"id": 3, "body": "threaded"}],
+        }
+        github = {
+            "conversation": [1, 4],
+            "threads": [
+                {"id": "T1", "isResolved": True, "isOutdated": False, "path": "y.py", "comments": [3]},
+                {"id": "T2", "isResolved": False, "isOutdated": False, "path": "z.py", "comments": [2, 5]},
+            ],
+            "bodies": {2: "orphan, edited", 3: "threaded", 5: "new thread", 7: "replacement"},
+        }
+
+        def fake_list(endpoint, **kwargs):
+            requested_fields.append(kwargs.get("fields"))
+            return rest["issues" if "/issues/" in endpoint else "pulls"]
+
+        def fake_threads(repo, pr):
+            return [{"id": "T1", "isResolved": False, "isOutdated": False, "path": "y.py", "comments": {"totalCount": 1, "nodes": [{"databaseId": 3, "body": "threaded"}]}}]
+
+        def fake_pages(repo, pr, query, connection="reviewThreads"):
+            if query is runtime.CONVERSATION_COMMENT_IDS_QUERY:
+                self.assertEqual(connection, "comments")
+                return [{"databaseId": comment_id} for comment_id in github["conversation"]]
+            self.assertIs(query, runtime.REVIEW_THREAD_STATES_QUERY)
+            return [
+                {**thread, "comments": {"totalCount": len(thread["comments"]), "nodes": [{"databaseId": comment_id} for comment_id in thread["comments"]]}}
+                for thread in github["threads"]
+            ]
+
+        def fake_graphql(query, variables):
+            thread = next(thread for thread in github["threads"] if thread["id"] == variables["id0"])
+            nodes = [{"databaseId": comment_id, "body": github["bodies"][comment_id]} for comment_id in thread["comments"]]
+            return {"data": {"t0": {"comments": {"pageInfo": {"hasNextPage": False}, "nodes": nodes}}}}
+
+        def run(argv):
+            response = spec.handler(spec, ["--pr", "7", "--repo", "openai/codex", "--include-resolved", *argv], True)
+            return [(item["index"], item["comment_id"], item["body"]) for item in json.loads(response.result.stdout)["entries"]]
+
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.dict(os.environ, {"GHFLOW_CACHE_DIR": temp_dir}), mock.patch.object(
+            runtime, "gh_api_paginated_list", side_effect=fake_list
+        ), mock.patch.object(runtime, "fetch_review_threads", side_effect=fake_threads) as full_threads:
+            self.assertEqual(run([]), [(1, 3, "threaded"), (2, 2, "orphan"), (3, 1, "conversation")])
+            self.assertEqual(requested_fields, [None, None])
+
+            rest["issues"] = [{"id": 4, "user": {"login": "c"}, "body": "later"}]
+            rest["pulls"] = [{"id": 2, "user": {"login": "b"}, "body": "orphan, edited"}, {"id": 5, "body": "new thread"}]
+            with mock.patch.object(runtime, "fetch_review_thread_pages", side_effect=fake_pages), mock.patch(
+                "ghflow.user_state.graphql", side_effect=fake_graphql
+            ) as graphql:
+                incremental = run([])
+                self.assertEqual(
+                    incremental,
+                    [(1, 2, "orphan, edited"), (2, 5, "new thread"), (3, 3, "threaded"), (4, 1, "conversation"), (5, 4, "later")],
+                )
+                self.assertEqual(len(requested_fields), 4)
+                self.assertTrue(all(fields and fields.get("since") for fields in requested_fields[2:]))
+                self.assertEqual(full_threads.call_count, 1)
+                self.assertEqual(graphql.call_count, 1)
+
+                # Deletions never show up in `since`. One comment deleted and
+                # another added keeps every count the same; ids still differ.
+                github["conversation"] = [4, 6]
+                github["threads"][1]["comments"] = [5, 7]
+                rest["issues"] = [{"id": 6, "user": {"login": "d"}, "body": "newest"}]
+                rest["pulls"] = [{"id": 7, "body": "replacement"}]
+                self.assertEqual(run([]), [(1, 5, "new thread"), (2, 7, "replacement"), (3, 3, "threaded"), (4, 4, "later"), (5, 6, "newest")])
+                self.assertEqual(requested_fields[4:], [{"since": mock.ANY}, {"since": mock.ANY}])
+                self.assertEqual(graphql.call_count, 2)
+                snapshot = runtime.load_review_snapshot("openai/codex", 7)
+                self.assertEqual([[comment["id"] for comment in snapshot[key]] for key in ("conversation", "review")], [[4, 6], [3, 5, 7]])
+
+                # Unchanged threads are served from the snapshot.
+                rest["issues"], rest["pulls"] = [], []
+                self.assertEqual(len(run([])), 5)
+                self.assertEqual(graphql.call_count, 2)
+
+            rest["issues"], rest["pulls"] = [{"id": 1, "body": "conversation"}], []
+            self.assertEqual(run(["--no-cache"]), [(1, 3, "threaded"), (2, 1, "conversation")])
+            self.assertEqual(requested_fields[-2:], [None, None])
+
+    def test_review_snapshots_are_capped(self) -> None:
+        snapshot = {"version": runtime.REVIEW_SNAPSHOT_VERSION, "repo": "o/r", "pr": 1, "since": "x", "conversation": [], "review": [], "threads": []}
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.dict(os.environ, {"GHFLOW_CACHE_DIR": temp_dir}), mock.patch.object(runtime, "MAX_REVIEW_SNAPSHOTS", 2):
+            for pr in (1, 2, 3):
+                runtime.store_review_snapshot(runtime.review_snapshot_name("o/r", pr), {**snapshot, "pr": pr})
+                os.utime(state.state_path(runtime.review_snapshot_name("o/r", pr)), ns=(pr, pr))
+            runtime.store_review_snapshot(runtime.review_snapshot_name("o/r", 4), {**snapshot, "pr": 4})
+            self.assertEqual([runtime.load_review_snapshot("o/r", pr) is not None for pr in (1, 2, 3, 4)], [False, False, True, True])
+
+            large = {**snapshot, "pr": 4, "conversation": [{"id": 1, "body": "x" * runtime.REVIEW_SNAPSHOT_MAX_BYTES}]}
+            runtime.store_review_snapshot(runtime.review_snapshot_name("o/r", 4), large)
+            self.assertIsNone(runtime.load_review_snapshot("o/r", 4))
+
+    def test_reviews_address_posts_replies_in_parallel_with_per_reply_status(self) -> None:
+        context = (
+            [{"id": 13, "user": {"login": "a"}, "body": "conversation"}],
+            [{"id": 11, "body": "rate limited once"}, {"id": 12, "body": "broken"}],
+            [],
+        )
+        attempts: dict[str, int] = {}
+        sleeps: list[float] = []
+
+        def fake_gh(args, **kwargs):
+            key = args[3] if args[0] == "api" else args[-1]
+            attempts[key] = attempts.get(key, 0) + 1
+            if "comments/11/" in key and attempts[key] == 1:
+                return runtime.RunResult(1, "", "HTTP 403: You have exceeded a secondary rate limit.")
+            if "comments/12/" in key or key.endswith("(ref: 12)"):
+                return runtime.RunResult(1, "", "HTTP 404: Not Found")
+            return runtime.RunResult(0, "", "")
+
+        stdout = io.StringIO()
+        with mock.patch.object(runtime, "fetch_review_context", return_value=context), mock.patch.object(
+            runtime, "run_gh_text", side_effect=fake_gh
+        ), mock.patch.object(runtime.time, "sleep", side_effect=sleeps.append), contextlib.redirect_stdout(stdout):
+            exit_code = runtime.main(["--json", "reviews", "address", "--pr", "7", "--repo", "o/r", "--selection", "1,2,3", "--reply-body", "done"])
+
+        envelope = json.loads(stdout.getvalue())
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(envelope["error"]["code"], "reply_failed")
+        actions = envelope["data"]["actions"]
+        self.assertEqual([(action["comment_id"], action["status"]) for action in actions], [(11, "replied"), (12, "failed"), (13, "posted")])
+        self.assertEqual(actions[1]["error"], "HTTP 404: Not Found")
+        self.assertEqual(sleeps, [runtime.REPLY_RETRY_BASE_SECONDS])
+        self.assertEqual(attempts["repos/o/r/pulls/comments/12/replies"], 1)
+        self.assertEqual(attempts["done (ref: 12)"], 1)
+
+    def test_review_threads_page_only_long_threads_in_batched_queries(self) -> None:
+        totals = {"long": 250, "full": 150, "short": 5}
+        queries: list[dict[str, object]] = []
+
+        def comments_page(thread_id, after):
+            start = int(after or 0)
+            end = min(start + 100, totals[thread_id])
+            return {
+                "pageInfo": {"hasNextPage": end < totals[thread_id], "endCursor": str(end)},
+                "nodes": [{"databaseId": totals[thread_id] * 1000 + index} for index in range(start, end)],
+            }
+
+        def fake_graphql(query, variables):
+            queries.append(variables)
+            if "reviewThreads" in query:
+                nodes = [{"id": thread_id, "isResolved": False, "comments": comments_page(thread_id, None)} for thread_id in totals]
+                return {"data": {"repository": {"pullRequest": {"reviewThreads": {"pageInfo": {"hasNextPage": False}, "nodes": nodes}}}}}
+            data = {}
+            for key, thread_id in variables.items():
+                if key.startswith("id"):
+                    index = key[2:]
+                    self.assertIn(f"t{index}: node(id: $id{index})", query)
+                    data[f"t{index}"] = {"comments": comments_page(thread_id, variables[f"after{index}"])}
+            return {"data": data}
+
+        with mock.patch("ghflow.user_state.graphql", side_effect=fake_graphql):
+            threads = runtime.fetch_review_threads("openai/codex", 7)
+
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(sorted(key for key in queries[1] if key.startswith("id")), ["id0", "id1"])
+        for thread in threads:
+            ids = [node["databaseId"] for node in thread["comments"]["nodes"]]
+            self.assertEqual(ids, [totals[thread["id"]] * 1000 + index for index in range(totals[thread["id"]])])
+
+def legacy_publish_git_state() -> dict[str, object]:
+    # The per-field git calls publish context made before the porcelain v2 probe.
+    def git(*args):
+        return subprocess.run(["git", *args], capture_output=True, text=True)
+
+    head_ref = git("rev-parse", "--abbrev-ref", "HEAD").stdout.strip()
+    branch = None if not head_ref or head_ref == "HEAD" else head_ref
+    remote = git("config", "--get", f"branch.{branch}.remote").stdout.strip() or None if branch else None
+    merge = git("config", "--get", f"branch.{branch}.merge").stdout.strip().removeprefix("refs/heads/") or None if branch else None
+    ahead = behind = 0
+    if remote and merge:
+        counts = git("rev-list", "--left-right", "--count", "HEAD...@{upstream}").stdout.split()
+        if len(counts) == 2:
+            ahead, behind = int(counts[0]), int(counts[1])
+    staged = unstaged = untracked = total = 0
+    for line in git("status", "--porcelain=v1").stdout.splitlines():
+        total += 1
+        if line.startswith("??"):
+            untracked += 1
+            continue
+        staged += line[:1] != " "
+        unstaged += line[1:2] != " "
+    return {
+        "current_branch": branch,
+        "detached_head": branch is None,
+        "upstream": {"configured": bool(remote and merge), "remote": remote, "branch": merge, "same_name_remote": bool(remote and merge and merge == branch), "ahead": ahead, "behind": behind},
+        "changes": {"tracked": total - untracked, "staged": staged, "unstaged": unstaged, "untracked": untracked, "total_paths": total},
+    }
+
+
+class PublishContextTests(unittest.TestCase):
+    def git(self, cwd: Path, *args: str) -> None:
+        env = {**os.environ, "GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@example.com", "GIT_COMMITTER_NAME": "t", "GIT_COMMITTER_EMAIL": "t@example.com"}
+        subprocess.run(["git", *args], cwd=cwd, env=env, check=True, capture_output=True)
+
+    def test_git_probe_matches_legacy_fields(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            remote, clone, other = root / "remote.git", root / "clone", root / "other"
+            self.git(root, "init", "-q", "--bare", "-b", "main", str(remote))
+            self.git(root, "clone", "-q", str(remote), str(clone))
+            self.git(clone, "checkout", "-q", "-b", "main")
+            for name in ("a.txt", "b.txt", "c.txt", "d.txt"):
+                (clone / name).write_text(name)
+            self.git(clone, "add", ".")
+            self.git(clone, "commit", "-q", "-m", "base")
+            self.git(clone, "push", "-q", "-u", "origin", "main")
+            self.git(root, "clone", "-q", str(remote), str(other))
+            (other / "e.txt").write_text("upstream")
+            self.git(other, "add", ".")
+            self.git(other, "commit", "-q", "-m", "upstream")
+            self.git(other, "push", "-q", "origin", "main")
+            self.git(clone, "fetch", "-q")
+            (clone / "a.txt").write_text("local")
+            self.git(clone, "commit", "-q", "-am", "local 1")
+            (clone / "b.txt").write_text("local")
+            self.git(clone, "commit", "-q", "-am", "local 2")
+            (clone / "a.txt").write_text("unstaged")
+            (clone / "b.txt").write_text("staged")
+            self.git(clone, "add", "b.txt")
+            (clone / "b.txt").write_text("staged then edited")
+            self.git(clone, "mv", "c.txt", "renamed.txt")
+            (clone / "new.txt").write_text("new")
+            self.git(clone, "add", "new.txt")
+            (clone / "untracked.txt").write_text("u")
+
+            def context() -> dict[str, object]:
+                spec = runtime.COMMAND_SPECS[("publish", "context")]
+                with mock.patch.object(runtime, "origin_repo", return_value="openai/codex"), mock.patch.object(
+                    runtime, "default_branch_name", return_value="main"
+                ), mock.patch.object(runtime, "gh_json", return_value=[]):
+                    payload = json.loads(spec.handler(spec, [], True).result.stdout)
+                return {key: payload[key] for key in ("current_branch", "detached_head", "upstream", "changes")}
+
+            with contextlib.chdir(clone):
+                scenarios = {"tracking main": None, "feature without upstream": ["checkout", "-q", "-b", "feature/x"], "detached": ["checkout", "-q", "--detach"]}
+                for name, command in scenarios.items():
+                    with self.subTest(scenario=name):
+                        if command:
+                            self.git(clone, *command)
+                        state = context()
+                        self.assertEqual(state, legacy_publish_git_state())
+                        if name == "tracking main":
+                            self.assertEqual((state["upstream"]["ahead"], state["upstream"]["behind"]), (2, 1))
+                            self.assertEqual(state["changes"]["total_paths"], 5)
+
+            unborn = root / "unborn"
+            self.git(root, "init", "-q", str(unborn))
+            (unborn / "x.txt").write_text("x")
+            with contextlib.chdir(unborn):
+                self.assertEqual(context(), legacy_publish_git_state())
+
+    def test_publish_lookups_overlap_local_git(self) -> None:
+        # Each fake waits for the other two, so a sequential handler would break the barrier.
+        barrier = threading.Barrier(3, timeout=5)
+        pr = {"number": 9, "url": "u", "title": "t", "baseRefName": "main", "headRefName": "feature", "isDraft": True}
+
+        def waiting(result):
+            def fake(*args, **kwargs):
+                barrier.wait()
+                return result
+
+            return fake
+
+        def fake_git(args, **kwargs):
+            if args[0] == "ls-remote":
+                barrier.wait()
+            return runtime.RunResult(0, "subject\n", "")
+
+        probe = runtime.GitStatusProbe("feature", "origin", "feature", 1, 0, 0, 0, 0, 0)
+        context = repo_context.RepoContext(Path("/x"), Path("/x/.git"), "git@github.com:openai/codex.git", "openai/codex", "feature")
+        with mock.patch.object(repo_context, "load", return_value=context), mock.patch.object(
+            runtime, "default_branch_name", side_effect=waiting("main")
+        ), mock.patch.object(runtime, "find_open_pr", side_effect=waiting([pr])):
+            with mock.patch.object(runtime, "probe_git_status", side_effect=waiting(probe)):
+                spec = runtime.COMMAND_SPECS[("publish", "context")]
+                payload = json.loads(spec.handler(spec, [], True).result.stdout)
+            self.assertEqual((payload["default_branch"], payload["open_pr"]["number"]), ("main", 9))
+
+            barrier.reset()
+            with mock.patch.object(runtime, "tracking_remote_name", return_value="origin"), mock.patch.object(
+                runtime, "tracking_branch_name", return_value="feature"
+            ), mock.patch.object(runtime, "run_git_text", side_effect=fake_git):
+                spec = runtime.COMMAND_SPECS[("publish", "open")]
+                output = spec.handler(spec, ["--dry-run"], False).result.stdout
+            self.assertIn("would reuse existing PR", output)
+
+    def test_parse_status_porcelain_v2(self) -> None:
+        text = "\n".join([
+            "# branch.oid 0123",
+            "# branch.head feature",
+            "# branch.upstream origin/feature",
+            "# branch.ab +3 -1",
+            "1 .M N... 100644 100644 100644 a a a.txt",
+            "1 MM N... 100644 100644 100644 b b b.txt",
+            "2 R. N... 100644 100644 100644 c c R100 new.txt\told.txt",
+            "u UU N... 100644 100644 100644 100644 d d d d d.txt",
+            "? untracked.txt",
+        ])
+        self.assertEqual(runtime.parse_status_porcelain_v2(text), ("feature", 3, 1, (3, 3, 1, 5)))
+
+
+class RepoContextTests(unittest.TestCase):
+    def git(self, cwd: Path, *args: str) -> None:
+        env = {**os.environ, "GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@example.com", "GIT_COMMITTER_NAME": "t", "GIT_COMMITTER_EMAIL": "t@example.com"}
+        subprocess.run(["git", *args], cwd=cwd, env=env, check=True, capture_output=True)
+
+    def setUp(self) -> None:
+        repo_context._MEMO.clear()
+        repo_context._LOCATED.clear()
+        self.addCleanup(repo_context._MEMO.clear)
+        self.addCleanup(repo_context._LOCATED.clear)
+
+    def test_load_resolves_checkout_and_caches_on_disk(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.dict(os.environ, {"GHFLOW_CACHE_DIR": temp_dir}):
+            root = Path(temp_dir).resolve() / "checkout"
+            self.git(Path(temp_dir), "init", "-q", "-b", "main", str(root))
+            self.git(root, "remote", "add", "origin", "git@github.com:openai/codex.git")
+            self.git(root, "config", "branch.main.remote", "origin")
+            self.git(root, "config", "branch.main.merge", "refs/heads/trunk")
+            (root / "pkg").mkdir()
+            self.assertIsNone(repo_context.load(root / "pkg").branch)
+            self.git(root, "commit", "-q", "--allow-empty", "-m", "base")
+
+            context = repo_context.load(root / "pkg")
+            self.assertEqual((context.root, context.repo, context.branch), (root, "openai/codex", "main"))
+            self.assertEqual(context.upstream(), ("origin", "trunk"))
+            self.assertEqual(context.upstream("other"), (None, None))
+
+            # A fresh process (empty memo) answers from disk without git.
+            repo_context._MEMO.clear()
+            with mock.patch.object(repo_context, "run_git", side_effect=AssertionError("git was called")):
+                self.assertEqual(repo_context.load(root / "pkg"), context)
+                self.git(root, "checkout", "-q", "-b", "feature")
+                self.assertEqual(repo_context.load(root / "pkg").branch, "feature")
+
+            # Config edits change the config mtime and force a fresh read.
+            config = root / ".git" / "config"
+            self.git(root, "config", "url.git@github.com:acme/.insteadOf", "acme:")
+            self.git(root, "remote", "set-url", "origin", "acme:widgets.git")
+            stat = config.stat()
+            os.utime(config, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            self.assertEqual(repo_context.load(root / "pkg").repo, "acme/widgets")
+
+    def test_load_tracks_included_and_overridden_config_files(self) -> None:
+        def touch(path: Path, text: str) -> None:
+            mtime = path.stat().st_mtime_ns if path.exists() else 0
+            path.write_text(text, encoding="utf-8")
+            os.utime(path, ns=(mtime, mtime + 1_000_000_000))
+
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.dict(os.environ, {"GHFLOW_CACHE_DIR": temp_dir}):
+            root = Path(temp_dir).resolve() / "checkout"
+            self.git(Path(temp_dir), "init", "-q", "-b", "main", str(root))
+            self.git(root, "remote", "add", "origin", "acme:widgets.git")
+            included = Path(temp_dir) / "included.gitconfig"
+            touch(included, '[url "git@github.com:acme/"]\n\tinsteadOf = acme:\n')
+            self.git(root, "config", "include.path", str(included))
+            self.assertEqual(repo_context.load(root).repo, "acme/widgets")
+            touch(included, '[url "git@github.com:other/"]\n\tinsteadOf = acme:\n')
+            self.assertEqual(repo_context.load(root).repo, "other/widgets")
+
+            system = Path(temp_dir) / "system.gitconfig"
+            touch(system, "")
+            with mock.patch.dict(os.environ, {"GIT_CONFIG_SYSTEM": str(system)}), mock.patch.object(
+                repo_context, "run_git", wraps=repo_context.run_git
+            ) as run_git:
+                # Overridden environments are memoized in-process only.
+                self.assertEqual(repo_context.load(root).repo, "other/widgets")
+                self.assertEqual(repo_context.load(root).repo, "other/widgets")
+                self.assertEqual(run_git.call_count, 2)
+                touch(system, '[branch "main"]\n\tremote = upstream\n\tmerge = refs/heads/trunk\n')
+                self.assertEqual(repo_context.load(root).upstream("main"), ("upstream", "trunk"))
+                self.assertEqual(run_git.call_count, 4)
+            self.assertEqual(repo_context.load(root).upstream("main"), (None, None))
+
+    def test_load_outside_checkout_starts_no_git(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.object(
+            repo_context, "find_checkout", return_value=None
+        ), mock.patch.object(repo_context, "run_git", side_effect=AssertionError("git was called")):
+            self.assertIsNone(repo_context.load(Path(temp_dir)))
+
+
+class RepoMetadataTests(unittest.TestCase):
+    def test_repo_view_and_default_branch_share_ttl_cache(self) -> None:
+        from ghflow import stars_cli, user_state
+
+        payload = {"id": "R_1", "nameWithOwner": "openai/codex", "url": "https://github.com/openai/codex", "viewerHasStarred": False, "defaultBranchRef": {"name": "main"}}
+        clock = [1_000_000.0]
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.dict(os.environ, {"GHFLOW_CACHE_DIR": temp_dir}), mock.patch.object(
+            repo_metadata.time, "time", side_effect=lambda: clock[0]
+        ), mock.patch.object(user_state, "_run_gh_json", return_value=payload) as gh, mock.patch.object(
+            runtime, "gh_json", side_effect=AssertionError("gh was called")
+        ):
+            self.assertFalse(user_state.repo_view("openai/codex")["viewerHasStarred"])
+            self.assertEqual(user_state.repo_view("OpenAI/Codex")["id"], "R_1")
+            self.assertEqual(runtime.default_branch_name("openai/codex", command_path=("publish", "context")), "main")
+            self.assertEqual(gh.call_count, 1)
+
+            # Writes check the flag against GitHub, so a flag cached before
+            # an unstar elsewhere cannot turn a star into a noop. Dry runs
+            # report from the cache.
+            repo_metadata.set_starred("openai/codex", True)
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(stars_cli.main(["--star", "--repo", "openai/codex", "--dry-run"]), 0)
+            self.assertEqual(gh.call_count, 1)
+            with mock.patch.object(stars_cli, "_mutate_star") as mutate, contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(stars_cli.main(["--star", "--repo", "openai/codex", "--json"]), 0)
+            mutate.assert_called_once_with("R_1", add=True)
+            self.assertEqual(gh.call_count, 2)
+
+            with contextlib.redirect_stderr(io.StringIO()) as err:
+                self.assertEqual(stars_cli.main(["--star", "--repo", "openai/codex", "--refresh"]), 64)
+            self.assertIn("real writes always check GitHub", err.getvalue())
+
+            # ghflow's own star writes keep the flag current; the flag alone
+            # expires after the short starred TTL, the rest after a day.
+            self.assertTrue(user_state.repo_view("openai/codex", need_starred=True)["viewerHasStarred"])
+            self.assertEqual(gh.call_count, 2)
+            clock[0] += repo_metadata.STARRED_TTL_SECONDS + 1
+            self.assertNotIn("viewerHasStarred", repo_metadata.lookup("openai/codex"))
+            self.assertEqual(user_state.repo_view("openai/codex")["id"], "R_1")
+            self.assertEqual(gh.call_count, 2)
+            user_state.repo_view("openai/codex", need_starred=True)
+            self.assertEqual(gh.call_count, 3)
+            user_state.repo_view("openai/codex", refresh=True)
+            self.assertEqual(gh.call_count, 4)
+
+            # List membership writes take the id from the day-long cache and
+            # batch the expired starred flags into one query.
+            clock[0] += repo_metadata.STARRED_TTL_SECONDS + 1
+            queries: list[tuple[str, object]] = []
+
+            def fake_graphql(query, variables=None):
+                queries.append((query, variables))
+                return {"data": {"nodes": [{"id": "R_1", "viewerHasStarred": True}]}}
+
+            from ghflow import lists_cli
+
+            selected = {"id": "UL_1", "name": "Tools", "slug": "tools"}
+            with mock.patch.object(lists_cli, "resolve_list", return_value=selected), mock.patch.object(
+                user_state, "graphql", side_effect=fake_graphql
+            ), mock.patch.object(lists_cli, "repo_memberships", return_value={"R_1": []}), contextlib.redirect_stdout(io.StringIO()) as out:
+                self.assertEqual(lists_cli.main(["--assign", "--list-id", "UL_1", "--repo", "openai/codex", "--dry-run", "--json"]), 0)
+            self.assertEqual(gh.call_count, 4)
+            self.assertEqual([variables for _, variables in queries], [{"ids": ["R_1"]}])
+            self.assertEqual(json.loads(out.getvalue())["results"][0]["status"], "dry-run")
+            self.assertTrue(repo_metadata.lookup("openai/codex")["viewerHasStarred"])
+            clock[0] += repo_metadata.METADATA_TTL_SECONDS + 1
+            self.assertIsNone(repo_metadata.lookup("openai/codex"))
+
 
 class UtilityTests(unittest.TestCase):
     def test_normalize_remote_url(self) -> None:
@@ -102,6 +625,42 @@ class UtilityTests(unittest.TestCase):
             "HTTP 403: Resource not accessible by personal access token",
         )
 
+    def test_paginated_list_fetches_linked_pages_concurrently_in_order(self) -> None:
+        requested: list[tuple[int, bool]] = []
+
+        def fake_gh(args, **kwargs):
+            page = int(next(arg for arg in args if arg.startswith("page=")).split("=", 1)[1])
+            requested.append((page, "-i" in args))
+            # Later pages answer first so reassembly has to restore page order.
+            time.sleep(0.01 * (5 - page))
+            body = json.dumps([{"id": page * 1000 + index} for index in range(100 if page < 4 else 7)])
+            if "-i" not in args:
+                return runtime.RunResult(0, body, "")
+            link = '<https://api.github.com/repositories/1/issues/2/comments?per_page=100&page=2>; rel="next", <https://api.github.com/repositories/1/issues/2/comments?per_page=100&page=4>; rel="last"'
+            return runtime.RunResult(0, f"HTTP/2.0 200 OK\r\nLink: {link}\r\n\r\n{body}", "")
+
+        with mock.patch.object(runtime, "run_gh_text", side_effect=fake_gh):
+            items = runtime.gh_api_paginated_list("repos/o/r/issues/2/comments", command_path=("reviews", "address"))
+
+        self.assertEqual(sorted(requested), [(1, True), (2, False), (3, False), (4, False)])
+        self.assertEqual(len(items), 307)
+        self.assertEqual([item["id"] // 1000 for item in items], sorted(item["id"] // 1000 for item in items))
+
+    def test_paginated_list_walks_sequentially_without_link_header(self) -> None:
+        requested: list[int] = []
+
+        def fake_gh(args, **kwargs):
+            page = int(next(arg for arg in args if arg.startswith("page=")).split("=", 1)[1])
+            requested.append(page)
+            body = json.dumps([{"id": page}] * (100 if page < 3 else 1))
+            return runtime.RunResult(0, f"HTTP/2.0 200 OK\n\n{body}" if "-i" in args else body, "")
+
+        with mock.patch.object(runtime, "run_gh_text", side_effect=fake_gh):
+            items = runtime.gh_api_paginated_list("repos/o/r/pulls/2/comments", command_path=("reviews", "address"))
+
+        self.assertEqual(requested, [1, 2, 3])
+        self.assertEqual(len(items), 201)
+
     def test_schema_commands_have_help_and_handlers(self) -> None:
         for command_path, spec in runtime.COMMAND_SPECS.items():
             with self.subTest(command_path=command_path):
@@ -125,7 +684,7 @@ class CiInspectRuntimeTests(unittest.TestCase):
         with (
             contextlib.redirect_stdout(stdout),
             mock.patch.object(runtime, "is_git_repo", return_value=False),
-            mock.patch.object(runtime.checks, "inspect_pr_failures", return_value=(payload, 0)),
+            mock.patch.object(checks, "inspect_pr_failures", return_value=(payload, 0)),
         ):
             exit_code = runtime.main(
                 ["--json", "ci", "inspect", "--repo", "openai/codex", "--allow-non-project"]
@@ -148,7 +707,7 @@ class CiInspectRuntimeTests(unittest.TestCase):
         with (
             contextlib.redirect_stdout(stdout),
             mock.patch.object(runtime, "is_git_repo", return_value=False),
-            mock.patch.object(runtime.checks, "inspect_pr_failures", return_value=(payload, 1)),
+            mock.patch.object(checks, "inspect_pr_failures", return_value=(payload, 1)),
         ):
             exit_code = runtime.main(
                 ["--json", "ci", "inspect", "--repo", "openai/codex", "--allow-non-project"]
@@ -160,6 +719,429 @@ class CiInspectRuntimeTests(unittest.TestCase):
         self.assertEqual(body["error"]["code"], "failing_checks")
         self.assertEqual(body["data"]["failingCount"], 1)
 
+    def test_ci_inspect_watch_streams_json_lines_without_envelope(self) -> None:
+        def fake_watch(**kwargs):
+            kwargs["emit"]({"event": "failure", "check": {"name": "test"}})
+            kwargs["emit"]({"event": "settled", "failingCount": 1})
+            return 1
+
+        stdout = io.StringIO()
+        with (
+            contextlib.redirect_stdout(stdout),
+            mock.patch.object(runtime, "is_git_repo", return_value=False),
+            mock.patch.object(checks, "watch_pr_failures", side_effect=fake_watch),
+        ):
+            exit_code = runtime.main(
+                ["--json", "ci", "inspect", "--repo", "openai/codex", "--allow-non-project", "--watch"]
+            )
+        events = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(exit_code, 1)
+        self.assertEqual([event["event"] for event in events], ["failure", "settled"])
+
+
+# Cumulative `import ghflow` time, best of several warm runs. Generous enough for
+# noisy CI machines; the lazy-import assertions catch the common regressions.
+STARTUP_IMPORT_BUDGET_US = 150_000
+LAZY_MODULES = ("ghflow.checks", "ghflow.daemon", "ghflow.lists_cli", "ghflow.log_cache", "ghflow.stars_cli", "ghflow.state", "ghflow.user_state", "tomllib")
+
+
+class StartupTests(unittest.TestCase):
+    def importtime(self, code: str, pycache: str) -> dict[str, int]:
+        env = {key: item for key, item in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+        env.update({"PYTHONPATH": str(PROJECT_SRC), "PYTHONPYCACHEPREFIX": pycache, "GHFLOW_SOCKET": ""})
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+        cumulative: dict[str, int] = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, total, name = line.split("|", 2)
+            if total.strip().isdigit():
+                cumulative[name.strip()] = int(total)
+        return cumulative
+
+    def test_version_and_help_skip_command_modules(self) -> None:
+        baked = "import sys, types; sys.modules['ghflow._version'] = types.SimpleNamespace(VERSION='9.9.9'); "
+        with tempfile.TemporaryDirectory() as pycache:
+            for argv in (["--version"], ["--help"], ["ci", "--help"], ["publish", "--help"]):
+                with self.subTest(argv=argv):
+                    imported = self.importtime(
+                        baked + f"from ghflow import runtime; sys.stdout = open('/dev/null', 'w'); runtime.main({argv!r})",
+                        pycache,
+                    )
+                    self.assertIn("ghflow.runtime", imported)
+                    self.assertEqual([name for name in LAZY_MODULES if name in imported], [])
+
+    def test_import_stays_within_budget(self) -> None:
+        with tempfile.TemporaryDirectory() as pycache:
+            self.importtime("import ghflow", pycache)
+            best = min(self.importtime("import ghflow", pycache)["ghflow"] for _ in range(3))
+        self.assertLess(best, STARTUP_IMPORT_BUDGET_US)
+
+    def test_baked_version_wins_over_pyproject(self) -> None:
+        with mock.patch.dict(sys.modules, {"ghflow._version": mock.Mock(VERSION="9.9.9")}):
+            self.assertEqual(runtime.load_version(), "9.9.9")
+        self.assertEqual(runtime.load_version(), runtime.VERSION)
+
+
+def load_build_tool():
+    spec = importlib.util.spec_from_file_location("build_zipapp", PROJECT_SRC.parent / "tools" / "build_zipapp.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class BuildZipappTests(unittest.TestCase):
+    def test_shipped_artifact_matches_sources(self) -> None:
+        build_zipapp = load_build_tool()
+        self.assertEqual(build_zipapp.check(build_zipapp.DEFAULT_OUTPUT), [])
+
+    def test_bytecode_artifact_runs_and_check_detects_drift(self) -> None:
+        build_zipapp = load_build_tool()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            artifact = Path(temp_dir) / "ghflow"
+            with contextlib.redirect_stderr(io.StringIO()):
+                self.assertEqual(build_zipapp.main(["--output", str(artifact), "--strip-sources"]), 0)
+            with zipfile.ZipFile(artifact) as archive:
+                names = archive.namelist()
+                compression = {info.compress_type for info in archive.infolist()}
+                checks_code = marshal.loads(archive.read("ghflow/checks.pyc")[build_zipapp.PYC_HEADER_SIZE :])
+            self.assertIn("ghflow/runtime.pyc", names)
+            self.assertNotIn("ghflow/runtime.py", names)
+            self.assertEqual(compression, {zipfile.ZIP_DEFLATED})
+
+            # Bytecode is compiled without -O, so asserts behave as in src/.
+            def code_objects(code):
+                yield code
+                for const in code.co_consts:
+                    if isinstance(const, types.CodeType):
+                        yield from code_objects(const)
+
+            opnames = {instruction.opname for code in code_objects(checks_code) for instruction in dis.get_instructions(code)}
+            self.assertIn("LOAD_ASSERTION_ERROR", opnames)
+            self.assertEqual(build_zipapp.check(artifact), [])
+
+            env = {**os.environ, "GHFLOW_SOCKET": ""}
+            version = subprocess.run([sys.executable, str(artifact), "--version"], capture_output=True, text=True, env=env)
+            self.assertEqual((version.returncode, version.stdout.strip()), (0, build_zipapp.project_version()))
+            unknown = subprocess.run([sys.executable, str(artifact), "bogus"], capture_output=True, text=True, env=env)
+            self.assertEqual(unknown.returncode, 64)
+
+            with zipfile.ZipFile(artifact, "a") as archive:
+                archive.writestr("ghflow/stale.py", "")
+            with mock.patch.object(build_zipapp, "PACKAGE_DIR", Path(temp_dir) / "missing"):
+                problems = build_zipapp.check(artifact)
+            self.assertIn("ghflow/stale.py: not in projects/ghflow/src", problems)
+            self.assertIn("ghflow/runtime.pyc: not in projects/ghflow/src", problems)
+
+
+class DaemonTests(unittest.TestCase):
+    def test_forwarded_commands_match_in_process_output(self) -> None:
+        def capture(run, argv):
+            stdout, stderr = io.StringIO(), io.StringIO()
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                exit_code = run(argv)
+            return exit_code, stdout.getvalue(), stderr.getvalue()
+
+        commands = [["--version"], ["stars", "--help"], ["bogus"], ["--json", "bogus"], ["ci", "inspect", "--jobs", "0", "--repo", "o/r"]]
+        with mock.patch.dict(os.environ, {"GHFLOW_SOCKET": ""}):
+            expected = [capture(runtime.main, argv) for argv in commands]
+
+        with tempfile.TemporaryDirectory(dir="/tmp") as temp_dir:
+            socket_path = Path(temp_dir) / "ghflow.sock"
+            ready = threading.Event()
+            server = threading.Thread(
+                target=daemon.serve,
+                args=(socket_path, runtime.main),
+                kwargs={"version": runtime.VERSION, "idle_timeout": 30, "on_ready": ready.set},
+            )
+            server.start()
+            try:
+                self.assertTrue(ready.wait(10))
+                # The server shares this process, so call the client side directly.
+                actual = [capture(lambda argv: daemon.forward(argv, socket_path, version=runtime.VERSION), argv) for argv in commands]
+                self.assertEqual(actual, expected)
+                self.assertEqual(daemon.control("ping", socket_path)["exit"], 0)
+            finally:
+                daemon.control("stop", socket_path)
+                server.join(10)
+            self.assertFalse(socket_path.exists())
+        self.assertIsNone(warm.ACTIVE)
+
+    def test_daemon_declines_other_versions_and_clears_cache_after_local_mutations(self) -> None:
+        with tempfile.TemporaryDirectory(dir="/tmp") as temp_dir:
+            socket_path = Path(temp_dir) / "ghflow.sock"
+            ready = threading.Event()
+            entry = mock.Mock(return_value=0)
+            server = threading.Thread(
+                target=daemon.serve,
+                args=(socket_path, entry),
+                kwargs={"version": "1.0.0", "idle_timeout": 30, "on_ready": ready.set},
+            )
+            server.start()
+            try:
+                self.assertTrue(ready.wait(10))
+                self.assertIsNone(daemon.forward(["--version"], socket_path, version="1.0.1"))
+                entry.assert_not_called()
+                self.assertEqual(daemon.forward(["--version"], socket_path, version="1.0.0"), 0)
+                entry.assert_called_once_with(["--version"])
+
+                warm.memoize(("key",), lambda: 1)
+                self.assertEqual(daemon.control("ping", socket_path)["version"], "1.0.0")
+                self.assertEqual(warm.memoize(("key",), lambda: 2), 1)
+                daemon.clear_warm_cache(socket_path)
+                self.assertEqual(warm.memoize(("key",), lambda: 2), 2)
+            finally:
+                daemon.control("stop", socket_path)
+                server.join(10)
+
+        with mock.patch.dict(os.environ, {"GHFLOW_SOCKET": "/tmp/ghflow-test.sock"}):
+            for argv, forwarded, clears in (
+                (["ci", "inspect", "--pr", "1"], True, False),
+                (["ci", "inspect", "--pr", "1", "--watch"], False, False),
+                (["--json", "stars", "add", "o/r"], False, True),
+                (["stars", "lists", "assign", "o/r", "--list", "x"], False, True),
+                (["publish", "open"], False, True),
+                (["reviews", "address", "--pr", "1", "--reply-body=thanks"], False, True),
+                (["reviews", "address", "--pr", "1", "--reply-body", "thanks", "--dry-run"], True, False),
+                (["daemon", "status"], False, False),
+            ):
+                with self.subTest(argv=argv):
+                    self.assertEqual((daemon.should_forward(argv), daemon.clears_warm_cache(argv)), (forwarded, clears))
+            with mock.patch.object(daemon, "forward") as forward, mock.patch.object(daemon, "clear_warm_cache") as clear, contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(runtime.main(["stars", "add", "--help"]), 0)
+            forward.assert_not_called()
+            clear.assert_called_once_with()
+
+    def test_forward_survives_a_daemon_that_dies_mid_request(self) -> None:
+        def serve_once(socket_path: Path, reply: bytes) -> threading.Thread:
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(str(socket_path))
+            server.listen()
+
+            def handle() -> None:
+                with server, server.accept()[0] as conn, conn.makefile("r") as reader:
+                    reader.readline()
+                    conn.sendall(reply)
+
+            thread = threading.Thread(target=handle)
+            thread.start()
+            return thread
+
+        with tempfile.TemporaryDirectory(dir="/tmp") as temp_dir:
+            # Nothing printed yet: the caller runs the command itself.
+            thread = serve_once(Path(temp_dir) / "empty.sock", b"")
+            self.assertIsNone(daemon.forward(["--version"], Path(temp_dir) / "empty.sock", version="1"))
+            thread.join(10)
+            thread = serve_once(Path(temp_dir) / "garbled.sock", b'{"fd": 1, "da')
+            self.assertIsNone(daemon.forward(["--version"], Path(temp_dir) / "garbled.sock", version="1"))
+            thread.join(10)
+
+            # Partial output cannot be taken back, so the command fails cleanly.
+            stdout, stderr = io.StringIO(), io.StringIO()
+            thread = serve_once(Path(temp_dir) / "truncated.sock", b'{"fd": 1, "data": "partial"}\n{"fd": 1, "da')
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                self.assertEqual(daemon.forward(["--version"], Path(temp_dir) / "truncated.sock", version="1"), 1)
+            thread.join(10)
+            self.assertEqual(stdout.getvalue(), "partial")
+            self.assertEqual(stderr.getvalue(), "ghflow daemon connection lost before the command finished.\n")
+
+    def test_main_forwards_only_when_socket_is_set(self) -> None:
+        with mock.patch.object(daemon, "forward", return_value=7) as forward:
+            with mock.patch.dict(os.environ, {"GHFLOW_SOCKET": "/tmp/ghflow-test.sock"}):
+                self.assertEqual(runtime.main(["--version"]), 7)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    self.assertEqual(runtime.main(["daemon", "--help"]), 0)
+            with mock.patch.dict(os.environ, {"GHFLOW_SOCKET": ""}), contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(runtime.main(["--version"]), 0)
+        self.assertEqual(forward.call_count, 1)
+
+    def test_warm_cache_only_memoizes_inside_the_daemon(self) -> None:
+        calls: list[int] = []
+        self.assertEqual(warm.memoize(("key",), lambda: calls.append(1) or len(calls)), 1)
+        self.assertEqual(warm.memoize(("key",), lambda: calls.append(1) or len(calls)), 2)
+        with mock.patch.object(warm, "ACTIVE", warm.WarmCache(ttl=60)):
+            self.assertEqual(warm.memoize(("key",), lambda: calls.append(1) or len(calls)), 3)
+            self.assertEqual(warm.memoize(("key",), lambda: calls.append(1) or len(calls)), 3)
+
+    def test_daemon_caches_are_scoped_to_caller_credentials(self) -> None:
+        payload = {"id": "R_1", "nameWithOwner": "o/r", "url": "u", "viewerHasStarred": True, "defaultBranchRef": {"name": "main"}}
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.dict(
+            os.environ, {"GHFLOW_CACHE_DIR": temp_dir, "GH_CONFIG_DIR": temp_dir, "GH_TOKEN": "alice", "GHFLOW_TRANSPORT": "http", "GHFLOW_API_URL": "http://127.0.0.1:1"}
+        ), mock.patch.object(warm, "ACTIVE", warm.WarmCache(ttl=60)):
+            self.assertEqual(warm.memoize(("viewer_lists", 0), lambda: "alice's lists"), "alice's lists")
+            alice_transport = transport.current()
+            repo_metadata.record("o/r", payload)
+            with mock.patch.dict(os.environ, {"GH_TOKEN": "bob"}):
+                self.assertEqual(warm.memoize(("viewer_lists", 0), lambda: "bob's lists"), "bob's lists")
+                self.assertIsNot(transport.current(), alice_transport)
+                self.assertIsNone(repo_metadata.lookup("o/r"))
+            self.assertEqual(warm.memoize(("viewer_lists", 0), lambda: "recomputed"), "alice's lists")
+            self.assertIs(transport.current(), alice_transport)
+            self.assertTrue(repo_metadata.lookup("o/r")["viewerHasStarred"])
+
+
+class FakeGitHubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.server.seen.append((self.command, self.path, self.headers.get("Authorization"), None, self.client_address))
+        if self.headers.get("Authorization") == "token expired":
+            self.reply(401, {"message": "Bad credentials"})
+        elif self.path == "/repos/o/garbled":
+            self.wfile.write(b"garbled\r\n\r\n")
+            self.close_connection = True
+        elif self.path.startswith("/repos/o/r/issues/1/comments?"):
+            page = int(self.path.rsplit("page=", 1)[1])
+            link = '<http://fake/repos/o/r/issues/1/comments?per_page=100&page=3>; rel="last"'
+            self.reply(200, [{"id": page * 1000 + index} for index in range(100 if page < 3 else 2)], {"Link": link})
+        elif self.path == "/repos/o/old":
+            self.reply(301, {"message": "Moved Permanently"}, {"Location": "/repos/o/new"})
+        elif self.path == "/repos/o/new":
+            self.reply(200, {"full_name": "o/new"})
+        else:
+            self.reply(404, {"message": "Not Found"})
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.seen.append((self.command, self.path, self.headers.get("Authorization"), body, self.client_address))
+        if "boom" in body.get("query", ""):
+            self.reply(200, {"data": None, "errors": [{"message": "boom"}]})
+        else:
+            self.reply(200, {"data": {"echo": body.get("variables")}} if self.path == "/graphql" else {"id": 5, "body": body.get("body")})
+
+    def reply(self, status: int, payload: object, headers: dict[str, str] | None = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in {"Content-Type": "application/json", "Content-Length": str(len(data)), **(headers or {})}.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class TransportTests(unittest.TestCase):
+    def test_parse_api_args_accepts_only_supported_gh_api_calls(self) -> None:
+        request = transport.parse_api_args(["api", "graphql", "-f", "query=q", "-F", "n=5", "-F", "ok=true", "-F", "ids[]=a", "-F", "ids[]=b", "-F", "none[]", "-F", "after=null"])
+        self.assertEqual((request.method, request.endpoint, request.is_graphql), ("POST", "graphql", True))
+        self.assertEqual(request.fields, {"query": "q", "n": 5, "ok": True, "ids": ["a", "b"], "none": [], "after": None})
+        request = transport.parse_api_args(["api", "repos/o/r/pulls", "-X", "GET", "-F", "page=2", "-H", "Accept: application/vnd.github.full+json", "-i"])
+        self.assertEqual((request.method, request.headers, request.include_headers), ("GET", {"Accept": "application/vnd.github.full+json"}, True))
+        for args in (["pr", "list"], ["api", "repos/{owner}/{repo}"], ["api", "x", "--paginate"], ["api", "x", "-F", "body=@file"], ["api"]):
+            with self.subTest(args=args):
+                self.assertIsNone(transport.parse_api_args(args))
+
+    def test_http_transport_serves_api_calls_over_pooled_connections(self) -> None:
+        from ghflow import user_state
+
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHubHandler)
+        server.seen = []
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        fallback = mock.Mock(spec=transport.GhTransport)
+        fallback.run.return_value = transport.TransportResult(0, "[]", "")
+        backend = transport.HttpTransport(f"http://127.0.0.1:{server.server_address[1]}", token="t0ken", fallback=fallback)
+        self.addCleanup(backend.close)
+        previous = transport.install(backend)
+        self.addCleanup(transport.install, previous)
+
+        variables = {"owner": "o", "n": 5, "ids": ["a", "b"], "after": None}
+        self.assertEqual(user_state.graphql("query Q", variables), {"data": {"echo": variables}})
+        with self.assertRaisesRegex(user_state.GhError, "GraphQL: boom"):
+            user_state.graphql("query boom")
+        items = runtime.gh_api_paginated_list("repos/o/r/issues/1/comments", command_path=("reviews", "address"))
+        self.assertEqual([item["id"] for item in items][::50], [1000, 1050, 2000, 2050, 3000])
+        reply = runtime.run_gh_text(["api", "-X", "POST", "repos/o/r/pulls/comments/9/replies", "-f", "body=thanks"])
+        self.assertEqual(json.loads(reply.stdout), {"id": 5, "body": "thanks"})
+        self.assertEqual(json.loads(runtime.run_gh_text(["api", "repos/o/old"]).stdout), {"full_name": "o/new"})
+        missing = runtime.run_gh_text(["api", "repos/o/missing"])
+        self.assertEqual((missing.returncode, missing.stderr), (1, "gh: Not Found (HTTP 404)\n"))
+        self.assertEqual(runtime.run_gh_text(["pr", "list"]).stdout, "[]")
+        fallback.run.assert_called_once_with(["pr", "list"], cwd=None, input_text=None)
+
+        self.assertEqual({auth for _, _, auth, _, _ in server.seen}, {"token t0ken"})
+        self.assertIn(("POST", "/graphql", "token t0ken", {"query": "query Q", "variables": variables}), [entry[:4] for entry in server.seen])
+        # Keep-alive: the 9 requests reuse a handful of pooled connections.
+        self.assertEqual(len(server.seen), 9)
+        self.assertLessEqual(len({entry[4] for entry in server.seen}), runtime.PAGE_FETCH_WORKERS)
+
+    def start_fake_github(self) -> str:
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHubHandler)
+        server.seen = []
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    def test_http_transport_retries_stale_pooled_connections_once(self) -> None:
+        import http.client
+
+        backend = transport.HttpTransport(self.start_fake_github(), token="t0ken")
+        self.addCleanup(backend.close)
+        pool = backend.pool(backend.base_url)
+        stale = [mock.Mock(), mock.Mock()]
+        stale[0].getresponse.side_effect = http.client.BadStatusLine("")
+        stale[1].request.side_effect = ConnectionResetError()
+        pool._idle.extend(stale)
+
+        self.assertEqual(json.loads(backend.run(["api", "repos/o/new"]).stdout), {"full_name": "o/new"})
+        stale[1].close.assert_called_once_with()
+        # The retry goes to a fresh connection, not to the next idle one.
+        stale[0].request.assert_not_called()
+        self.assertEqual(json.loads(backend.run(["api", "repos/o/new"]).stdout), {"full_name": "o/new"})
+
+        garbled = backend.run(["api", "repos/o/garbled"])
+        self.assertEqual(garbled.returncode, 1)
+        self.assertRegex(garbled.stderr, r"^error connecting to http://127\.0\.0\.1:\d+: ")
+
+    def test_http_transport_refreshes_the_gh_token(self) -> None:
+        fallback = mock.Mock(spec=transport.GhTransport)
+        tokens = iter(["expired", "fresh", "rotated"])
+        fallback.run.side_effect = lambda args, **_: transport.TransportResult(0, next(tokens) + "\n", "")
+        backend = transport.HttpTransport(self.start_fake_github(), fallback=fallback)
+        self.addCleanup(backend.close)
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.dict(os.environ, {"GH_CONFIG_DIR": temp_dir, "GH_TOKEN": "", "GITHUB_TOKEN": ""}):
+            hosts = Path(temp_dir) / "hosts.yml"
+            hosts.write_text("github.com: {}\n", encoding="utf-8")
+
+            # A rejected token is resolved again and the call retried once.
+            self.assertEqual(backend.run(["api", "repos/o/new"]).returncode, 0)
+            self.assertEqual(backend.token(), "fresh")
+            self.assertEqual(fallback.run.call_count, 2)
+
+            # `gh auth login/refresh` rewrites hosts.yml.
+            os.utime(hosts, ns=(0, hosts.stat().st_mtime_ns + 1_000_000_000))
+            self.assertEqual(backend.token(), "rotated")
+            self.assertEqual(backend.token(), "rotated")
+            self.assertEqual(fallback.run.call_count, 3)
+
+            with mock.patch.dict(os.environ, {"GH_TOKEN": "expired"}):
+                rejected = backend.run(["api", "repos/o/new"])
+            self.assertEqual((rejected.returncode, rejected.stderr), (1, "gh: Bad credentials (HTTP 401)\n"))
+            self.assertEqual(fallback.run.call_count, 3)
+
+    def test_transport_is_selected_by_environment(self) -> None:
+        with mock.patch.dict(os.environ, {"GHFLOW_TRANSPORT": "http", "GHFLOW_API_URL": "http://127.0.0.1:1/"}):
+            backend = transport.current()
+            self.assertIsInstance(backend, transport.HttpTransport)
+            self.assertIs(transport.current(), backend)
+            self.assertEqual((backend.base_url, backend.graphql_url), ("http://127.0.0.1:1", "http://127.0.0.1:1/graphql"))
+        with mock.patch.dict(os.environ, {"GHFLOW_TRANSPORT": ""}):
+            self.assertIsInstance(transport.current(), transport.GhTransport)
+        with mock.patch.dict(os.environ, {"GHFLOW_TRANSPORT": "http", "GH_HOST": "ghe.example.com"}), mock.patch.dict(os.environ):
+            os.environ.pop("GHFLOW_API_URL", None)
+            self.assertEqual(transport.current().graphql_url, "https://ghe.example.com/api/graphql")
+
 
 class ChecksTests(unittest.TestCase):
     def test_extract_run_id_and_job_id(self) -> None:
@@ -183,6 +1165,278 @@ class ChecksTests(unittest.TestCase):
             ["name", "state", "bucket", "link"],
         )
 
+    def test_negotiated_check_fields_are_cached_per_gh_binary(self) -> None:
+        calls: list[list[str]] = []
+
+        def fake_gh(args, cwd):
+            calls.append(list(args))
+            if args[0] == "--version":
+                return checks.GhResult(0, "gh version 2.20.0 (2022-11-08)\n", "")
+            if "detailsUrl" in args[args.index("--json") + 1]:
+                return checks.GhResult(1, "", "Unknown JSON field: detailsUrl\nAvailable fields:\n  name\n  state\n  link\n")
+            return checks.GhResult(0, "[]", "")
+
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.dict(os.environ, {"GHFLOW_CACHE_DIR": temp_dir}):
+            with (
+                mock.patch.object(checks, "run_gh_command", side_effect=fake_gh),
+                mock.patch.object(checks, "gh_fingerprint", return_value="/usr/bin/gh:1:1"),
+            ):
+                checks.fetch_checks("5", "openai/codex", None)
+                self.assertEqual(len(calls), 3)
+                self.assertEqual(state.read_state(checks.CHECK_FIELDS_STATE)["ghVersion"], "gh version 2.20.0 (2022-11-08)")
+                calls.clear()
+                checks.fetch_checks("5", "openai/codex", None)
+                self.assertEqual(len(calls), 1)
+                self.assertEqual(calls[0][4], ",".join(checks.FALLBACK_CHECK_FIELDS))
+            calls.clear()
+            with (
+                mock.patch.object(checks, "run_gh_command", side_effect=fake_gh),
+                mock.patch.object(checks, "gh_fingerprint", return_value="/usr/bin/gh:2:2"),
+            ):
+                checks.fetch_checks("5", "openai/codex", None)
+            self.assertEqual(calls[0][4], ",".join(checks.PRIMARY_CHECK_FIELDS))
+
+    def test_watch_only_analyzes_changed_checks_and_backs_off(self) -> None:
+        failing_a = {"name": "a", "state": "FAILURE", "detailsUrl": "https://github.com/o/r/actions/runs/1/job/11"}
+        failing_b = {"name": "b", "state": "FAILURE", "detailsUrl": "https://github.com/o/r/actions/runs/2/job/21"}
+        pending_b = {"name": "b", "state": "IN_PROGRESS", "detailsUrl": failing_b["detailsUrl"]}
+        pending_c = {"name": "c", "state": "QUEUED", "detailsUrl": "https://github.com/o/r/actions/runs/3/job/31"}
+        passed_c = {"name": "c", "state": "SUCCESS", "detailsUrl": pending_c["detailsUrl"]}
+        polls = [
+            [failing_a, pending_b, pending_c],
+            [failing_a, pending_b, pending_c],
+            [failing_a, failing_b, pending_c],
+            [failing_a, failing_b, passed_c],
+        ]
+        analyzed: list[list[str]] = []
+
+        def fake_analyze(changed, **kwargs):
+            analyzed.append([check["name"] for check in changed])
+            status = "log_pending" if len(analyzed) <= 2 else "ok"
+            return [{"name": check["name"], "status": status} for check in changed]
+
+        events: list[dict[str, object]] = []
+        delays: list[float] = []
+        with (
+            mock.patch.object(checks, "ensure_gh_available"),
+            mock.patch.object(checks, "resolve_pr", return_value="5"),
+            mock.patch.object(checks, "fetch_check_rollup", return_value=None),
+            mock.patch.object(checks, "fetch_checks", side_effect=polls),
+            mock.patch.object(checks, "analyze_checks", side_effect=fake_analyze),
+        ):
+            exit_code = checks.watch_pr_failures(
+                repo="o/r",
+                repo_root=None,
+                pr_value="5",
+                max_lines=10,
+                context=2,
+                emit=events.append,
+                use_cache=False,
+                interval=5,
+                max_interval=60,
+                sleep=delays.append,
+            )
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(analyzed, [["a"], ["a"], ["a", "b"]])
+        self.assertEqual(delays, [5, 10, 5])
+        self.assertEqual(
+            [(event["event"], event.get("check", {}).get("name")) for event in events],
+            [("poll", None), ("poll", None), ("failure", "a"), ("failure", "b"), ("poll", None), ("settled", None)],
+        )
+        self.assertEqual(events[-1]["failingCount"], 2)
+
+    def test_watch_retries_transient_errors_and_stops_after_max_polls(self) -> None:
+        failing = {"name": "a", "state": "FAILURE", "detailsUrl": "https://github.com/o/r/actions/runs/1/job/11"}
+        pending = {"name": "b", "state": "IN_PROGRESS", "detailsUrl": "https://github.com/o/r/actions/runs/2/job/21"}
+        flaky = checks.InspectionError("HTTP 502: Bad Gateway", 1)
+
+        def run(polls, **kwargs):
+            events: list[dict[str, object]] = []
+            delays: list[float] = []
+            with (
+                mock.patch.object(checks, "ensure_gh_available"),
+                mock.patch.object(checks, "resolve_pr", return_value="5"),
+                mock.patch.object(checks, "fetch_check_rollup", return_value=None),
+                mock.patch.object(checks, "fetch_checks", side_effect=polls),
+                mock.patch.object(checks, "analyze_checks", side_effect=lambda changed, **_: [{"name": check["name"], "status": "ok"} for check in changed]),
+            ):
+                exit_code = checks.watch_pr_failures(
+                    repo="o/r", repo_root=None, pr_value="5", max_lines=10, context=2, emit=events.append, use_cache=False, interval=5, max_interval=60, sleep=delays.append, **kwargs
+                )
+            return exit_code, [event["event"] for event in events], delays, events
+
+        exit_code, kinds, delays, events = run([flaky, flaky, [failing, pending], [failing, pending]], max_polls=4)
+        self.assertEqual(exit_code, checks.WATCH_TIMEOUT_EXIT_CODE)
+        self.assertEqual(kinds, ["error", "error", "failure", "poll", "timeout"])
+        self.assertEqual(delays, [5, 10, 5])
+        self.assertEqual(events[1]["retry"], 2)
+        self.assertEqual((events[-1]["pending"], [result["name"] for result in events[-1]["results"]]), (1, ["a"]))
+
+        with self.assertRaises(checks.InspectionError):
+            run([flaky] * checks.WATCH_MAX_CONSECUTIVE_ERRORS)
+        with self.assertRaisesRegex(checks.InspectionError, "Bad credentials"):
+            run([checks.InspectionError("HTTP 401: Bad credentials", 1)])
+
+    def test_batch_inspect_shares_setup_and_streams_one_object_per_pr(self) -> None:
+        def fake_checks(pr_number, repo, repo_root, *, use_cache=True):
+            # Earlier PRs finish last, so completion order is the reverse of input order.
+            time.sleep(0.02 * (4 - int(pr_number)))
+            if pr_number == "3":
+                raise checks.InspectionError("no pull requests found for 3", 7)
+            state = "FAILURE" if pr_number == "2" else "SUCCESS"
+            return [{"name": "test", "state": state, "detailsUrl": "https://example.com/status"}]
+
+        def fake_analyze(failing, **kwargs):
+            budgets.append(kwargs["jobs"])
+            return [{"name": check["name"]} for check in failing]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            prs_file = Path(temp_dir) / "prs.txt"
+            prs_file.write_text("# morning sweep\n1\n2, 3\n1\n")
+            pr_values = checks.parse_pr_values(None, str(prs_file))
+        self.assertEqual(pr_values, ["1", "2", "3"])
+
+        events: list[dict[str, object]] = []
+        budgets: list[int] = []
+        with (
+            mock.patch.object(checks, "ensure_gh_available") as auth_probe,
+            mock.patch.object(checks, "LogCache") as cache_class,
+            mock.patch.object(checks, "fetch_check_rollup", return_value=None),
+            mock.patch.object(checks, "fetch_checks", side_effect=fake_checks),
+            mock.patch.object(checks, "analyze_checks", side_effect=fake_analyze),
+        ):
+            exit_code = checks.inspect_pr_batch(
+                repo="o/r",
+                repo_root=None,
+                pr_values=pr_values,
+                max_lines=10,
+                context=2,
+                emit=events.append,
+                jobs=7,
+            )
+        auth_probe.assert_called_once()
+        cache_class.assert_called_once()
+        # PR 2 fails first in input order, although PR 3's error finished first.
+        self.assertEqual(exit_code, 1)
+        self.assertEqual([(event["pr"], event["summary"]) for event in events], [("1", "no_failing_checks"), ("2", "failing_checks"), ("3", "error")])
+        # 7 jobs over 3 PRs leaves each PR 2 log workers, 6 in total.
+        self.assertEqual(budgets, [2])
+
+    def test_check_rollup_returns_checks_and_run_metadata_in_one_query(self) -> None:
+        def check_run(name, conclusion, run_id):
+            return {
+                "__typename": "CheckRun",
+                "name": name,
+                "status": "COMPLETED",
+                "conclusion": conclusion,
+                "detailsUrl": f"https://github.com/o/r/actions/runs/{run_id}/job/{run_id}1",
+                "checkSuite": {
+                    "status": "COMPLETED",
+                    "conclusion": "FAILURE",
+                    "branch": {"name": "feature"},
+                    "commit": {"oid": "abc123"},
+                    "workflowRun": {"databaseId": run_id, "event": "PULL_REQUEST", "url": f"https://x/{run_id}", "workflow": {"name": "CI"}},
+                },
+            }
+
+        def page(nodes, has_next, cursor):
+            contexts = {"pageInfo": {"hasNextPage": has_next, "endCursor": cursor}, "nodes": nodes}
+            commit = {"statusCheckRollup": {"contexts": contexts}}
+            return {"data": {"repository": {"pullRequest": {"commits": {"nodes": [{"commit": commit}]}}}}}
+
+        pages = [
+            page([check_run("lint", "SUCCESS", 7), check_run("test", "FAILURE", 7)], True, "c1"),
+            page([{"__typename": "StatusContext", "context": "ci/external", "state": "ERROR", "targetUrl": "https://ci.example"}], False, None),
+        ]
+        with mock.patch.object(checks.user_state, "graphql", side_effect=pages) as graphql:
+            found, run_metadata = checks.fetch_pr_checks("5", "o/r", None)
+        self.assertEqual(graphql.call_count, 2)
+        self.assertEqual(graphql.call_args.args[1]["after"], "c1")
+        self.assertEqual([check["name"] for check in found if checks.is_failing(check)], ["test", "ci/external"])
+        self.assertEqual(run_metadata["7"]["status"], "completed")
+        self.assertEqual(run_metadata["7"]["headSha"], "abc123")
+
+        with (
+            mock.patch.object(checks, "fetch_run_metadata") as metadata_fetch,
+            mock.patch.object(checks, "stream_run_log", side_effect=fake_run_log_stream("test\tRun\tError: boom\n")),
+        ):
+            results = checks.analyze_checks(
+                [found[1]], repo="o/r", repo_root=None, max_lines=10, context=2, run_metadata=run_metadata
+            )
+        metadata_fetch.assert_not_called()
+        self.assertEqual(results[0]["run"]["workflowName"], "CI")
+
+        with (
+            mock.patch.object(checks.user_state, "graphql", side_effect=checks.user_state.GhError("Field 'statusCheckRollup' doesn't exist")),
+            mock.patch.object(checks, "fetch_checks", return_value=[{"name": "legacy"}]) as legacy,
+        ):
+            self.assertEqual(checks.fetch_pr_checks("5", "o/r", None), ([{"name": "legacy"}], {}))
+        legacy.assert_called_once()
+
+    def test_check_rollup_keeps_only_the_latest_attempt_of_rerun_jobs(self) -> None:
+        def check_run(name, conclusion, run_id, started_at, workflow="CI"):
+            return {
+                "__typename": "CheckRun",
+                "name": name,
+                "status": "COMPLETED",
+                "conclusion": conclusion,
+                "detailsUrl": f"https://github.com/o/r/actions/runs/{run_id}/job/{run_id}1",
+                "startedAt": started_at,
+                "completedAt": started_at,
+                "checkSuite": {"workflowRun": {"databaseId": run_id, "workflow": {"name": workflow}}},
+            }
+
+        # The failed first attempt is listed after the passing re-run.
+        nodes = [
+            check_run("test", "SUCCESS", 9, "2026-01-02T00:00:00Z"),
+            check_run("test", "FAILURE", 7, "2026-01-01T00:00:00Z"),
+            check_run("test", "FAILURE", 8, "2026-01-01T00:00:00Z", workflow="Nightly"),
+        ]
+        contexts = {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": nodes}
+        payload = {"data": {"repository": {"pullRequest": {"commits": {"nodes": [{"commit": {"statusCheckRollup": {"contexts": contexts}}}]}}}}}
+        with mock.patch.object(checks.user_state, "graphql", return_value=payload):
+            found, run_metadata = checks.fetch_check_rollup("5", "o/r")
+        self.assertEqual([(check["workflow"], check["conclusion"]) for check in found], [("CI", "SUCCESS"), ("Nightly", "FAILURE")])
+        self.assertEqual(sorted(run_metadata), ["8", "9"])
+
+    def test_auth_probe_is_cached_and_rechecked_on_auth_failures(self) -> None:
+        logged_out = "You are not logged into any GitHub hosts. To log in, run: gh auth login"
+        auth_ok = [True]
+        calls: list[list[str]] = []
+
+        def fake_gh(args, cwd):
+            calls.append(list(args))
+            if args[:2] == ["auth", "status"]:
+                return checks.GhResult(0, "Logged in", "") if auth_ok[0] else checks.GhResult(1, "", logged_out)
+            return checks.GhResult(1, "", "HTTP 401: Bad credentials (https://api.github.com/graphql)")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_dir = Path(temp_dir) / "gh"
+            config_dir.mkdir()
+            hosts = config_dir / "hosts.yml"
+            hosts.write_text("github.com:\n")
+            environment = {"GHFLOW_CACHE_DIR": temp_dir, "GH_CONFIG_DIR": str(config_dir), "GH_TOKEN": ""}
+            with (
+                mock.patch.dict(os.environ, environment),
+                mock.patch.object(checks, "which", return_value="/usr/bin/gh"),
+                mock.patch.object(checks, "run_gh_command", side_effect=fake_gh),
+            ):
+                checks.ensure_gh_available(None)
+                checks.ensure_gh_available(None)
+                self.assertEqual(len(calls), 1)
+                os.utime(hosts, ns=(time.time_ns() + 10**9, time.time_ns() + 10**9))
+                checks.ensure_gh_available(None)
+                self.assertEqual(len(calls), 2)
+
+                auth_ok[0] = False
+                checks.ensure_gh_available(None)
+                with self.assertRaises(checks.InspectionError) as raised:
+                    checks.fetch_checks("5", "o/r", None, use_cache=False)
+                self.assertEqual((raised.exception.message, raised.exception.exit_code), (logged_out, 1))
+                self.assertEqual(calls[-1], ["auth", "status"])
+                with self.assertRaises(checks.InspectionError):
+                    checks.ensure_gh_available(None)
+
     def test_external_check_stays_report_only(self) -> None:
         result = checks.analyze_check(
             {"name": "Buildkite", "detailsUrl": "https://buildkite.example/job/1"},
@@ -194,6 +1448,101 @@ class ChecksTests(unittest.TestCase):
         self.assertEqual(result["status"], "external")
         self.assertIn("No GitHub Actions run id", result["note"])
 
+    def test_analyze_checks_parallel_keeps_check_order(self) -> None:
+        failing = [{"name": f"job-{index}"} for index in range(6)]
+
+        def fake_analyze(check, **_kwargs):
+            # Finish later checks first so ordering cannot come from completion order.
+            time.sleep(0.01 * (6 - int(check["name"].split("-")[1])))
+            return {"name": check["name"]}
+
+        options = {"repo": "openai/codex", "repo_root": None, "max_lines": 10, "context": 2}
+        with mock.patch.object(checks, "analyze_check", side_effect=fake_analyze):
+            sequential = checks.analyze_checks(failing, jobs=1, **options)
+            parallel = checks.analyze_checks(failing, jobs=4, **options)
+        self.assertEqual([item["name"] for item in sequential], [check["name"] for check in failing])
+        self.assertEqual(parallel, sequential)
+
+    def test_matrix_checks_share_one_run_log_download(self) -> None:
+        run_log = "\n".join(
+            [
+                "test (3.11)\tRun tests\t2024-01-01T00:00:00Z ok 3.11",
+                "test (3.11)\tRun tests\t2024-01-01T00:00:01Z AssertionError: 3.11",
+                "test (3.12)\tRun tests\t2024-01-01T00:00:00Z ok 3.12",
+                "test (3.12)\tRun tests\t2024-01-01T00:00:01Z AssertionError: 3.12",
+            ]
+        )
+        failing = [
+            {"name": f"test ({version})", "detailsUrl": f"https://github.com/openai/codex/actions/runs/1/job/{job}"}
+            for version, job in (("3.11", 10), ("3.12", 11))
+        ]
+        with (
+            mock.patch.object(checks, "fetch_run_metadata", return_value={"status": "completed"}) as metadata,
+            mock.patch.object(checks, "stream_run_log", side_effect=fake_run_log_stream(run_log)) as run_log_fetch,
+        ):
+            results = checks.analyze_checks(
+                failing, repo="openai/codex", repo_root=None, max_lines=10, context=2, jobs=2
+            )
+        self.assertEqual(metadata.call_count, 1)
+        self.assertEqual(run_log_fetch.call_count, 1)
+        self.assertIn("AssertionError: 3.11", results[0]["logSnippet"])
+        self.assertNotIn("3.12", results[0]["logSnippet"])
+        self.assertIn("AssertionError: 3.12", results[1]["logSnippet"])
+        self.assertNotIn("3.11", results[1]["logSnippet"])
+
+    def test_completed_job_log_is_served_from_disk_cache(self) -> None:
+        check = {"name": "test", "detailsUrl": "https://github.com/openai/codex/actions/runs/7/job/70"}
+        metadata = {"status": "completed", "conclusion": "failure"}
+        options = {"repo": "openai/codex", "repo_root": None, "max_lines": 10, "context": 2}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = log_cache.LogCache(Path(temp_dir))
+            with (
+                mock.patch.object(checks, "fetch_run_metadata", return_value=metadata),
+                mock.patch.object(checks, "stream_run_log", side_effect=fake_run_log_stream("test\tRun tests\tError: boom\n")),
+            ):
+                first = checks.analyze_checks([check], log_cache=cache, **options)
+            with (
+                mock.patch.object(checks, "fetch_run_metadata") as metadata_fetch,
+                mock.patch.object(checks, "stream_run_log") as run_log_fetch,
+            ):
+                second = checks.analyze_checks([check], log_cache=cache, **options)
+        metadata_fetch.assert_not_called()
+        run_log_fetch.assert_not_called()
+        self.assertIn("Error: boom", first[0]["logSnippet"])
+        self.assertEqual(second, first)
+
+    def test_log_cache_evicts_least_recently_used_entries(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = log_cache.LogCache(Path(temp_dir))
+            metadata = {"status": "completed", "conclusion": "failure"}
+            for job_id in ("1", "2", "3"):
+                cache.put("openai/codex", "9", job_id, metadata, os.urandom(3000).hex())
+                path = cache.entry_path("openai/codex", "9", job_id)
+                os.utime(path, (int(job_id), int(job_id)))
+            # Room for three entries, so a fourth must evict exactly one.
+            cache.max_bytes = int(path.stat().st_size * 3.5)
+            self.assertIsNotNone(cache.read("openai/codex", "9", "1", lambda line: None))
+            cache.put("openai/codex", "9", "4", metadata, os.urandom(3000).hex())
+            self.assertIsNotNone(cache.read("openai/codex", "9", "1", lambda line: None))
+            self.assertIsNone(cache.read("openai/codex", "9", "2", lambda line: None))
+            self.assertIsNotNone(cache.read("openai/codex", "9", "4", lambda line: None))
+
+    def test_log_cache_scans_once_and_round_trips_lines_exactly(self) -> None:
+        lines = ["form\x0cfeed", "group\x1dsep", "next\x85line", "para\u2028graph", "", "tail"]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = log_cache.LogCache(Path(temp_dir))
+            metadata = {"status": "completed", "conclusion": "failure"}
+            with mock.patch.object(cache, "entries", wraps=cache.entries) as scans:
+                for job_id in ("1", "2", "3"):
+                    writer = cache.writer("openai/codex", "9", job_id, metadata)
+                    writer.write_lines(lines)
+                    writer.commit()
+            # Only the first commit of the process walks the directory.
+            self.assertEqual(scans.call_count, 1)
+            replayed: list[str] = []
+            self.assertEqual(cache.read("openai/codex", "9", "2", replayed.extend), metadata)
+        self.assertEqual(replayed, lines)
+
     def test_extract_failure_snippet_prefers_failure_marker_window(self) -> None:
         log_text = "\n".join(
             [
@@ -207,6 +1556,112 @@ class ChecksTests(unittest.TestCase):
         snippet = checks.extract_failure_snippet(log_text, max_lines=3, context=1)
         self.assertEqual(snippet, "\n".join(["step 2", "AssertionError: boom", "step 4"]))
 
+    def test_log_digest_matches_full_log_slicing(self) -> None:
+        def reference(lines, max_lines, context):
+            marker_index = None
+            for index in range(len(lines) - 1, -1, -1):
+                if any(marker in lines[index].lower() for marker in checks.FAILURE_MARKER_WEIGHTS):
+                    marker_index = index
+                    break
+            if marker_index is None:
+                snippet = lines[-max_lines:]
+            else:
+                snippet = lines[max(0, marker_index - context) : marker_index + context + 1][-max_lines:]
+            return "\n".join(snippet), "\n".join(lines[-max_lines:])
+
+        vocabulary = ["ok", "step", "Error: x", "FAILED y", "", "done", "Traceback"]
+        generator = random.Random(7)
+        for _ in range(200):
+            lines = [generator.choice(vocabulary) + str(index) for index in range(generator.randint(0, 40))]
+            max_lines = generator.randint(1, 12)
+            context = generator.randint(1, 6)
+            # Uniform weights and a single window reduce ranking to the last hit.
+            uniform = checks.MarkerSet(dict.fromkeys(checks.FAILURE_MARKER_WEIGHTS, 1.0), demoted=())
+            digest = checks.LogDigest(max_lines, context, markers=uniform, windows=1)
+            split = generator.randint(0, len(lines))
+            digest.feed_lines(lines[:split])
+            for line in lines[split:]:
+                digest.feed(line)
+            with self.subTest(lines=lines, max_lines=max_lines, context=context):
+                self.assertEqual((digest.snippet(), digest.tail()), reference(lines, max_lines, context))
+
+    def test_ranked_snippet_prefers_specific_failures_and_merges_windows(self) -> None:
+        lines = ["setup ok"]
+        lines += ["Traceback (most recent call last):", "AssertionError: expected 1 got 2"]
+        lines += [f"step {index}" for index in range(20)]
+        lines += ["npm warn deprecated error-ish package", "cleanup"]
+        lines += [f"step {index}" for index in range(20, 40)]
+        lines += ["##[error]Process completed with exit code 1."]
+        log_text = "\n".join(lines)
+
+        best = checks.extract_failure_snippet(log_text, max_lines=10, context=1, windows=1)
+        self.assertEqual(best, "\n".join(lines[1:4]))
+
+        merged = checks.extract_failure_snippet(log_text, max_lines=20, context=1, windows=3)
+        self.assertEqual(
+            merged.split("\n"),
+            [*lines[0:4], "...", *lines[22:25]],
+        )
+
+        repeated = "\n".join(["Error: flaky 1", "ok", "ok", "Error: flaky 2", "ok", "ok", "Error: flaky 3"])
+        deduped = checks.extract_failure_snippet(repeated, max_lines=20, context=0, windows=3)
+        self.assertEqual(deduped, "Error: flaky 3")
+
+    def test_markers_file_tunes_ranking(self) -> None:
+        log_text = "\n".join(["flaky-infra hiccup", "ok", "ok", "Traceback (most recent call last):"])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            self.assertIs(checks.resolve_marker_set(None, repo_root), checks.DEFAULT_MARKER_SET)
+            config = repo_root / checks.MARKERS_CONFIG_PATH
+            config.parent.mkdir()
+            config.write_text(json.dumps({"markers": {"flaky-infra": 10, "traceback": 0}}))
+            markers = checks.resolve_marker_set(None, repo_root)
+            snippet = checks.extract_failure_snippet(log_text, max_lines=5, context=0, markers=markers)
+            self.assertEqual(snippet, "flaky-infra hiccup")
+
+            config.write_text(json.dumps({"markers": {"flaky-infra": "high"}}))
+            with self.assertRaises(checks.InspectionError) as raised:
+                checks.resolve_marker_set(None, repo_root)
+            self.assertEqual(raised.exception.exit_code, 65)
+            with self.assertRaises(checks.InspectionError) as raised:
+                checks.resolve_marker_set(str(repo_root / "missing.json"), repo_root)
+            self.assertEqual(raised.exception.exit_code, 66)
+
+    def test_marker_scan_reports_hit_and_annotation_lines_in_one_pass(self) -> None:
+        lines = ["setup ok", "Traceback (most recent call last)", "all good", "##[error]FAILED test_x - ERROR", "\u0130stanbul error"]
+        self.assertEqual(checks.DEFAULT_MARKER_SET.scan(lines), ([1, 3, 4], [3]))
+        self.assertEqual(checks.MarkerSet({}).scan(lines), ([], [3]))
+
+    def test_block_marker_scan_stays_faster_than_per_line_loop(self) -> None:
+        # Guards the scan strategy, not absolute speed: a regex alternation over
+        # the block once ran several times slower than this per-line loop.
+        lines = [f"runner\tstep\t2024-01-01T00:00:00.0000000Z collected item {index} PASSED" for index in range(40_000)]
+        lines[12_345] = "AssertionError: expected 1"
+
+        def best_of(func) -> float:
+            timings = []
+            for _ in range(3):
+                started = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - started)
+            return min(timings)
+
+        def per_line() -> list[int]:
+            return [index for index, line in enumerate(lines) if any(marker in line.lower() for marker in checks.FAILURE_MARKERS)]
+
+        def block_scan() -> list[int]:
+            return [start + hit for start in range(0, len(lines), 800) for hit in checks.DEFAULT_MARKER_SET.scan(lines[start : start + 800])[0]]
+
+        self.assertEqual(block_scan(), per_line())
+        self.assertLess(best_of(block_scan), best_of(per_line))
+
+    def test_iter_line_blocks_matches_splitlines_across_chunks(self) -> None:
+        text = "alpha\n\nbeta\x0bgamma\ndelta\n\nlast"
+        for chunk_size in (1, 2, 3, 7, 64):
+            with self.subTest(chunk_size=chunk_size):
+                blocks = log_cache.iter_line_blocks(io.StringIO(text), chunk_size)
+                self.assertEqual([line for block in blocks for line in block], text.splitlines())
+
     def test_extract_log_from_job_archive_reads_zip_payload(self) -> None:
         buffer = io.BytesIO()
         with zipfile.ZipFile(buffer, "w") as archive:
@@ -215,6 +1670,29 @@ class ChecksTests(unittest.TestCase):
         self.assertEqual(error, "")
         self.assertIn("line 2", text)
 
+    def test_job_log_streams_only_the_largest_archive_member(self) -> None:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("1_Set up job.txt", "setup\n")
+            archive.writestr("2_Run tests.txt", "".join(f"test {index}\r\n" for index in range(20000)) + "Error: boom\n")
+            archive.writestr("3_Post.txt", "post\n")
+
+        def fake_gh(args, cwd, stdout):
+            stdout.write(buffer.getvalue())
+            return 0, ""
+
+        blocks: list[list[str]] = []
+        with mock.patch.object(checks, "run_gh_command_to_file", side_effect=fake_gh), mock.patch.object(
+            zipfile.ZipFile, "read", side_effect=AssertionError("members must not be read whole")
+        ):
+            error = checks.fetch_job_log("7", "openai/codex", None, blocks.append)
+        self.assertEqual(error, "")
+        self.assertGreater(len(blocks), 1)
+        lines = [line for block in blocks for line in block]
+        self.assertEqual(lines[0], "test 0")
+        self.assertEqual(lines[-1], "Error: boom")
+        self.assertEqual(len(lines), 20001)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib.util
+import os
+import py_compile
+import sys
+import tempfile
+import tomllib
+import zipfile
+from pathlib import Path
+
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+PACKAGE_DIR = PROJECT_DIR / "src" / "ghflow"
+PYPROJECT_PATH = PROJECT_DIR / "pyproject.toml"
+DEFAULT_OUTPUT = PROJECT_DIR.parents[1] / "scripts" / "ghflow"
+INTERPRETER = "/usr/bin/env python3"
+ARCHIVE_MAIN = "import sys\n\nfrom ghflow import main\n\nsys.exit(main())\n"
+# Fixed entry timestamps keep rebuilds of unchanged sources byte-identical.
+ENTRY_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+# zipimport loads these .pyc files whatever -O flags the interpreter was
+# started with, so they are compiled unoptimized to keep asserts as in src/.
+OPTIMIZE = 0
+PYC_HEADER_SIZE = 16
+
+
+def project_version() -> str:
+    with PYPROJECT_PATH.open("rb") as handle:
+        payload = tomllib.load(handle)
+    return str(payload["project"]["version"])
+
+
+def archive_sources(version: str) -> dict[str, bytes]:
+    sources = {f"ghflow/{path.name}": path.read_bytes() for path in sorted(PACKAGE_DIR.glob("*.py"))}
+    # Baked at build time so the artifact never parses pyproject.toml on startup.
+    sources["ghflow/_version.py"] = f"VERSION = {version!r}\n".encode("utf-8")
+    # zipapp's generated main drops the return value on some Python versions,
+    # so the archive entry point exits with ghflow.main()'s code explicitly.
+    sources["__main__.py"] = ARCHIVE_MAIN.encode("utf-8")
+    return sources
+
+
+def compile_source(name: str, source: bytes, temp_dir: Path) -> bytes:
+    # zipimport cannot write __pycache__, so every run from a read-only plugin
+    # directory recompiled all modules. Unchecked hash-based .pyc entries sit
+    # next to their sources and load without a source read or mtime check;
+    # other interpreter versions reject the magic number and fall back to .py.
+    source_path = temp_dir / "source.py"
+    pyc_path = temp_dir / "source.pyc"
+    source_path.write_bytes(source)
+    py_compile.compile(
+        str(source_path),
+        cfile=str(pyc_path),
+        dfile=name,
+        doraise=True,
+        optimize=OPTIMIZE,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+    return pyc_path.read_bytes()
+
+
+def archive_entries(version: str, *, bytecode: bool, strip_sources: bool) -> dict[str, bytes]:
+    entries: dict[str, bytes] = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, source in archive_sources(version).items():
+            # The top-level __main__.py is run from source by the zipapp loader.
+            compiled = bytecode and name != "__main__.py"
+            if compiled:
+                entries[name + "c"] = compile_source(name, source, Path(temp_dir))
+            if not (compiled and strip_sources):
+                entries[name] = source
+    return entries
+
+
+def write_archive(output: Path, entries: dict[str, bytes]) -> None:
+    output.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=output.parent, prefix=".ghflow-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(b"#!" + INTERPRETER.encode("utf-8") + b"\n")
+            with zipfile.ZipFile(handle, "w") as archive:
+                for name in sorted(entries):
+                    info = zipfile.ZipInfo(name, date_time=ENTRY_DATE_TIME)
+                    info.external_attr = 0o644 << 16
+                    # Inflating on import costs nothing measurable and keeps
+                    # the .py fallbacks plus .pyc entries at about 200 KB.
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    archive.writestr(info, entries[name])
+        os.chmod(temp_name, 0o755)
+        os.replace(temp_name, output)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_name)
+        raise
+
+
+def build(output: Path, *, bytecode: bool = True, strip_sources: bool = False) -> str:
+    version = project_version()
+    write_archive(output, archive_entries(version, bytecode=bytecode, strip_sources=strip_sources))
+    return version
+
+
+def check(artifact: Path) -> list[str]:
+    # Compares the artifact with the current sources instead of rebuilding it
+    # byte for byte, because .pyc payloads differ across interpreter versions.
+    try:
+        with zipfile.ZipFile(artifact) as archive:
+            actual = {info.filename: archive.read(info) for info in archive.infolist() if not info.is_dir()}
+    except (OSError, zipfile.BadZipFile) as exc:
+        return [f"{artifact}: unreadable zipapp ({exc})"]
+    problems: list[str] = []
+    expected = archive_sources(project_version())
+    for name, source in expected.items():
+        pyc = actual.get(name + "c")
+        if name in actual and actual[name] != source:
+            problems.append(f"{name}: differs from source")
+        if pyc is not None and pyc[8:PYC_HEADER_SIZE] != importlib.util.source_hash(source):
+            problems.append(f"{name}c: compiled from a different source")
+        if name not in actual and (pyc is None or name == "__main__.py"):
+            problems.append(f"{name}: missing")
+    for name in sorted(set(actual) - set(expected) - {name + "c" for name in expected}):
+        problems.append(f"{name}: not in projects/ghflow/src")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the shipped ghflow zipapp from projects/ghflow/src.")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="Artifact path (default: scripts/ghflow).")
+    parser.add_argument("--no-bytecode", action="store_true", help="Ship .py sources only.")
+    parser.add_argument(
+        "--strip-sources",
+        action="store_true",
+        help="Drop .py entries that have a .pyc; the artifact then only runs on this interpreter version.",
+    )
+    parser.add_argument("--check", action="store_true", help="Verify the artifact matches the sources and exit 1 if not.")
+    args = parser.parse_args(argv)
+    if args.check:
+        problems = check(args.output)
+        for problem in problems:
+            print(problem, file=sys.stderr)
+        if problems:
+            print(f"{args.output} is out of date; rebuild with tools/build_zipapp.py.", file=sys.stderr)
+            return 1
+        print(f"{args.output} matches projects/ghflow/src.", file=sys.stderr)
+        return 0
+    if args.no_bytecode and args.strip_sources:
+        parser.error("--strip-sources needs bytecode entries.")
+    version = build(args.output, bytecode=not args.no_bytecode, strip_sources=args.strip_sources)
+    print(f"Built {args.output} (ghflow {version}, {sys.implementation.cache_tag})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())